@@ -0,0 +1,24 @@
+"""price entry screening columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:10:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('price_entries', sa.Column('screening_score', sa.Float(), nullable=True))
+    op.add_column('price_entries', sa.Column('flagged', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade():
+    op.drop_column('price_entries', 'flagged')
+    op.drop_column('price_entries', 'screening_score')
@@ -0,0 +1,36 @@
+"""price daily stats with quantile sketches
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('price_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('market_id', sa.Integer(), nullable=False),
+    sa.Column('stat_date', sa.Date(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('sketch', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['market_id'], ['markets.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('product_id', 'market_id', 'stat_date', name='uq_price_daily_stats_key')
+    )
+    op.create_index(op.f('ix_price_daily_stats_id'), 'price_daily_stats', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_price_daily_stats_id'), table_name='price_daily_stats')
+    op.drop_table('price_daily_stats')
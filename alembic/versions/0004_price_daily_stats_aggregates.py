@@ -0,0 +1,39 @@
+"""price daily stats sum/min/max for range trends
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('price_daily_stats', sa.Column('price_sum', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False))
+    op.add_column('price_daily_stats', sa.Column('min_price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.add_column('price_daily_stats', sa.Column('max_price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.execute("""
+        UPDATE price_daily_stats AS s
+        SET price_sum = a.total, min_price = a.low, max_price = a.high
+        FROM (
+            SELECT product_id, market_id, entry_date,
+                   sum(price_per_unit) AS total, min(price_per_unit) AS low, max(price_per_unit) AS high
+            FROM price_entries
+            WHERE status = 'approved'
+            GROUP BY product_id, market_id, entry_date
+        ) AS a
+        WHERE s.product_id = a.product_id AND s.market_id = a.market_id AND s.stat_date = a.entry_date
+    """)
+    op.alter_column('price_daily_stats', 'price_sum', server_default=None)
+
+
+def downgrade():
+    op.drop_column('price_daily_stats', 'max_price')
+    op.drop_column('price_daily_stats', 'min_price')
+    op.drop_column('price_daily_stats', 'price_sum')
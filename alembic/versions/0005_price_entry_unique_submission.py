@@ -0,0 +1,73 @@
+"""one price entry per vendor, product, market and day
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep one row per key: an approved entry if there is one, else the most
+    # recent pending entry, else the most recent rejected one. One DELETE for
+    # the whole table; the removed approved rows tell us which rollups to rebuild.
+    removed = op.get_bind().execute(sa.text("""
+        DELETE FROM price_entries AS p
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY vendor_id, product_id, market_id, entry_date
+                ORDER BY status = 'approved' DESC, status = 'pending' DESC, created_at DESC, id DESC
+            ) AS rn
+            FROM price_entries
+        ) AS ranked
+        WHERE p.id = ranked.id AND ranked.rn > 1
+        RETURNING p.product_id, p.market_id, p.entry_date, p.status
+    """)).fetchall()
+    stale = sorted({(r.product_id, r.market_id, r.entry_date) for r in removed if r.status == 'approved'})
+    if stale:
+        # An approved row survives for every such key, so its rollup row only
+        # needs recomputing. Plain SQL rather than the app's rollup service,
+        # whose models track the latest schema, not this revision's. The sketch
+        # is QuantileSketch.to_dict() at 1% accuracy: bucket ceil(ln(price) / ln(1.01 / 0.99)).
+        product_ids, market_ids, days = (list(col) for col in zip(*stale))
+        op.get_bind().execute(sa.text("""
+            UPDATE price_daily_stats AS d
+            SET entry_count = a.n, price_sum = a.total, min_price = a.low, max_price = a.high,
+                sketch = a.sketch, updated_at = now()
+            FROM (
+                SELECT product_id, market_id, entry_date,
+                       sum(n) AS n, sum(total) AS total, min(low) AS low, max(high) AS high,
+                       json_build_object('a', 0.01, 'bins', json_object_agg(bucket::text, n)) AS sketch
+                FROM (
+                    SELECT e.product_id, e.market_id, e.entry_date,
+                           CAST(ceil(ln(greatest(CAST(e.price_per_unit AS float8), 0.01)) / ln(1.01 / 0.99)) AS integer) AS bucket,
+                           count(*) AS n, sum(e.price_per_unit) AS total,
+                           min(e.price_per_unit) AS low, max(e.price_per_unit) AS high
+                    FROM price_entries AS e
+                    JOIN unnest(CAST(:product_ids AS integer[]), CAST(:market_ids AS integer[]), CAST(:days AS date[]))
+                        AS k(product_id, market_id, stat_date)
+                        ON e.product_id = k.product_id AND e.market_id = k.market_id AND e.entry_date = k.stat_date
+                    WHERE e.status = 'approved'
+                    GROUP BY 1, 2, 3, 4
+                ) AS buckets
+                GROUP BY product_id, market_id, entry_date
+            ) AS a
+            WHERE d.product_id = a.product_id AND d.market_id = a.market_id AND d.stat_date = a.entry_date
+        """), {"product_ids": product_ids, "market_ids": market_ids, "days": days})
+
+    op.create_unique_constraint(
+        'uq_price_entries_vendor_product_market_date',
+        'price_entries',
+        ['vendor_id', 'product_id', 'market_id', 'entry_date'],
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_price_entries_vendor_product_market_date', 'price_entries', type_='unique')
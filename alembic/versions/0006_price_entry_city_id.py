@@ -0,0 +1,36 @@
+"""denormalized city_id on price entries
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 15:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('price_entries', sa.Column('city_id', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE price_entries AS e
+        SET city_id = m.city_id
+        FROM markets AS m
+        WHERE m.id = e.market_id
+    """)
+    op.alter_column('price_entries', 'city_id', nullable=False)
+    op.create_foreign_key('price_entries_city_id_fkey', 'price_entries', 'cities', ['city_id'], ['id'])
+    op.create_index(
+        'ix_price_entries_city_product_date', 'price_entries', ['city_id', 'product_id', 'entry_date'],
+        unique=False, postgresql_include=['status', 'price_per_unit', 'market_id'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_price_entries_city_product_date', table_name='price_entries')
+    op.drop_constraint('price_entries_city_id_fkey', 'price_entries', type_='foreignkey')
+    op.drop_column('price_entries', 'city_id')
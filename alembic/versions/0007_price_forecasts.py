@@ -0,0 +1,42 @@
+"""nightly price forecasts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 17:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('price_forecasts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('market_id', sa.Integer(), nullable=False),
+    sa.Column('target_date', sa.Date(), nullable=False),
+    sa.Column('horizon', sa.Integer(), nullable=False),
+    sa.Column('point', sa.Float(), nullable=False),
+    sa.Column('lower', sa.Float(), nullable=False),
+    sa.Column('upper', sa.Float(), nullable=False),
+    sa.Column('fitted_through', sa.Date(), nullable=False),
+    sa.Column('observations', sa.Integer(), nullable=False),
+    sa.Column('alpha', sa.Float(), nullable=False),
+    sa.Column('beta', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['market_id'], ['markets.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('product_id', 'market_id', 'target_date', name='uq_price_forecasts_key')
+    )
+    op.create_index(op.f('ix_price_forecasts_id'), 'price_forecasts', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_price_forecasts_id'), table_name='price_forecasts')
+    op.drop_table('price_forecasts')
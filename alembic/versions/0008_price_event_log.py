@@ -0,0 +1,47 @@
+"""price event log
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 19:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('price_event_consumers',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Append-only: no foreign keys, so events outlive the rows they describe
+    op.create_table('price_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('event_type', sa.String(length=20), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('market_id', sa.Integer(), nullable=False),
+    sa.Column('city_id', sa.Integer(), nullable=False),
+    sa.Column('entry_date', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM('pending', 'approved', 'rejected', name='approvalstatus', create_type=False), nullable=False),
+    sa.Column('price_per_unit', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_price_events_created_at', 'price_events', ['created_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade():
+    op.drop_index('ix_price_events_created_at', table_name='price_events', postgresql_using='brin')
+    op.drop_table('price_events')
+    op.drop_table('price_event_consumers')
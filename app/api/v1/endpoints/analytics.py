@@ -1,40 +1,126 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
 from app.db.database import get_db
-from app.schemas.schemas import ProductAnalytics, MarketStats
+from app.schemas.schemas import (
+    ProductAnalytics, MarketStats, PricePercentiles, TrendSeries, TrendBucketEnum,
+    BasketRequest, BasketComparison, BatchAnalyticsRequest, BatchAnalyticsItem, PriceForecastSeries,
+)
 from app.services import analytics_service
+from app.core.config import settings
 from app.core.security import get_current_user
+from app.core.serialization import FastJSONResponse, NegotiatedRoute, fast_or_validated
 
-router = APIRouter(prefix="/analytics", tags=["Analytics"])
+router = APIRouter(
+    prefix="/analytics", tags=["Analytics"], route_class=NegotiatedRoute, default_response_class=FastJSONResponse,
+)
+
+
+def _mark_settled(result, response: Response, settled: bool):
+    """
+    Let clients and CDNs cache responses for fully reviewed past dates. Only
+    briefly: a vendor can still submit an entry for a past day, and its
+    approval changes the result.
+    """
+    if settled:
+        target = result if isinstance(result, Response) else response
+        target.headers["Cache-Control"] = f"public, max-age={settings.ANALYTICS_SETTLED_MAX_AGE}"
+    return result
 
 
 @router.get("/product/{product_id}/market/{market_id}", response_model=ProductAnalytics)
 def product_market_analytics(
     product_id: int,
     market_id: int,
+    response: Response,
+    as_of: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """Full analytics: today's price, 7-day moving avg, spike alert, 30-day trend (as of a past date with `as_of`)"""
+    analytics = analytics_service.get_product_analytics(db, product_id, market_id, as_of)
+    settled = analytics_service.is_settled("product", product_id, market_id, as_of)
+    return _mark_settled(fast_or_validated(analytics, ProductAnalytics), response, settled)
+
+
+@router.post("/batch", response_model=List[BatchAnalyticsItem])
+def batch_analytics(payload: BatchAnalyticsRequest, response: Response, db: Session = Depends(get_db)):
+    """ProductAnalytics for up to 100 product/market pairs in one round trip, in request order"""
+    items, settled = analytics_service.get_batch_analytics(db, payload.pairs, payload.as_of)
+    return _mark_settled(items, response, settled)
+
+
+@router.get("/product/{product_id}/market/{market_id}/trend", response_model=TrendSeries)
+def product_market_trend(
+    product_id: int,
+    market_id: int,
+    from_date: date = Query(..., alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    bucket: Optional[TrendBucketEnum] = None,
+    points: Optional[int] = Query(None, ge=1, le=settings.TREND_MAX_POINTS),
     db: Session = Depends(get_db),
 ):
-    """Full analytics: today's price, 7-day moving avg, spike alert, 30-day trend"""
-    return analytics_service.get_product_analytics(db, product_id, market_id)
+    """Trend over any date range, bucketed by day/week/month or sized to a target point count"""
+    series = analytics_service.get_trend(
+        db, product_id, market_id, from_date, to_date or date.today(),
+        bucket.value if bucket else None, points,
+    )
+    return fast_or_validated(series, TrendSeries)
 
 
 @router.get("/product/{product_id}/all-markets", response_model=List[MarketStats])
 def all_markets_for_product(
     product_id: int,
+    response: Response,
     city_id: Optional[int] = None,
+    as_of: Optional[date] = None,
     db: Session = Depends(get_db),
 ):
     """Compare same product across all markets in a city — for farmer and consumer dashboards"""
-    return analytics_service.get_all_markets_stats_for_product(db, product_id, city_id)
+    stats = analytics_service.get_all_markets_stats_for_product(db, product_id, city_id, as_of)
+    settled = analytics_service.is_settled("all_markets", product_id, city_id, as_of)
+    return _mark_settled(stats, response, settled)
+
+
+@router.get("/product/{product_id}/percentiles", response_model=PricePercentiles)
+def product_percentiles(
+    product_id: int,
+    market_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    days: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db),
+):
+    """Median and p10/p90 over a window, for one market or city-wide (merged from daily sketches)"""
+    return analytics_service.get_price_percentiles(db, product_id, market_id, city_id, days)
+
+
+@router.get("/forecast", response_model=List[PriceForecastSeries])
+def price_forecast(
+    product_id: int,
+    market_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """Expected prices for the coming days with 95% intervals, from the nightly forecast run"""
+    return analytics_service.get_price_forecasts(db, product_id, market_id, city_id)
+
+
+@router.post("/basket", response_model=BasketComparison)
+def basket_comparison(payload: BasketRequest, db: Session = Depends(get_db)):
+    """Where is my basket cheapest: total cost per market in a city, with coverage and ranking"""
+    return analytics_service.get_basket_costs(db, payload.city_id, payload.items, payload.max_age_days)
 
 
 @router.get("/fluctuating-products")
 def most_fluctuating(
+    response: Response,
     city_id: Optional[int] = None,
     limit: int = 5,
+    as_of: Optional[date] = None,
     db: Session = Depends(get_db),
     _=Depends(get_current_user),
 ):
-    """Top products by price variance in last 30 days"""
-    return analytics_service.get_most_fluctuating_products(db, city_id, limit)
+    """Top products by price variance in the 30 days up to `as_of` (default today)"""
+    products = analytics_service.get_most_fluctuating_products(db, city_id, limit, as_of)
+    settled = analytics_service.is_settled("fluctuating", None, (city_id, limit), as_of)
+    return _mark_settled(products, response, settled)
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.db.database import get_db
+from app.db.request_scope import SessionRoute
 from app.schemas.schemas import UserRegister, Token, UserOut
 from app.services.auth_service import register_user, login_user
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=SessionRoute)
 
 
 @router.post("/register", response_model=UserOut, status_code=201)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db
+from app.db.request_scope import SessionRoute
+from app.schemas.schemas import (
+    EventConsumerOut, EventCursorUpdate, PriceEventPage, PriceEventTypeEnum,
+)
+from app.services import event_service
+from app.models.price_event import PriceEventType
+from app.core.security import require_role
+
+router = APIRouter(prefix="/admin/events", tags=["Price Events"], route_class=SessionRoute)
+
+
+@router.get("", response_model=PriceEventPage)
+def list_events(
+    after: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    types: Optional[List[PriceEventTypeEnum]] = Query(None),
+    db: Session = Depends(get_db),
+    _=Depends(require_role("admin")),
+):
+    """Price entry changes after the `after` cursor, oldest first; keep calling with `next_cursor`"""
+    return event_service.read_events(db, after, limit, [PriceEventType(t.value) for t in types or []])
+
+
+@router.get("/consumers", response_model=List[EventConsumerOut])
+def list_consumers(db: Session = Depends(get_db), _=Depends(require_role("admin"))):
+    return event_service.get_consumers(db)
+
+
+@router.put("/consumers/{name}", response_model=EventConsumerOut)
+def set_consumer_cursor(
+    payload: EventCursorUpdate,
+    name: str = Path(..., max_length=100, pattern=r"^[\w.\-]+$"),
+    db: Session = Depends(get_db),
+    _=Depends(require_role("admin")),
+):
+    """Record how far a consumer got, or move its cursor back to replay"""
+    return event_service.set_cursor(db, name, payload.last_event_id)
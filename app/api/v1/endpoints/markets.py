@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
 from app.models.market import City, Market, Product, ProductCategory
 from app.schemas.schemas import (
     CityCreate, CityOut, MarketCreate, MarketOut,
-    ProductCreate, ProductOut, CategoryCreate, CategoryOut
+    ProductCreate, ProductOut, ProductSearchHit, CategoryCreate, CategoryOut
 )
+from app.services import product_search
 from app.core.security import get_current_user, require_role
+from app.core.serialization import FastJSONResponse, NegotiatedRoute
 
-router = APIRouter(tags=["Markets & Products"])
+router = APIRouter(
+    tags=["Markets & Products"], route_class=NegotiatedRoute, default_response_class=FastJSONResponse,
+)
 
 
 # ─── Cities ──────────────────────────────────────────────────────────────────
@@ -80,6 +84,7 @@ def create_category(
     db.add(cat)
     db.commit()
     db.refresh(cat)
+    product_search.rebuild(db)
     return cat
 
 
@@ -93,6 +98,16 @@ def list_products(category_id: Optional[int] = None, db: Session = Depends(get_d
     return q.all()
 
 
+@router.get("/products/search", response_model=List[ProductSearchHit])
+def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    category_id: Optional[int] = None,
+):
+    """Typo-tolerant ranked search over English/Marathi product and category names (in memory, no DB)"""
+    return product_search.search(q, limit, category_id)
+
+
 @router.get("/products/{product_id}", response_model=ProductOut)
 def get_product(product_id: int, db: Session = Depends(get_db)):
     product = db.query(Product).filter(Product.id == product_id).first()
@@ -111,4 +126,5 @@ def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    product_search.rebuild(db)
     return product
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 from app.db.database import get_db
-from app.schemas.schemas import PriceEntryCreate, PriceEntryUpdate, PriceEntryOut, AdminReview, ApprovalStatusEnum
+from app.db.request_scope import SessionRoute
+from app.schemas.schemas import (
+    PriceEntryCreate, PriceEntryUpdate, PriceEntryOut, AdminReview, ApprovalStatusEnum, ScreeningReport,
+    SubmissionFacets, VendorStats,
+)
 from app.services import price_service
 from app.models.price_entry import ApprovalStatus
 from app.core.security import get_current_user, require_role
+from app.core.serialization import fast_or_validated
 
-router = APIRouter(tags=["Price Entries"])
+router = APIRouter(tags=["Price Entries"], route_class=SessionRoute)
 
 
 # ─── Vendor Routes ───────────────────────────────────────────────────────────
@@ -16,10 +21,15 @@ router = APIRouter(tags=["Price Entries"])
 @router.post("/prices", response_model=PriceEntryOut, status_code=201)
 def submit_price(
     payload: PriceEntryCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user=Depends(require_role("vendor")),
 ):
-    return price_service.submit_price(db, payload, current_user.id)
+    """201 for a new entry, 200 when an existing pending or rejected entry was updated in place"""
+    entry, inserted = price_service.submit_price(db, payload, current_user.id)
+    if not inserted:
+        response.status_code = 200
+    return entry
 
 
 @router.get("/prices/my-submissions", response_model=List[PriceEntryOut])
@@ -27,7 +37,17 @@ def my_submissions(
     db: Session = Depends(get_db),
     current_user=Depends(require_role("vendor")),
 ):
-    return price_service.get_vendor_submissions(db, current_user.id)
+    rows = price_service.get_vendor_submissions(db, current_user.id)
+    return fast_or_validated(rows, PriceEntryOut, many=True)
+
+
+@router.get("/prices/my-stats", response_model=VendorStats)
+def my_stats(
+    db: Session = Depends(get_db),
+    current_user=Depends(require_role("vendor")),
+):
+    """Per product/market: latest price vs the market average, deviation over time, approval rate"""
+    return price_service.get_vendor_stats(db, current_user.id)
 
 
 @router.patch("/prices/{entry_id}", response_model=PriceEntryOut)
@@ -49,13 +69,51 @@ def admin_list_prices(
     vendor_id: Optional[int] = None,
     status: Optional[ApprovalStatusEnum] = None,
     entry_date: Optional[date] = None,
+    flagged: Optional[bool] = None,
     db: Session = Depends(get_db),
     _=Depends(require_role("admin")),
 ):
     status_enum = ApprovalStatus(status.value) if status else None
-    return price_service.get_all_submissions(
-        db, product_id, market_id, vendor_id, status_enum, entry_date
+    rows = price_service.get_all_submissions(
+        db, product_id, market_id, vendor_id, status_enum, entry_date, flagged
     )
+    return fast_or_validated(rows, PriceEntryOut, many=True)
+
+
+@router.get("/admin/prices/facets", response_model=SubmissionFacets)
+def admin_price_facets(
+    product_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    status: Optional[ApprovalStatusEnum] = None,
+    entry_date: Optional[date] = None,
+    flagged: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    _=Depends(require_role("admin")),
+):
+    """Total and per status/market/product counts for the same filters as /admin/prices, exact or approximate"""
+    return price_service.get_submission_facets(
+        db,
+        product_id=product_id,
+        market_id=market_id,
+        vendor_id=vendor_id,
+        status=ApprovalStatus(status.value) if status else None,
+        entry_date=entry_date,
+        flagged=flagged,
+    )
+
+
+@router.post("/admin/prices/screen", response_model=ScreeningReport)
+def screen_pending_prices(
+    dry_run: bool = False,
+    band: Optional[float] = None,
+    window_days: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _=Depends(require_role("admin")),
+):
+    """Score all pending entries against approved median/MAD; auto-approve within band, flag the rest"""
+    from app.services import screening_service  # numpy is only loaded when screening actually runs
+    return screening_service.screen_pending_entries(db, band, dry_run, window_days)
 
 
 @router.post("/admin/prices/{entry_id}/review", response_model=PriceEntryOut)
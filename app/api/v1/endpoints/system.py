@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends
+from app.core import startup_profile
+from app.core.admission import admission
+from app.core.idempotency import idempotency_store
+from app.core.scheduler import scheduler
+from app.core.config import settings
+from app.core.security import require_role
+from app.db.database import engine
+from app.db.pool import pool_status
+from app.db.request_scope import SessionRoute
+from app.services import analytics_service, product_search
+
+router = APIRouter(prefix="/admin/system", tags=["System"], route_class=SessionRoute)
+
+
+@router.get("/jobs")
+def scheduler_jobs(_=Depends(require_role("admin"))):
+    """Background job schedule, leadership and per-job duration/failure metrics for this worker"""
+    return scheduler.metrics()
+
+
+@router.get("/startup")
+def startup_report(_=Depends(require_role("admin"))):
+    """Cold-start profile: per-module import times (with STARTUP_PROFILE=1) and lifespan phases"""
+    return startup_profile.report()
+
+
+@router.get("/admission")
+def admission_metrics(_=Depends(require_role("admin"))):
+    """Per route class concurrency, queueing and shed counts, DB pool utilisation, rate-limited submissions"""
+    return admission.metrics()
+
+
+@router.get("/idempotency")
+def idempotency_metrics(_=Depends(require_role("admin"))):
+    """Idempotency-Key requests run, stored and replayed by this worker, and waits on in-flight originals"""
+    return idempotency_store.stats()
+
+
+@router.get("/cache")
+def cache_stats(_=Depends(require_role("admin"))):
+    """Analytics caches and product search index of this worker, and the host-wide shared per-day stats table"""
+    return {
+        "analytics": analytics_service.analytics_cache.stats(),
+        "history": analytics_service.history_cache.stats(),
+        "day_stats": analytics_service.day_stats_cache.stats(),
+        "product_search": dict(product_search.state),
+    }
+
+
+@router.get("/pool")
+def db_pool(_=Depends(require_role("admin"))):
+    """DB pool checked-out/overflow counts, checkout wait times, and the routes holding connections longest"""
+    return pool_status(engine, settings.DB_MAX_OVERFLOW)
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db
+from app.db.request_scope import SessionRoute
 from app.models.user import User
 from app.schemas.schemas import UserOut
 from app.core.security import get_current_user, require_role
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=SessionRoute)
 
 
 @router.get("/me", response_model=UserOut)
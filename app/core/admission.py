@@ -0,0 +1,225 @@
+"""
+Admission control and load shedding.
+
+Every API request is classified (public, vendor, admin, auth) and must take
+a slot from its class's concurrency limit before it reaches a handler, so a
+flood of analytics reads cannot starve logins or admin review of DB
+connections. Requests wait briefly for a slot; past ADMISSION_MAX_QUEUE
+waiters or ADMISSION_QUEUE_TIMEOUT_SECONDS they are rejected with 503 and
+Retry-After. Public and vendor traffic is also shed up front while the DB
+pool is nearly exhausted. Health checks and docs bypass admission entirely.
+
+Vendor submissions (POST /prices) additionally go through a per-vendor
+token bucket keyed on the JWT subject, decoded without a DB query.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.db.database import engine
+
+API_PREFIX = "/api/v1"
+SUBMIT_PATH = f"{API_PREFIX}/prices"
+MAX_TRACKED_VENDORS = 10000
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class for a request, or None for routes that bypass admission"""
+    if not path.startswith(API_PREFIX):
+        return None  # "/", "/ready", docs
+    path = path[len(API_PREFIX):]
+    if path.startswith("/auth"):
+        return "auth"
+    if path.rstrip("/") == "/users/me":
+        return "public"  # any logged-in user, fetched on every app start
+    if path.startswith("/admin") or path.startswith("/users"):
+        return "admin"
+    if path.startswith("/prices"):
+        return "vendor"
+    if method not in ("GET", "HEAD"):
+        return "admin"  # catalogue writes are admin-only
+    return "public"
+
+
+# ─── Concurrency gates ───────────────────────────────────────────────────────
+
+class Gate:
+    def __init__(self, name: str, limit: int, shed_on_pool_pressure: bool):
+        self.name = name
+        self.limit = limit
+        self.shed_on_pool_pressure = shed_on_pool_pressure
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {"queue_full": 0, "queue_timeout": 0, "pool_pressure": 0}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns the shed reason instead if the request must be rejected"""
+        if self.semaphore.locked():
+            if self.waiting >= settings.ADMISSION_MAX_QUEUE:
+                return "queue_full"
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), settings.ADMISSION_QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        self.active += 1
+        self.admitted += 1
+        return None
+
+    def release(self) -> None:
+        self.active -= 1
+        self.semaphore.release()
+
+    def metrics(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+def pool_utilisation() -> float:
+    """Share of the engine's connections (pool + overflow) currently checked out"""
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    checked_out = getattr(engine.pool, "checkedout", None)
+    if checked_out is None or capacity <= 0:
+        return 0.0
+    return checked_out() / capacity
+
+
+# ─── Per-vendor token buckets ────────────────────────────────────────────────
+
+class TokenBuckets:
+    """Token bucket per key, refilled continuously; least recently seen keys are evicted"""
+
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int = MAX_TRACKED_VENDORS):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, last refill]
+        self.rejected = 0
+
+    def take(self, key: str) -> float:
+        """Consume one token; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        self.rejected += 1
+        return (1 - bucket[0]) / self.rate if self.rate > 0 else float(settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+
+def caller_key(scope) -> str:
+    """JWT subject of the caller (signature checked, no DB lookup), else the client address"""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                from jose import JWTError, jwt
+                try:
+                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                    if payload.get("sub") is not None:
+                        return f"user:{payload['sub']}"
+                except JWTError:
+                    pass
+            break
+    client = scope.get("client")
+    return f"addr:{client[0] if client else 'unknown'}"
+
+
+# ─── Middleware ──────────────────────────────────────────────────────────────
+
+class AdmissionController:
+    def __init__(self):
+        self.gates: Dict[str, Gate] = {
+            "public": Gate("public", settings.ADMISSION_PUBLIC_CONCURRENCY, shed_on_pool_pressure=True),
+            "vendor": Gate("vendor", settings.ADMISSION_VENDOR_CONCURRENCY, shed_on_pool_pressure=True),
+            "admin": Gate("admin", settings.ADMISSION_ADMIN_CONCURRENCY, shed_on_pool_pressure=False),
+            "auth": Gate("auth", settings.ADMISSION_AUTH_CONCURRENCY, shed_on_pool_pressure=False),
+        }
+        self.submissions = TokenBuckets(settings.VENDOR_SUBMIT_RATE_PER_MINUTE / 60, settings.VENDOR_SUBMIT_BURST)
+
+    def metrics(self) -> dict:
+        return {
+            "enabled": settings.ADMISSION_CONTROL_ENABLED,
+            "pool_utilisation": round(pool_utilisation(), 3),
+            "pool_shed_ratio": settings.ADMISSION_POOL_SHED_RATIO,
+            "classes": {name: gate.metrics() for name, gate in self.gates.items()},
+            "vendor_submit_rate_limited": self.submissions.rejected,
+            "vendors_tracked": len(self.submissions._buckets),
+        }
+
+
+admission = AdmissionController()
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware so rejected requests cost no more than a dict lookup"""
+
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ADMISSION_CONTROL_ENABLED:
+            return await self.app(scope, receive, send)
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            return await self.app(scope, receive, send)
+
+        if scope["method"] == "POST" and scope["path"].rstrip("/") == SUBMIT_PATH:
+            wait = self.controller.submissions.take(caller_key(scope))
+            if wait:
+                response = _reject(429, "Too many price submissions, slow down", wait)
+                return await response(scope, receive, send)
+
+        gate = self.controller.gates[route_class]
+        reason = None
+        if gate.shed_on_pool_pressure and pool_utilisation() >= settings.ADMISSION_POOL_SHED_RATIO:
+            reason = "pool_pressure"
+        else:
+            reason = await gate.acquire()
+        if reason:
+            gate.shed[reason] += 1
+            response = _reject(503, "Server is busy, please retry shortly", settings.ADMISSION_RETRY_AFTER_SECONDS)
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
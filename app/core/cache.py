@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Like get, without touching recency or hit/miss counters"""
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item is not None and item[0] >= time.monotonic() else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            stale = [k for k in self._data if predicate(k)]
+            for k in stale:
+                del self._data[k]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class HotKeyCounter:
+    """Counts requests per key so the hottest ones can be pre-computed after a restart"""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def merge(self, items: Iterable[Tuple[Hashable, int]]) -> None:
+        with self._lock:
+            for key, n in items:
+                self._counts[key] += n
+
+    def top(self, n: int) -> List[Tuple[Hashable, int]]:
+        with self._lock:
+            return self._counts.most_common(n)
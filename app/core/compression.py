@@ -0,0 +1,115 @@
+"""
+gzip / brotli response compression.
+
+Responses of at least COMPRESSION_MIN_BYTES with a compressible media type
+(JSON, MessagePack, text) are compressed with the best encoding the client
+accepts: brotli when the `brotli` package is installed (imported the first
+time a client accepts it), else gzip. Smaller
+bodies go out as they are, since below about a kilobyte the framing costs
+more than it saves on the radio. Large bodies are compressed in a worker
+thread to keep the event loop free. Streamed responses pass through
+uncompressed; every route here sends its body in one message.
+"""
+import asyncio
+import gzip
+from functools import lru_cache
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    try:
+        import brotli
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return brotli
+
+
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "application/vnd.", "text/")
+THREAD_MIN_BYTES = 64 * 1024
+
+
+def _accepted_encodings(header: str) -> dict:
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br' or 'gzip', whichever the client rates higher (brotli wins ties), or None"""
+    if not accept_encoding:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    br_q = accepted.get("br", wildcard)
+    candidates = [("br", br_q)] if br_q > 0 and _brotli() is not None else []
+    candidates.append(("gzip", accepted.get("gzip", wildcard)))
+    encoding, q = max(candidates, key=lambda c: c[1])  # max keeps the first of equals
+    return encoding if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return _brotli().compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = settings.COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def compressing_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held back until the body shows whether to compress
+                return
+            if message["type"] == "http.response.body" and start is not None:
+                message = await self._maybe_compress(start, message, encoding)
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, compressing_send)
+
+    async def _maybe_compress(self, start, message, encoding: str):
+        headers = MutableHeaders(raw=list(start["headers"]))
+        start["headers"] = headers.raw  # the same list, so header changes below go out with it
+        if "content-encoding" in headers or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return message
+        headers.add_vary_header("Accept-Encoding")
+        body = message.get("body", b"")
+        if message.get("more_body", False) or len(body) < self.minimum_size:
+            return message
+        if len(body) >= THREAD_MIN_BYTES:
+            compressed = await asyncio.to_thread(compress, body, encoding)
+        else:
+            compressed = compress(body, encoding)
+        if len(compressed) >= len(body):
+            return message
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        return {**message, "body": compressed}
@@ -7,6 +7,89 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ENVIRONMENT: str = "development"
+    # Fast boot: verify the Alembic revision instead of running create_all (always on in production)
+    FAST_BOOT: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+
+    # Statistical pre-screening of pending submissions
+    SCREEN_WINDOW_DAYS: int = 30
+    SCREEN_APPROVE_BAND: float = 3.0  # robust z-score within which entries are auto-approved
+    SCREEN_MIN_SAMPLES: int = 5
+    SCREEN_MIN_SCALE_PCT: float = 0.02  # scale floor as a fraction of the median when MAD is ~0
+
+    # Admin submission facets: exact counts up to this many matching rows, sampled above
+    FACET_EXACT_THRESHOLD: int = 100000
+    FACET_SAMPLE_ROWS: int = 50000
+
+    # In-memory product search: background rebuild interval to pick up other workers' changes
+    PRODUCT_SEARCH_REFRESH_SECONDS: int = 300
+
+    # Trend charts
+    TREND_MAX_POINTS: int = 400
+
+    # Serialize large list responses straight from ORM rows (orjson when installed)
+    FAST_JSON_RESPONSES: bool = False
+
+    # Analytics cache and startup warm-up
+    ANALYTICS_CACHE_TTL: int = 60
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 5000
+    ANALYTICS_HISTORY_CACHE_TTL: int = 7 * 24 * 3600  # fully reviewed past dates
+    ANALYTICS_HISTORY_CACHE_MAX_ENTRIES: int = 20000
+    ANALYTICS_SETTLED_MAX_AGE: int = 300  # Cache-Control max-age for final responses
+    ANALYTICS_INVALIDATION_POLL_SECONDS: float = 5.0  # event log poll for approvals on other workers
+    # Per-day stats shared by all workers on a host through a memory-mapped file
+    SHARED_CACHE_ENABLED: bool = True
+    SHARED_CACHE_PATH: str = "/dev/shm/fairprice-day-stats"
+    SHARED_CACHE_SLOTS: int = 65536  # 80 bytes each
+    WARMUP_ENABLED: bool = True
+    WARMUP_TOP_N: int = 50
+    WARMUP_TIME_BUDGET_SECONDS: float = 20.0
+    WARMUP_CONCURRENCY: int = 4  # DB connections used by the warm-up
+    WARMUP_STATE_FILE: str = "/tmp/fairprice-hot-keys.json"
+
+    # Background maintenance jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LOCK_FILE: str = "/tmp/fairprice-scheduler.lock"
+    # Jobs that approve or reject entries on their own are opt-in
+    SCREEN_JOB_ENABLED: bool = False
+    SCREEN_CRON: str = "*/15 * * * *"
+    EXPIRE_STALE_PENDING_ENABLED: bool = False
+    STALE_PENDING_DAYS: int = 14
+
+    # Nightly price forecasts (Holt's linear trend, fitted per product/market series)
+    FORECAST_CRON: str = "50 0 * * *"  # after the nightly rollup rebuild
+    FORECAST_HISTORY_DAYS: int = 90
+    FORECAST_HORIZON_DAYS: int = 7
+    FORECAST_MIN_OBSERVATIONS: int = 10  # days with approved prices in the history window
+    FORECAST_MAX_GAP_DAYS: int = 7  # series without a price for longer are not forecast
+
+    # Price entry change log: how far back consumers can replay
+    PRICE_EVENT_RETENTION_DAYS: int = 90
+
+    # Admission control: concurrent requests per route class, shed with 503 under overload
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_PUBLIC_CONCURRENCY: int = 16
+    ADMISSION_VENDOR_CONCURRENCY: int = 8
+    ADMISSION_ADMIN_CONCURRENCY: int = 4
+    ADMISSION_AUTH_CONCURRENCY: int = 4
+    ADMISSION_MAX_QUEUE: int = 32  # waiting requests per class before shedding outright
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_POOL_SHED_RATIO: float = 0.9  # checked-out share of the DB pool that sheds public/vendor traffic
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+    VENDOR_SUBMIT_RATE_PER_MINUTE: float = 30.0
+    VENDOR_SUBMIT_BURST: int = 10
+
+    # Response compression above a size threshold (brotli when installed, else gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5  # 0-11; higher costs much more CPU for a few percent
+
+    # Idempotency-Key support on POST /prices and admin reviews (stored in Postgres)
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # how long a duplicate waits for the in-flight original
+    IDEMPOTENCY_LEASE_SECONDS: float = 120.0  # an older claim without a response is taken as abandoned
 
     class Config:
         env_file = ".env"
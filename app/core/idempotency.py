@@ -0,0 +1,260 @@
+"""
+Idempotency keys for retried writes.
+
+Vendors on flaky networks retry POST /prices, and admins retry reviews. When
+such a request carries an `Idempotency-Key` header, the first request for
+that key runs normally and its response is kept for IDEMPOTENCY_TTL_SECONDS.
+Retries with the same key get the stored response back, marked
+`Idempotent-Replayed: true`, without reaching the endpoint. A duplicate that
+arrives while the original is still running waits for it, for up to
+IDEMPOTENCY_WAIT_SECONDS and then 409. Keys are scoped to the caller (JWT
+subject) and the path, and bound to a hash of the request body: reusing a
+key with a different payload is a 422.
+
+Keys live in Postgres (idempotency_keys), so a retry that lands on another
+worker is replayed too. The first request claims its key with an INSERT ...
+ON CONFLICT DO NOTHING, committed before the endpoint runs, and fills in the
+response afterwards; duplicates poll the row. A claim older than
+IDEMPOTENCY_LEASE_SECONDS is taken to belong to a worker that died mid-request
+and can be taken over. Server errors, auth failures and rate-limit rejections
+are not stored (the claim is deleted), so retrying those runs the request
+again. Expired rows are pruned hourly.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Boolean, case, delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+from app.core.admission import API_PREFIX, caller_key
+from app.core.config import settings
+from app.db.database import engine
+from app.models.idempotency import IdempotencyKey
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+IDEMPOTENT_ROUTES = (
+    re.compile(rf"^{API_PREFIX}/prices/?$"),
+    re.compile(rf"^{API_PREFIX}/admin/prices/\d+/review/?$"),
+)
+NOT_STORED = {401, 403, 408, 429}  # outcomes a retry should not be stuck with
+POLL_SECONDS = (0.02, 0.05, 0.1, 0.25)  # a duplicate re-reads the row after each, then every 0.25 s
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: bytes  # digest of the request body
+    status: Optional[int]  # None while the original is still running
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyStore:
+    def __init__(self, engine, ttl: float, lease: float):
+        self.engine = engine
+        self.ttl = timedelta(seconds=ttl)
+        self.lease = timedelta(seconds=lease)
+        self.in_flight = 0  # requests with a key this worker is running
+        self.stored = 0
+        self.replays = 0
+        self.waits = 0
+        self.mismatches = 0
+        self.timeouts = 0
+        self.takeovers = 0
+
+    def claim(self, key: bytes, fingerprint: bytes) -> Optional[StoredResponse]:
+        """
+        Claim `key` for a request about to run: None if it is ours now, else the
+        row already there (a stored response, or a claim with status None). An
+        expired response or abandoned claim is replaced.
+        """
+        stmt = insert(IdempotencyKey).values(key=key, fingerprint=fingerprint)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={"fingerprint": stmt.excluded.fingerprint, "status": None, "headers": None, "body": None,
+                  "created_at": func.now()},
+            where=IdempotencyKey.created_at < func.now() - case(
+                (IdempotencyKey.status.is_(None), self.lease), else_=self.ttl,
+            ),
+        ).returning(literal_column("xmax = 0", Boolean))  # false when an old row was replaced
+        with self.engine.begin() as conn:
+            claimed = conn.execute(stmt).first()
+            if claimed is not None:
+                if not claimed[0]:
+                    self.takeovers += 1
+                return None
+            row = conn.execute(
+                select(IdempotencyKey.fingerprint, IdempotencyKey.status, IdempotencyKey.headers, IdempotencyKey.body)
+                .where(IdempotencyKey.key == key)
+            ).first()
+        if row is None:
+            return self.claim(key, fingerprint)  # the claim was released in between
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in row.headers or ()]
+        return StoredResponse(row.fingerprint, row.status, headers, row.body or b"")
+
+    def save(self, key: bytes, status: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                IdempotencyKey.__table__.update()
+                .where(IdempotencyKey.key == key)
+                .values(status=status, headers=[[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers],
+                        body=body)
+            )
+        self.stored += 1
+
+    def release(self, key: bytes) -> None:
+        """Drop our claim without storing a response, so a retry runs again"""
+        with self.engine.begin() as conn:
+            conn.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status.is_(None)))
+
+    def prune(self) -> int:
+        cutoff = datetime.now(timezone.utc) - max(self.ttl, self.lease)
+        with self.engine.begin() as conn:
+            return conn.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff)).rowcount
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "stored": self.stored,
+            "replays": self.replays,
+            "waited_for_original": self.waits,
+            "payload_mismatches": self.mismatches,
+            "wait_timeouts": self.timeouts,
+            "abandoned_claims_taken_over": self.takeovers,
+        }
+
+
+idempotency_store = IdempotencyStore(engine, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS)
+
+
+def _digest(*parts: bytes) -> bytes:
+    return hashlib.sha256(b"\0".join(parts)).digest()[:16]
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value
+    return None
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay_receive(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()  # then wait for the disconnect as usual
+    return replay
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI, outside admission control, so replays cost neither a slot nor a rate-limit token"""
+
+    def __init__(self, app, store: IdempotencyStore = idempotency_store):
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(route.match(scope["path"]) for route in IDEMPOTENT_ROUTES)
+        ):
+            return await self.app(scope, receive, send)
+        key = _header(scope, HEADER)
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400, content={"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"},
+            )
+            return await response(scope, receive, send)
+
+        body = await _read_body(receive)
+        if body is None:
+            return  # client went away before sending the request
+        fingerprint = _digest(body)
+        store_key = _digest(caller_key(scope).encode(), scope["path"].rstrip("/").encode(), key)
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        polls = 0
+        while True:
+            stored = await run_in_threadpool(self.store.claim, store_key, fingerprint)
+            if stored is None:
+                break
+            if stored.status is not None or stored.fingerprint != fingerprint:
+                return await self._replay(stored, fingerprint, scope, receive, send)
+            # the original is still running, on this worker or another
+            if polls == 0:
+                self.store.waits += 1
+            if time.monotonic() >= deadline:
+                self.store.timeouts += 1
+                response = JSONResponse(
+                    status_code=409,
+                    content={"detail": "A request with this Idempotency-Key is still in progress"},
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+                )
+                return await response(scope, receive, send)
+            await asyncio.sleep(POLL_SECONDS[min(polls, len(POLL_SECONDS) - 1)])
+            polls += 1
+            # then replay its response, or run again if it was not stored
+
+        started = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                started.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        self.store.in_flight += 1
+        saved = False
+        try:
+            await self.app(scope, _replay_receive(body, receive), capture)
+            status = started.get("status", 500)
+            if status < 500 and status not in NOT_STORED:
+                await run_in_threadpool(
+                    self.store.save, store_key, status, list(started.get("headers", [])), b"".join(chunks),
+                )
+                saved = True
+        finally:
+            self.store.in_flight -= 1
+            if not saved:
+                await run_in_threadpool(self.store.release, store_key)
+
+    async def _replay(self, stored: StoredResponse, fingerprint: bytes, scope, receive, send):
+        if stored.fingerprint != fingerprint:
+            self.store.mismatches += 1
+            response = JSONResponse(
+                status_code=422,
+                content={"detail": "This Idempotency-Key was already used with a different request body"},
+            )
+            return await response(scope, receive, send)
+        self.store.replays += 1
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
@@ -0,0 +1,317 @@
+"""
+In-process scheduler for periodic maintenance jobs.
+
+Every worker runs the scheduler loop, but only the leader executes jobs.
+Leadership is a Postgres session-level advisory lock held on a dedicated
+connection (released automatically if the worker dies), with a local lock
+file as the fallback for other databases. Jobs are plain sync callables run
+on a small dedicated thread pool, so a slow job never occupies the event
+loop or the threadpool used by request handlers.
+
+Schedules follow the wall clock, but asyncio sleeps on the monotonic one, so
+a job loop can wake before its slot or after an NTP step. A job therefore
+runs only once the wall clock has reached its slot and only for a slot later
+than the last one it ran for; sleeps are capped so a forward step is noticed.
+"""
+import asyncio
+import fcntl
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_KEY = 0x46505452  # "FPTR"
+LEADER_RETRY_SECONDS = 15
+MAX_SLEEP_SECONDS = 60
+
+
+# ─── Cron ────────────────────────────────────────────────────────────────────
+
+class CronSchedule:
+    """Five-field cron expression: minute hour day-of-month month day-of-week (0 or 7 = Sunday)"""
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self._RANGES)]
+        self.minutes, self.hours, self.days, self.months, dows = parsed
+        self.dows = {d % 7 for d in dows}
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> List[int]:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_s = part.split("/")
+                step = int(step_s)
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = (int(x) for x in part.split("-"))
+            else:
+                start = end = int(part)
+            if start < lo or end > hi or step < 1:
+                raise ValueError(f"Cron field {field!r} out of range {lo}-{hi}")
+            values.update(range(start, end + 1, step))
+        return sorted(values)
+
+    def _day_matches(self, d: datetime) -> bool:
+        if d.month not in self.months:
+            return False
+        dom = d.day in self.days
+        dow = (d.isoweekday() % 7) in self.dows
+        if self._dom_any:
+            return dow
+        if self._dow_any:
+            return dom
+        return dom or dow
+
+    def next_after(self, after: datetime) -> datetime:
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for h in self.hours:
+                    for m in self.minutes:
+                        candidate = day.replace(hour=h, minute=m)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+# ─── Leader election ─────────────────────────────────────────────────────────
+
+class LeaderLock:
+    """Postgres advisory lock on a dedicated connection, or a local lock file"""
+
+    def __init__(self, engine, lock_file: str):
+        self.engine = engine
+        self.lock_file = lock_file
+        self._conn = None
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._conn is not None or self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self.held:
+            return self._still_held()
+        if self.engine.dialect.name == "postgresql":
+            try:
+                conn = self.engine.connect()
+                got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": ADVISORY_LOCK_KEY}).scalar()
+                conn.commit()
+                if got:
+                    self._conn = conn
+                    return True
+                conn.close()
+                return False
+            except Exception:
+                logger.warning("Advisory lock unavailable, falling back to lock file", exc_info=True)
+        return self._try_lock_file()
+
+    def _still_held(self) -> bool:
+        if self._conn is None:
+            return True
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception:
+            logger.warning("Lost scheduler leadership (lock connection dropped)")
+            self._conn = None
+            return False
+
+    def _try_lock_file(self) -> bool:
+        fd = os.open(self.lock_file, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": ADVISORY_LOCK_KEY})
+                self._conn.commit()
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+# ─── Scheduler ───────────────────────────────────────────────────────────────
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], object], every: Optional[float] = None, cron: Optional[str] = None):
+        if (every is None) == (cron is None):
+            raise ValueError("A job needs exactly one of 'every' or 'cron'")
+        self.name = name
+        self.func = func
+        self.every = every
+        self.cron = CronSchedule(cron) if cron else None
+        self.next_run: Optional[datetime] = None
+        self.last_due: Optional[datetime] = None  # slot of the last run (or skip)
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.total_duration_ms = 0.0
+        self.last_error: Optional[str] = None
+        self.last_result: Optional[str] = None
+
+    def schedule_next(self, now: datetime) -> None:
+        self.next_run = self.cron.next_after(now) if self.cron else now + timedelta(seconds=self.every)
+
+    def take_due(self, now: datetime) -> bool:
+        """
+        True (and the next slot is scheduled) if the slot in next_run is due at
+        `now` and newer than the last one taken; an early wake-up, or a clock
+        stepped back, leaves it for later
+        """
+        if now < self.next_run:
+            return False
+        due = self.next_run
+        self.schedule_next(max(now, due))
+        if self.last_due is not None and due <= self.last_due:
+            return False
+        self.last_due = due
+        return True
+
+    def metrics(self) -> dict:
+        return {
+            "name": self.name,
+            "schedule": self.cron.expr if self.cron else f"every {self.every:g}s",
+            "next_run": self.next_run,
+            "last_due": self.last_due,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_started": self.last_started,
+            "last_duration_ms": self.last_duration_ms,
+            "avg_duration_ms": round(self.total_duration_ms / self.runs, 2) if self.runs else None,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+        }
+
+
+class Scheduler:
+    def __init__(self, engine, lock_file: str, max_workers: int = 2):
+        self.jobs: Dict[str, Job] = {}
+        self.leader = LeaderLock(engine, lock_file)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self._tasks: List[asyncio.Task] = []
+        self._runs: Set[asyncio.Task] = set()  # running jobs; the event loop only keeps weak references
+
+    def add_job(self, name: str, func: Callable[[], object], every: Optional[float] = None, cron: Optional[str] = None) -> Job:
+        job = Job(name, func, every=every, cron=cron)
+        self.jobs[name] = job
+        return job
+
+    @property
+    def is_leader(self) -> bool:
+        return self.leader.held
+
+    async def start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="scheduler")
+        now = datetime.now()
+        for job in self.jobs.values():
+            job.schedule_next(now)
+        self._tasks = [asyncio.create_task(self._leader_loop())]
+        self._tasks += [asyncio.create_task(self._job_loop(job)) for job in self.jobs.values()]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for task in self._runs:
+            task.cancel()  # the job's thread finishes on its own; shutdown below does not wait for it
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        await asyncio.to_thread(self.leader.release)
+
+    async def _leader_loop(self) -> None:
+        while True:
+            try:
+                was_leader = self.leader.held
+                is_leader = await asyncio.to_thread(self.leader.try_acquire)
+                if is_leader and not was_leader:
+                    logger.info("Scheduler leadership acquired (pid %s)", os.getpid())
+            except Exception:
+                logger.exception("Scheduler leader election failed")
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+    async def _job_loop(self, job: Job) -> None:
+        while True:
+            now = datetime.now()
+            if not job.take_due(now):
+                await asyncio.sleep(min(max((job.next_run - now).total_seconds(), 0), MAX_SLEEP_SECONDS))
+                continue
+            if not self.is_leader:
+                continue
+            if job.running:
+                job.skipped += 1
+                continue
+            task = asyncio.create_task(self.run_job(job))
+            self._runs.add(task)
+            task.add_done_callback(self._runs.discard)
+
+    async def run_job(self, job: Job) -> None:
+        loop = asyncio.get_running_loop()
+        job.running = True
+        job.last_started = datetime.now()
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._executor, job.func)
+            job.last_error = None
+            job.last_result = None if result is None else str(result)[:500]
+        except Exception as exc:
+            job.failures += 1
+            job.last_error = f"{type(exc).__name__}: {exc}"
+            logger.error("Scheduled job %s failed\n%s", job.name, traceback.format_exc())
+        finally:
+            job.runs += 1
+            job.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            job.total_duration_ms += job.last_duration_ms
+            job.running = False
+
+    def metrics(self) -> dict:
+        return {
+            "leader": self.is_leader,
+            "pid": os.getpid(),
+            "jobs": [job.metrics() for job in self.jobs.values()],
+        }
+
+
+scheduler = Scheduler(engine, settings.SCHEDULER_LOCK_FILE)
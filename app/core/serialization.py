@@ -0,0 +1,267 @@
+"""
+Fast response path for large list payloads.
+
+Rows coming out of our own database are already trusted, so instead of
+validating each one through a `response_model`, the schema's fields are
+compiled once into a plan that reads attributes straight off ORM objects,
+Row tuples or already-built Pydantic models, and the result is encoded with
+orjson when it is installed. The Pydantic schemas stay the contract: field
+names, nesting and JSON formats (Decimal as string, UTC as "Z") match what
+FastAPI would emit for the same `response_model`.
+
+Routers built with `NegotiatedRoute` also answer in compact encodings for
+clients on slow links, picked from the Accept header:
+
+  application/msgpack                          same document as MessagePack
+  application/vnd.fairprice.columnar+json      lists of objects as columns
+  application/vnd.fairprice.columnar+msgpack   both
+
+In the columnar form a list of objects becomes
+{"@rows": n, "@columns": {field: [values...]}}, and a column of strings,
+dates or decimals with many repeats (market and product names, units) is
+dictionary-encoded as {"@dict": [distinct values], "@codes": [indexes]}.
+Rupee amounts, the fields named in PRICE_FIELDS, are sent in paise as
+{"@scale": 100, "@values": [4250, ...]}, since MessagePack spends 9 bytes on
+every float. Other values keep their JSON formats. Anything else, or msgpack
+types when msgpack is not installed, gets plain JSON.
+
+orjson and msgpack are optional and imported on the first response that
+needs them, not at startup.
+"""
+import json
+import math
+import typing
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.db.request_scope import SessionRoute
+
+
+@lru_cache(maxsize=None)
+def _orjson():
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return orjson
+
+
+@lru_cache(maxsize=None)
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return msgpack
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat().replace("+00:00", "Z")
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def packb(content: Any) -> bytes:
+    return _msgpack().packb(content, default=_default, use_bin_type=True)
+
+
+DICT_TYPES = (str, date, Decimal)  # hashable values worth replacing by a small integer code
+COLUMN_CODING_MIN_ROWS = 8
+PRICE_SCALE = 100
+# Float fields holding rupee amounts rounded to the paisa (prices are NUMERIC(10, 2));
+# only these are scaled, other floats (scores, percentages, alpha/beta) stay floats
+PRICE_FIELDS = frozenset({
+    "avg_price", "min_price", "max_price", "median_price", "p10_price", "p90_price",
+    "p10", "median", "p90", "price_per_unit", "unit_price", "line_cost", "total_cost",
+    "today_avg", "today_min", "today_max", "today_median", "today_p10", "today_p90",
+    "moving_avg_7d", "latest_price", "latest_market_avg", "point", "lower", "upper",
+})
+
+
+def _column(name: str, values: list) -> Any:
+    if len(values) < COLUMN_CODING_MIN_ROWS:
+        return to_columnar(values)
+    if name in PRICE_FIELDS and all(v is None or type(v) is float and math.isfinite(v) for v in values):
+        return {"@scale": PRICE_SCALE, "@values": [None if v is None else round(v * PRICE_SCALE) for v in values]}
+    if all(v is None or isinstance(v, DICT_TYPES) for v in values):
+        distinct = list(dict.fromkeys(values))
+        if len(distinct) * 2 <= len(values):
+            codes = {v: i for i, v in enumerate(distinct)}
+            return {"@dict": distinct, "@codes": [codes[v] for v in values]}
+    return to_columnar(values)
+
+
+def to_columnar(content: Any) -> Any:
+    """Turn every list of same-shaped objects into columns, dictionary-encoding repetitive ones"""
+    if isinstance(content, dict):
+        return {k: to_columnar(v) for k, v in content.items()}
+    if isinstance(content, list):
+        if content and all(isinstance(row, dict) for row in content):
+            keys = list(content[0])
+            if all(len(row) == len(keys) and all(k in row for k in keys) for row in content):
+                return {"@rows": len(content), "@columns": {k: _column(k, [row[k] for row in content]) for k in keys}}
+        return [to_columnar(v) for v in content]
+    return content
+
+
+class ResponseFormat(NamedTuple):
+    media_type: str
+    columnar: bool
+    msgpack: bool
+
+    def encode(self, content: Any) -> bytes:
+        if self.columnar:
+            content = to_columnar(content)
+        return packb(content) if self.msgpack else dumps(content)
+
+
+JSON_FORMAT = ResponseFormat("application/json", False, False)
+RESPONSE_FORMATS = {
+    "application/json": JSON_FORMAT,
+    "application/msgpack": ResponseFormat("application/msgpack", False, True),
+    "application/x-msgpack": ResponseFormat("application/msgpack", False, True),
+    "application/vnd.fairprice.columnar+json": ResponseFormat("application/vnd.fairprice.columnar+json", True, False),
+    "application/vnd.fairprice.columnar+msgpack": ResponseFormat("application/vnd.fairprice.columnar+msgpack", True, True),
+}
+response_format: ContextVar[ResponseFormat] = ContextVar("response_format", default=JSON_FORMAT)
+
+
+def negotiate(accept: Optional[str]) -> ResponseFormat:
+    """The supported media type with the highest q in an Accept header; JSON unless one is asked for"""
+    best, best_q = JSON_FORMAT, 0.0
+    for part in (accept or "").split(","):
+        media_type, *params = part.split(";")
+        fmt = RESPONSE_FORMATS.get(media_type.strip().lower())
+        if fmt is None or (fmt.msgpack and _msgpack() is None):
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+class FastJSONResponse(Response):
+    """JSON by default; the negotiated compact encoding inside a NegotiatedRoute"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        fmt = response_format.get()
+        self.media_type = fmt.media_type
+        return fmt.encode(content)
+
+
+class NegotiatedRoute(SessionRoute):
+    """
+    Route class for read-mostly payloads that mobile clients pull: the
+    response format follows the Accept header. Pair with
+    `default_response_class=FastJSONResponse` on the router.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def negotiated_handler(request):
+            token = response_format.set(negotiate(request.headers.get("accept")))
+            try:
+                response = await handler(request)
+            finally:
+                response_format.reset(token)
+            response.headers.add_vary_header("Accept")
+            return response
+        return negotiated_handler
+
+
+def _unwrap_optional(annotation):
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _converter(annotation) -> Callable[[Any, dict], Any]:
+    annotation = _unwrap_optional(annotation)
+    if _is_model(annotation):
+        plan = compile_plan(annotation)
+        return lambda v, memo: None if v is None else _apply_shared(plan, v, memo)
+    if typing.get_origin(annotation) in (list, List) and _is_model(typing.get_args(annotation)[0]):
+        plan = compile_plan(typing.get_args(annotation)[0])
+        return lambda v, memo: [_apply(plan, item, memo) for item in v]
+    if annotation is float:
+        return lambda v, memo: None if v is None else float(v)
+    return None
+
+
+@lru_cache(maxsize=None)
+def compile_plan(schema: Type[BaseModel]) -> Tuple[Tuple[str, Callable], ...]:
+    """(field name, converter or None) pairs for a schema, computed once per class"""
+    return tuple((name, _converter(field.annotation)) for name, field in schema.model_fields.items())
+
+
+def _apply(plan, obj, memo: dict) -> dict:
+    out = {}
+    for name, convert in plan:
+        value = getattr(obj, name, None)
+        out[name] = convert(value, memo) if convert else value
+    return out
+
+
+def _apply_shared(plan, obj, memo: dict) -> dict:
+    # Nested many-to-one objects (product, market) repeat across rows; encode each once per call
+    key = id(obj)
+    if key not in memo:
+        memo[key] = _apply(plan, obj, memo)
+    return memo[key]
+
+
+def serialize(obj: Any, schema: Type[BaseModel]) -> dict:
+    return _apply(compile_plan(schema), obj, {})
+
+
+def serialize_many(rows: Iterable[Any], schema: Type[BaseModel]) -> List[dict]:
+    plan = compile_plan(schema)
+    memo: dict = {}
+    return [_apply(plan, row, memo) for row in rows]
+
+
+def fast_or_validated(content: Any, schema: Type[BaseModel], many: bool = False):
+    """
+    Return a pre-encoded FastJSONResponse when FAST_JSON_RESPONSES is on, so
+    FastAPI skips `response_model` validation; otherwise hand `content` back
+    for the normal validated path.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+    return FastJSONResponse(serialize_many(content, schema) if many else serialize(content, schema))
@@ -0,0 +1,231 @@
+"""
+Per-day price stats shared by all worker processes on a host.
+
+A memory-mapped file (in /dev/shm by default) holds a fixed-size open
+addressing table of fixed-layout records keyed by (product, market, day).
+Readers unpack records straight from the mapping without taking a lock;
+each record carries a sequence number that writers make odd while they
+update it (a seqlock), so a reader that races a writer sees the sequence
+change and treats the slot as a miss. Writers are serialized with a thread
+lock inside the process and flock on the file across processes (flock is
+held per open file, so it does not exclude threads sharing the descriptor),
+so there is a single writer at a time.
+
+Each record also carries the version of the rollup row it was built from
+(price_daily_stats.updated_at as epoch seconds, 0 when there was no row).
+A write carrying an older version than the stored record is dropped, so a
+reader that loaded a rollup just before an approval committed cannot
+overwrite the stats the approving worker published.
+
+If the file cannot be created or mapped (or SHARED_CACHE_ENABLED is off),
+`open_day_stats_cache` falls back to a per-process TTLCache with the same
+interface.
+"""
+import fcntl
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Optional
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FPDS"
+VERSION = 2
+HEADER = struct.Struct("<4sII")  # magic, version, slots
+HEADER_SIZE = 64
+# seq, product_id, market_id, day ordinal, count, pad | avg, min, max, p10, median, p90, version, written_at
+RECORD = struct.Struct("<IiiiI4x8d")
+SEQ = struct.Struct("<I")
+MAX_PROBE = 16
+FIELDS = ("avg", "min", "max", "p10", "median", "p90")
+
+DayStats = dict  # {"avg", "min", "max", "count", "p10", "median", "p90"}
+
+
+def _pack_float(v: Optional[float]) -> float:
+    return math.nan if v is None else float(v)
+
+
+def _unpack_float(v: float) -> Optional[float]:
+    return None if math.isnan(v) else v
+
+
+class LocalDayStatsCache:
+    """Per-process fallback"""
+
+    backend = "process"
+
+    def __init__(self, max_entries: int):
+        self._cache = TTLCache(max_entries, ttl=0)
+        self._write_lock = threading.Lock()
+
+    def get(self, product_id: int, market_id: int, day: date, max_age: float) -> Optional[DayStats]:
+        item = self._cache.get((product_id, market_id, day))
+        return item[1] if item is not None else None
+
+    def put(self, product_id: int, market_id: int, day: date, stats: DayStats, max_age: float, version: float = 0.0) -> bool:
+        key = (product_id, market_id, day)
+        with self._write_lock:
+            current = self._cache.peek(key)
+            if current is not None and current[0] > version:
+                return False
+            self._cache.set(key, (version, stats), ttl=max_age)
+            return True
+
+    def discard(self, product_id: int, market_id: int, day: date) -> None:
+        key = (product_id, market_id, day)
+        self._cache.invalidate(lambda k: k == key)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, **self._cache.stats()}
+
+
+class SharedDayStatsCache:
+    backend = "shared_memory"
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.slots = slots
+        self.size = HEADER_SIZE + slots * RECORD.size
+        self._fd = self._open_file()
+        self._thread_lock = threading.Lock()
+        try:
+            self._map = mmap.mmap(self._fd, self.size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        except Exception:
+            os.close(self._fd)
+            raise
+        self.hits = 0
+        self.misses = 0
+        self.torn_reads = 0
+
+    def _open_file(self) -> int:
+        """Open (or create and size) the table; a file with another layout is replaced"""
+        for _ in range(2):
+            fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, HEADER.pack(MAGIC, VERSION, self.slots), 0)
+                    return fd
+                raw = os.pread(fd, HEADER.size, 0)
+                if os.fstat(fd).st_size == self.size and HEADER.unpack(raw) == (MAGIC, VERSION, self.slots):
+                    return fd
+                # Workers still running an old deploy keep their mapping of the unlinked file
+                os.unlink(self.path)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        raise OSError(f"Could not initialise shared stats cache at {self.path}")
+
+    @contextmanager
+    def _write_lock(self):
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offsets(self, product_id: int, market_id: int, day_ordinal: int):
+        # Explicit mixing rather than hash(): must agree across processes
+        start = ((product_id * 1000003) ^ (market_id * 8191) ^ (day_ordinal * 2654435761)) % self.slots
+        for i in range(MAX_PROBE):
+            yield HEADER_SIZE + ((start + i) % self.slots) * RECORD.size
+
+    def _read(self, offset: int) -> Optional[tuple]:
+        """Consistent snapshot of one record, or None if a writer was mid-update"""
+        for _ in range(3):
+            record = RECORD.unpack_from(self._map, offset)
+            if record[0] & 1 == 0 and SEQ.unpack_from(self._map, offset)[0] == record[0]:
+                return record
+        self.torn_reads += 1
+        return None
+
+    def get(self, product_id: int, market_id: int, day: date, max_age: float) -> Optional[DayStats]:
+        ordinal = day.toordinal()
+        for offset in self._offsets(product_id, market_id, ordinal):
+            record = self._read(offset)
+            if record is None:
+                break
+            seq, pid, mid, day_ordinal, count, *values, _version, written_at = record
+            if seq == 0:
+                break  # never written: the key is not in the table
+            if (pid, mid, day_ordinal) == (product_id, market_id, ordinal):
+                if time.time() - written_at > max_age:
+                    break
+                self.hits += 1
+                return {"count": count, **{f: _unpack_float(v) for f, v in zip(FIELDS, values)}}
+        self.misses += 1
+        return None
+
+    def put(self, product_id: int, market_id: int, day: date, stats: DayStats, max_age: float, version: float = 0.0) -> bool:
+        """Store stats built from the rollup at `version`; False if a newer version is already stored"""
+        ordinal = day.toordinal()
+        now = time.time()
+        with self._write_lock():
+            target, oldest = None, None
+            for offset in self._offsets(product_id, market_id, ordinal):
+                seq, pid, mid, day_ordinal, *_, stored_version, written_at = RECORD.unpack_from(self._map, offset)
+                if seq == 0:
+                    target = offset
+                    break
+                if (pid, mid, day_ordinal) == (product_id, market_id, ordinal):
+                    if stored_version > version:
+                        return False
+                    target = offset
+                    break
+                if oldest is None or written_at < oldest[1]:
+                    oldest = (offset, written_at)
+            if target is None:
+                target = oldest[0]  # probe window full: evict the stalest record
+            seq = SEQ.unpack_from(self._map, target)[0]
+            SEQ.pack_into(self._map, target, seq + 1)  # odd: readers back off
+            RECORD.pack_into(
+                self._map, target, seq + 1, product_id, market_id, ordinal, stats["count"],
+                *(_pack_float(stats[f]) for f in FIELDS), version, now,
+            )
+            SEQ.pack_into(self._map, target, seq + 2)
+            return True
+
+    def discard(self, product_id: int, market_id: int, day: date) -> None:
+        ordinal = day.toordinal()
+        with self._write_lock():
+            for offset in self._offsets(product_id, market_id, ordinal):
+                seq, pid, mid, day_ordinal, *_ = RECORD.unpack_from(self._map, offset)
+                if seq == 0:
+                    return
+                if (pid, mid, day_ordinal) == (product_id, market_id, ordinal):
+                    # Keep the slot occupied (probe chains stay intact) but expired
+                    SEQ.pack_into(self._map, offset, seq + 1)
+                    struct.pack_into("<d", self._map, offset + RECORD.size - 8, 0.0)
+                    SEQ.pack_into(self._map, offset, seq + 2)
+                    return
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "slots": self.slots,
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "torn_reads": self.torn_reads,
+        }
+
+
+def open_day_stats_cache(enabled: bool, path: str, slots: int):
+    if enabled:
+        try:
+            return SharedDayStatsCache(path, slots)
+        except OSError:
+            logger.warning("Shared stats cache unavailable at %s; using a per-process cache", path, exc_info=True)
+    return LocalDayStatsCache(slots)
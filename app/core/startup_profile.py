@@ -0,0 +1,125 @@
+"""
+Cold-start profiler.
+
+With STARTUP_PROFILE=1 in the environment, `install()` (called at the very
+top of app.main) puts a timing finder in front of sys.meta_path, recording
+the self and cumulative import time of every module loaded afterwards.
+Initialization steps in the lifespan are recorded with `phase()`. The report
+is logged once startup finishes and served at /api/v1/admin/system/startup.
+"""
+import importlib.abc
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_process_started = time.perf_counter()
+_imports: Dict[str, Dict[str, float]] = {}
+_phases: List[dict] = []
+_stack: List[list] = []
+_finder: Optional["_TimingFinder"] = None
+
+
+def enabled() -> bool:
+    return os.environ.get("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader):
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        frame = [0.0]  # time spent in nested imports
+        _stack.append(frame)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter() - started
+            _stack.pop()
+            if _stack:
+                _stack[-1][0] += total
+            _imports[module.__name__] = {
+                "self_ms": round((total - frame[0]) * 1000, 3),
+                "cumulative_ms": round(total * 1000, 3),
+            }
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def install() -> None:
+    global _finder
+    if _finder is None and enabled():
+        _finder = _TimingFinder()
+        sys.meta_path.insert(0, _finder)
+
+
+def uninstall() -> None:
+    global _finder
+    if _finder is not None:
+        sys.meta_path.remove(_finder)
+        _finder = None
+
+
+@contextmanager
+def phase(name: str):
+    """Time one initialization step; always recorded, it is cheap"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append({"phase": name, "ms": round((time.perf_counter() - started) * 1000, 3)})
+
+
+def _group(module: str) -> str:
+    return module if module.startswith("app.") else module.split(".")[0]
+
+
+def report(top: int = 25) -> dict:
+    by_package: Dict[str, float] = {}
+    for name, t in _imports.items():
+        key = _group(name)
+        by_package[key] = by_package.get(key, 0.0) + t["self_ms"]
+    slowest = sorted(_imports.items(), key=lambda kv: kv[1]["self_ms"], reverse=True)[:top]
+    return {
+        "import_profiling": _finder is not None,
+        "since_process_start_ms": round((time.perf_counter() - _process_started) * 1000, 3),
+        "modules_timed": len(_imports),
+        "import_total_ms": round(sum(t["self_ms"] for t in _imports.values()), 3),
+        "by_package_ms": dict(sorted(
+            ((k, round(v, 3)) for k, v in by_package.items()), key=lambda kv: kv[1], reverse=True
+        )[:top]),
+        "slowest_modules": [{"module": name, **t} for name, t in slowest],
+        "phases": _phases,
+    }
+
+
+def log_report() -> None:
+    if _finder is None:
+        return
+    r = report(top=10)
+    logger.warning(
+        "Startup profile: %d modules, %.1f ms imports; phases %s; top %s",
+        r["modules_timed"], r["import_total_ms"], r["phases"], r["by_package_ms"],
+    )
@@ -2,14 +2,31 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import TimedQueuePool, instrument
+from app.db.request_scope import track, watch_writes
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, pool_size=10, max_overflow=20)
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
+instrument(engine)
+watch_writes(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
 def get_db():
+    """
+    Session for one request. It is lazy: no connection is checked out until
+    the first query, so requests rejected before touching the DB (auth
+    failures, validation errors) never take one. SessionRoute ends its
+    transaction as soon as the endpoint returns.
+    """
     db = SessionLocal()
+    track(db)
     try:
         yield db
     finally:
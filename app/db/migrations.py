@@ -0,0 +1,58 @@
+import os
+import re
+from typing import Optional
+
+from sqlalchemy import text
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic", "versions")
+_REVISION = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.M)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*['\"]([^'\"]+)['\"]", re.M)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def head_revision(versions_dir: str = VERSIONS_DIR) -> str:
+    """
+    Head of the migration chain, read from the revision files with a regex so
+    that booting does not import alembic or every migration module.
+    """
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name), encoding="utf-8") as f:
+            source = f.read()
+        rev = _REVISION.search(source)
+        if rev:
+            revisions.add(rev.group(1))
+        parents.update(_DOWN_REVISION.findall(source))
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise SchemaVersionError(f"Expected one migration head, found {sorted(heads)}")
+    return heads.pop()
+
+
+def current_revision(engine) -> Optional[str]:
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except Exception:
+            return None
+
+
+def check_schema_version(engine) -> str:
+    """Fail fast if the database is not migrated to the revision this code expects"""
+    expected, actual = head_revision(), current_revision(engine)
+    if actual is None:
+        raise SchemaVersionError(
+            f"Database has no Alembic revision but the code expects {expected!r}; run `alembic upgrade head` "
+            f"(a database created by create_all before migrations is adopted as revision 0001)"
+        )
+    if actual != expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {actual!r} but the code expects {expected!r}; "
+            f"run `alembic upgrade head` before starting in fast-boot mode"
+        )
+    return actual
@@ -0,0 +1,147 @@
+"""
+Connection pool instrumentation.
+
+TimedQueuePool measures how long each checkout waits for a connection (and
+how many threads are waiting right now); pool events attribute the time a
+connection stays checked out to the route that holds it. Both are served
+at /api/v1/admin/system/pool.
+"""
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+RECENT_WAITS = 2000
+BACKGROUND = "background"  # checkouts outside a request: scheduler, warm-up, CLI
+
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class WaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=RECENT_WAITS)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._recent.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = list(self._recent)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "waiting_now": self.waiting,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else None,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "recent_p50_wait_ms": round(_percentile(recent, 0.50) * 1000, 3) if recent else None,
+                "recent_p95_wait_ms": round(_percentile(recent, 0.95) * 1000, 3) if recent else None,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records the time spent acquiring each connection"""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.wait_stats = WaitStats()
+        self._nested = threading.local()
+
+    def _do_get(self):
+        if getattr(self._nested, "active", False):
+            return super()._do_get()  # QueuePool retries by recursing; time only the outer call
+        self._nested.active = True
+        with self.wait_stats._lock:
+            self.wait_stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            with self.wait_stats._lock:
+                self.wait_stats.timeouts += 1
+            raise
+        finally:
+            self._nested.active = False
+            with self.wait_stats._lock:
+                self.wait_stats.waiting -= 1
+        self.wait_stats.add(time.perf_counter() - started)
+        return record
+
+
+class RouteHoldStats:
+    """How long connections stay checked out, per route template"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, list] = {}  # route -> [checkouts, total seconds, max seconds]
+
+    def add(self, route: str, seconds: float) -> None:
+        with self._lock:
+            stats = self._routes.setdefault(route, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def top(self, n: int = 20) -> list:
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "checkouts": count,
+                    "avg_hold_ms": round(total / count * 1000, 3),
+                    "max_hold_ms": round(longest * 1000, 3),
+                    "total_hold_ms": round(total * 1000, 3),
+                }
+                for route, (count, total, longest) in self._routes.items()
+            ]
+        return sorted(rows, key=lambda r: r["total_hold_ms"], reverse=True)[:n]
+
+
+route_holds = RouteHoldStats()
+
+
+def instrument(engine) -> None:
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        record.info["checked_out_at"] = time.perf_counter()
+        record.info["route"] = current_route.get() or BACKGROUND
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        started = record.info.pop("checked_out_at", None)
+        if started is not None:
+            route_holds.add(record.info.pop("route", BACKGROUND), time.perf_counter() - started)
+
+
+def pool_status(engine, max_overflow: int) -> dict:
+    pool = engine.pool
+    wait_stats = getattr(pool, "wait_stats", None)
+    return {
+        "size": pool.size(),
+        "max_overflow": max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "waits": wait_stats.snapshot() if wait_stats else None,
+        "routes_by_hold_time": route_holds.top(),
+    }
@@ -0,0 +1,103 @@
+"""
+Request-scoped session handling.
+
+`SessionRoute` is the route class of every API router. It tags the request
+with its route template (for per-route connection hold times) and, once the
+endpoint function returns, ends the read-only transaction of each session
+the request opened, so the connection goes back to the pool before the
+response is validated and serialized. Loaded objects stay usable; anything
+serialization lazy-loads afterwards checks a connection out again briefly.
+
+Only transactions that ran nothing but SELECTs are ended that way (with a
+commit, which unlike a rollback leaves loaded objects unexpired). A
+transaction holding writes the endpoint did not commit, from a flush or a
+Core execute, is left for Session.close() to roll back as before.
+"""
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.pool import current_route
+
+# A list shared by the request task and the threadpool threads it uses
+# (they run with a copy of the context, which still points at the same list)
+request_sessions: ContextVar[Optional[List[Session]]] = ContextVar("request_sessions", default=None)
+WROTE = "request_scope.wrote"  # connection.info key, set by watch_writes
+
+
+def track(session: Session) -> None:
+    sessions = request_sessions.get()
+    if sessions is not None:
+        sessions.append(session)
+
+
+def _is_read(statement: str) -> bool:
+    return statement.lstrip(" \t\r\n(").upper().startswith("SELECT")
+
+
+def watch_writes(engine: Engine) -> None:
+    """Flag a connection's transaction once it executes anything but a SELECT"""
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.info.pop(WROTE, None)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if not _is_read(statement):
+            conn.info[WROTE] = True
+
+
+def release_connections() -> None:
+    """Return the connections of this request's read-only sessions to the pool, keeping loaded state"""
+    for session in request_sessions.get() or ():
+        if not session.in_transaction() or session.new or session.dirty or session.deleted:
+            continue
+        if session.connection().info.get(WROTE):
+            continue  # uncommitted writes: close() rolls them back
+        session.expire_on_commit = False
+        session.commit()  # nothing was written: just ends the transaction
+
+
+def _release_after(endpoint: Callable) -> Callable:
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            release_connections()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            release_connections()
+            return result
+    wrapper.releases_connections = True
+    return wrapper
+
+
+class SessionRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if not getattr(endpoint, "releases_connections", False):  # include_router re-adds wrapped endpoints
+            endpoint = _release_after(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path_format
+
+        async def scoped_handler(request):
+            route_token = current_route.set(f"{request.method} {route}")
+            sessions_token = request_sessions.set([])
+            try:
+                return await handler(request)
+            finally:
+                request_sessions.reset(sessions_token)
+                current_route.reset(route_token)
+        return scoped_handler
@@ -1,10 +1,55 @@
+from app.core import startup_profile
+startup_profile.install()  # no-op unless STARTUP_PROFILE=1; must run before the heavy imports below
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
+from app.core.admission import AdmissionControlMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.scheduler import scheduler
 from app.db.database import engine, Base
+from app.db.migrations import check_schema_version
+from app.services import product_search, warmup_service
+from app.services.maintenance_jobs import register_jobs
 
 # Import all models so SQLAlchemy creates tables
-from app.models import user, market, price_entry  # noqa
+from app.models import user, market, price_entry, price_stats, price_event  # noqa
+
+
+# ─── Lifespan ────────────────────────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.FAST_BOOT or settings.ENVIRONMENT == "production":
+        with startup_profile.phase("schema_version_check"):
+            check_schema_version(engine)
+    else:
+        with startup_profile.phase("create_all"):
+            Base.metadata.create_all(bind=engine)
+    with startup_profile.phase("product_search_index"):
+        await asyncio.to_thread(product_search.rebuild)
+    if settings.SCHEDULER_ENABLED:
+        with startup_profile.phase("scheduler_start"):
+            register_jobs(scheduler)
+            await scheduler.start()
+    if settings.WARMUP_ENABLED:
+        # Runs in the background: "/" answers immediately, "/ready" flips once warm
+        warmup = asyncio.create_task(warmup_service.warm_analytics_cache())
+    else:
+        warmup_service.state["ready"] = True
+    startup_profile.uninstall()
+    startup_profile.log_report()
+    yield
+    if settings.WARMUP_ENABLED:
+        warmup.cancel()
+        warmup_service.save_hot_keys()
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.stop()
+
 
 app = FastAPI(
     title="FairPrice Tracker API",
@@ -12,8 +57,23 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
+# ─── Admission control ───────────────────────────────────────────────────────
+# Added before CORS so that CORS wraps it and 503/429 responses carry CORS headers
+app.add_middleware(AdmissionControlMiddleware)
+
+# ─── Idempotency keys ────────────────────────────────────────────────────────
+# Outside admission control: replayed retries skip the queue and the rate limit
+app.add_middleware(IdempotencyMiddleware)
+
+# ─── Compression ─────────────────────────────────────────────────────────────
+# Outside idempotency, so stored responses stay uncompressed and each replay
+# is encoded for the retrying client
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # ─── CORS ────────────────────────────────────────────────────────────────────
 # Update origins in production to your Vercel frontend URL
 app.add_middleware(
@@ -24,12 +84,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ─── Create Tables ───────────────────────────────────────────────────────────
-@app.on_event("startup")
-def create_tables():
-    Base.metadata.create_all(bind=engine)
-
-
 # ─── Routes ──────────────────────────────────────────────────────────────────
 app.include_router(api_router)
 
@@ -37,3 +91,13 @@ app.include_router(api_router)
 @app.get("/", tags=["Health"])
 def health_check():
     return {"status": "ok", "app": "FairPrice Tracker", "version": "1.0.0"}
+
+
+@app.get("/ready", tags=["Health"])
+def readiness_check():
+    """Readiness for load balancers: 503 until the analytics warm-up has finished"""
+    ready = warmup_service.state["ready"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "warmup": warmup_service.state},
+    )
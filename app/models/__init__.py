@@ -1,3 +1,6 @@
 from app.models.user import User, UserRole
 from app.models.market import City, Market, Product, ProductCategory
 from app.models.price_entry import PriceEntry, VendorProfile, ApprovalStatus
+from app.models.price_stats import PriceDailyStat, PriceForecast
+from app.models.price_event import PriceEvent, PriceEventConsumer, PriceEventType
+from app.models.idempotency import IdempotencyKey
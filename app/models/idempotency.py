@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, LargeBinary
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Response stored for an Idempotency-Key, shared by every worker. A row
+    with no status is a claim: the request is still running somewhere.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_created_at", "created_at"),  # expiry pruning
+    )
+
+    key = Column(LargeBinary(16), primary_key=True)  # digest of caller, path and header value
+    fingerprint = Column(LargeBinary(16), nullable=False)  # digest of the request body
+    status = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)  # [[name, value], ...] as latin-1 text
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # claimed at
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, Enum, Date
+from sqlalchemy import Index, UniqueConstraint, Column, Integer, String, Boolean, DateTime, ForeignKey, Numeric, Text, Enum, Date, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -27,17 +27,28 @@ class VendorProfile(Base):
 
 class PriceEntry(Base):
     __tablename__ = "price_entries"
+    __table_args__ = (
+        # One entry per vendor, product, market and day; resubmissions update it in place
+        UniqueConstraint("vendor_id", "product_id", "market_id", "entry_date",
+                         name="uq_price_entries_vendor_product_market_date"),
+        # City-scoped aggregates (fluctuation, pending checks) read only this index
+        Index("ix_price_entries_city_product_date", "city_id", "product_id", "entry_date",
+              postgresql_include=["status", "price_per_unit", "market_id"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vendor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     market_id = Column(Integer, ForeignKey("markets.id"), nullable=False)
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False)  # copy of market.city_id, set on insert
     price_per_unit = Column(Numeric(10, 2), nullable=False)
     entry_date = Column(Date, nullable=False, server_default=func.current_date())
     status = Column(Enum(ApprovalStatus), nullable=False, default=ApprovalStatus.pending)
     admin_note = Column(Text, nullable=True)
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
+    screening_score = Column(Float, nullable=True)  # robust z-score from the last screening run
+    flagged = Column(Boolean, nullable=False, default=False, server_default="false")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
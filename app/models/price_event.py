@@ -0,0 +1,49 @@
+from sqlalchemy import BigInteger, Column, Date, DateTime, Enum, Index, Integer, Numeric, String
+from sqlalchemy.sql import func
+import enum
+from app.db.database import Base
+from app.models.price_entry import ApprovalStatus
+
+
+class PriceEventType(str, enum.Enum):
+    submitted = "submitted"
+    resubmitted = "resubmitted"  # an existing, unapproved entry was submitted again
+    updated = "updated"  # vendor edited a pending entry
+    reviewed = "reviewed"  # admin set the status
+    auto_approved = "auto_approved"  # statistical screening
+    expired = "expired"  # rejected after STALE_PENDING_DAYS without review
+
+
+class PriceEvent(Base):
+    """
+    Append-only outbox of price entry changes, written in the transaction
+    that makes the change. `id` is the sequence number consumers read after;
+    the row is a snapshot of the entry as committed. No foreign keys, so the
+    log outlives whatever it describes.
+    """
+    __tablename__ = "price_events"
+    __table_args__ = (
+        Index("ix_price_events_created_at", "created_at", postgresql_using="brin"),  # retention pruning
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    event_type = Column(String(20), nullable=False)
+    entry_id = Column(Integer, nullable=False)
+    vendor_id = Column(Integer, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    market_id = Column(Integer, nullable=False)
+    city_id = Column(Integer, nullable=False)
+    entry_date = Column(Date, nullable=False)
+    status = Column(Enum(ApprovalStatus), nullable=False)
+    price_per_unit = Column(Numeric(10, 2), nullable=False)
+    actor_id = Column(Integer, nullable=True)  # reviewing admin; None for vendor actions and jobs
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class PriceEventConsumer(Base):
+    """Last event a named consumer has processed"""
+    __tablename__ = "price_event_consumers"
+
+    name = Column(String(100), primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
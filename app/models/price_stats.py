@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, Date, DateTime, Float, ForeignKey, JSON, Numeric, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class PriceDailyStat(Base):
+    """Per (product, market, day) rollup of approved entries, with a mergeable quantile sketch"""
+    __tablename__ = "price_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("product_id", "market_id", "stat_date", name="uq_price_daily_stats_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    market_id = Column(Integer, ForeignKey("markets.id"), nullable=False)
+    stat_date = Column(Date, nullable=False)
+    entry_count = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Numeric(14, 2), nullable=False, default=0)  # for count-weighted averages
+    min_price = Column(Numeric(10, 2), nullable=True)
+    max_price = Column(Numeric(10, 2), nullable=True)
+    sketch = Column(JSON, nullable=False)  # QuantileSketch.to_dict()
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PriceForecast(Base):
+    """Nightly Holt forecast for one (product, market) and target day, with a 95% interval"""
+    __tablename__ = "price_forecasts"
+    __table_args__ = (
+        UniqueConstraint("product_id", "market_id", "target_date", name="uq_price_forecasts_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    market_id = Column(Integer, ForeignKey("markets.id"), nullable=False)
+    target_date = Column(Date, nullable=False)
+    horizon = Column(Integer, nullable=False)  # days after fitted_through
+    point = Column(Float, nullable=False)
+    lower = Column(Float, nullable=False)
+    upper = Column(Float, nullable=False)
+    fitted_through = Column(Date, nullable=False)  # last day of history used
+    observations = Column(Integer, nullable=False)  # days with approved prices in the history window
+    alpha = Column(Float, nullable=False)
+    beta = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
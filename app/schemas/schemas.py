@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
@@ -20,6 +20,21 @@ class ApprovalStatusEnum(str, Enum):
     rejected = "rejected"
 
 
+class PriceEventTypeEnum(str, Enum):
+    submitted = "submitted"
+    resubmitted = "resubmitted"
+    updated = "updated"
+    reviewed = "reviewed"
+    auto_approved = "auto_approved"
+    expired = "expired"
+
+
+class TrendBucketEnum(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
 # ─── Auth ────────────────────────────────────────────────────────────────────
 
 class UserRegister(BaseModel):
@@ -115,6 +130,12 @@ class ProductOut(BaseModel):
         from_attributes = True
 
 
+class ProductSearchHit(BaseModel):
+    product: ProductOut
+    score: float
+    matched_field: str  # name, name_marathi, category or category_marathi
+
+
 class CategoryCreate(BaseModel):
     name: str
     name_marathi: Optional[str] = None
@@ -156,6 +177,8 @@ class PriceEntryOut(BaseModel):
     entry_date: date
     status: ApprovalStatusEnum
     admin_note: Optional[str]
+    screening_score: Optional[float] = None
+    flagged: bool = False
     created_at: datetime
     product: Optional[ProductOut]
     market: Optional[MarketOut]
@@ -164,6 +187,111 @@ class PriceEntryOut(BaseModel):
         from_attributes = True
 
 
+class VendorProductStats(BaseModel):
+    product_id: int
+    product_name: str
+    unit: str
+    market_id: int
+    market_name: str
+    latest_date: date
+    latest_price: float
+    latest_status: ApprovalStatusEnum
+    latest_market_avg: Optional[float]  # approved average that day, None if none approved yet
+    latest_deviation_pct: Optional[float]
+    deviation_30d_pct: Optional[float]  # mean of per-entry deviations from the day's market average
+    deviation_prev_30d_pct: Optional[float]
+    deviation_all_time_pct: Optional[float]
+    compared_entries: int  # entries that had a market average to compare with
+    submissions: int
+    approved: int
+    rejected: int
+    pending: int
+    approval_rate: Optional[float]  # approved / reviewed
+
+
+class VendorStats(BaseModel):
+    vendor_id: int
+    as_of: date
+    submissions: int
+    approved: int
+    rejected: int
+    pending: int
+    approval_rate: Optional[float]
+    products: List[VendorProductStats]  # most recently submitted first
+
+
+class FlaggedEntry(BaseModel):
+    entry_id: int
+    price_per_unit: float
+    median: float
+    score: float
+
+
+class ScreeningReport(BaseModel):
+    dry_run: bool
+    band: float
+    window_days: int
+    scanned: int
+    auto_approved: int
+    flagged: int
+    skipped: int
+    top_flagged: List[FlaggedEntry]
+    timing_ms: dict
+
+
+class FacetCount(BaseModel):
+    value: Union[int, str]
+    label: Optional[str] = None
+    count: int
+    exact: bool
+
+
+class SubmissionFacets(BaseModel):
+    total: int
+    total_exact: bool
+    method: str  # "exact" or "sampled"
+    status: List[FacetCount]
+    market: List[FacetCount]
+    product: List[FacetCount]
+
+
+# ─── Price Events ────────────────────────────────────────────────────────────
+
+class PriceEventOut(BaseModel):
+    id: int  # sequence number; pass the last one seen as `after`
+    event_type: PriceEventTypeEnum
+    entry_id: int
+    vendor_id: int
+    product_id: int
+    market_id: int
+    city_id: int
+    entry_date: date
+    status: ApprovalStatusEnum  # entry status after the change
+    price_per_unit: Decimal
+    actor_id: Optional[int]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PriceEventPage(BaseModel):
+    events: List[PriceEventOut]
+    next_cursor: int
+    has_more: bool
+
+
+class EventConsumerOut(BaseModel):
+    name: str
+    last_event_id: int
+    lag: int  # events committed after the cursor
+    updated_at: Optional[datetime]
+
+
+class EventCursorUpdate(BaseModel):
+    last_event_id: int = Field(..., ge=0)  # lower it to replay
+
+
 # ─── Analytics ───────────────────────────────────────────────────────────────
 
 class MarketStats(BaseModel):
@@ -173,6 +301,9 @@ class MarketStats(BaseModel):
     avg_price: Optional[float]
     min_price: Optional[float]
     max_price: Optional[float]
+    p10_price: Optional[float] = None
+    median_price: Optional[float] = None
+    p90_price: Optional[float] = None
     vendor_count: int
     spike_alert: bool
 
@@ -185,6 +316,15 @@ class PriceTrend(BaseModel):
     vendor_count: int
 
 
+class TrendSeries(BaseModel):
+    product_id: int
+    market_id: int
+    from_date: date
+    to_date: date
+    bucket: str  # "day", "week", "month" or "<n>d" when sized from a target point count
+    points: List[PriceTrend]
+
+
 class ProductAnalytics(BaseModel):
     product_id: int
     product_name: str
@@ -192,7 +332,97 @@ class ProductAnalytics(BaseModel):
     today_avg: Optional[float]
     today_min: Optional[float]
     today_max: Optional[float]
+    today_p10: Optional[float] = None
+    today_median: Optional[float] = None
+    today_p90: Optional[float] = None
     vendor_count: int
     moving_avg_7d: Optional[float]
     spike_alert: bool
     trend_30d: List[PriceTrend]
+
+
+class ForecastPoint(BaseModel):
+    target_date: date
+    horizon: int  # days after fitted_through
+    point: float
+    lower: float  # 95% interval
+    upper: float
+
+
+class PriceForecastSeries(BaseModel):
+    product_id: int
+    market_id: int
+    market_name: str
+    fitted_through: date
+    observations: int
+    alpha: float
+    beta: float
+    points: List[ForecastPoint]
+
+
+class ProductMarketPair(BaseModel):
+    product_id: int
+    market_id: int
+
+
+class BatchAnalyticsRequest(BaseModel):
+    pairs: List[ProductMarketPair] = Field(..., min_length=1, max_length=100)
+    as_of: Optional[date] = None
+
+
+class BatchAnalyticsItem(BaseModel):
+    product_id: int
+    market_id: int
+    analytics: ProductAnalytics
+
+
+class PricePercentiles(BaseModel):
+    product_id: int
+    market_id: Optional[int]
+    city_id: Optional[int]
+    from_date: date
+    to_date: date
+    entry_count: int
+    p10: Optional[float]
+    median: Optional[float]
+    p90: Optional[float]
+    relative_error: float
+
+
+class BasketItem(BaseModel):
+    product_id: int
+    quantity: Decimal = Field(..., gt=0, le=1000)  # in the product's unit
+
+
+class BasketRequest(BaseModel):
+    city_id: int
+    items: List[BasketItem] = Field(..., min_length=1, max_length=50)
+    max_age_days: int = Field(7, ge=0, le=30)  # how stale a market's latest price may be
+
+
+class BasketLine(BaseModel):
+    product_id: int
+    quantity: float
+    unit_price: float
+    line_cost: float
+    price_date: date
+
+
+class MarketBasket(BaseModel):
+    rank: int
+    market_id: int
+    market_name: str
+    area: str
+    total_cost: float  # over the priced items only
+    items_priced: int
+    items_missing: List[int]
+    coverage: float
+    complete: bool
+    lines: List[BasketLine]
+
+
+class BasketComparison(BaseModel):
+    city_id: int
+    item_count: int
+    priced_since: date
+    markets: List[MarketBasket]  # complete baskets first, cheapest first
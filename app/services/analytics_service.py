@@ -1,96 +1,342 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Numeric, text
+from sqlalchemy import func, cast, tuple_, Numeric, Date, Integer, text
+from fastapi import HTTPException
 from datetime import date, timedelta
-from typing import List, Optional
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from app.models.price_entry import PriceEntry, ApprovalStatus
 from app.models.market import Market, Product
-from app.schemas.schemas import MarketStats, PriceTrend, ProductAnalytics
+from app.models.price_stats import PriceDailyStat, PriceForecast
+from app.models.price_event import PriceEvent, PriceEventType
+from app.core.cache import TTLCache, HotKeyCounter
+from app.core.shared_cache import open_day_stats_cache
+from app.core.config import settings
+from app.schemas.schemas import (
+    MarketStats, PriceTrend, ProductAnalytics, PricePercentiles, TrendSeries,
+    BasketItem, BasketLine, MarketBasket, BasketComparison, ProductMarketPair, BatchAnalyticsItem,
+)
+from app.services.daily_stats_service import merged_sketch
+from app.services.event_service import latest_event_id
+from app.services.quantile_sketch import QuantileSketch
 
 
 SPIKE_THRESHOLD = 0.20  # 20% above 7-day moving average
+LOOKBACK_DAYS = 30  # widest window any analytics response reads (trend, volatility)
 
+# Keys are (kind, product_id, scope, as_of). Results for today, or for past dates
+# that still have pending entries, live in the short-TTL cache; fully reviewed
+# past dates go to the long-lived one and are only dropped by late approvals.
+analytics_cache = TTLCache(settings.ANALYTICS_CACHE_MAX_ENTRIES, settings.ANALYTICS_CACHE_TTL)
+history_cache = TTLCache(settings.ANALYTICS_HISTORY_CACHE_MAX_ENTRIES, settings.ANALYTICS_HISTORY_CACHE_TTL)
+hot_keys = HotKeyCounter()  # ("product", product_id, market_id) / ("all_markets", product_id, city_id)
+# Approvals made by other workers reach this one through the event log: readers
+# poll it every ANALYTICS_INVALIDATION_POLL_SECONDS (sync_invalidations). The
+# generation counts invalidations, so a result computed while one ran is not
+# kept long term.
+INVALIDATING_EVENTS = (PriceEventType.reviewed.value, PriceEventType.auto_approved.value)
+_event_cursor: Optional[int] = None
+_next_poll = 0.0
+_poll_lock = threading.Lock()
+_generation = 0
+# Per (product, market, day) stats, shared across workers on a host; refreshed by the worker
+# that approves and dropped by the others when they see the approval (sync_invalidations)
+day_stats_cache = open_day_stats_cache(
+    settings.SHARED_CACHE_ENABLED, settings.SHARED_CACHE_PATH, settings.SHARED_CACHE_SLOTS,
+)
 
-def get_product_market_stats_today(db: Session, product_id: int, market_id: int) -> dict:
+
+def _percentiles(sketch: QuantileSketch) -> dict:
+    def q(p):
+        v = sketch.quantile(p)
+        return round(v, 2) if v is not None else None
+    return {"p10": q(0.10), "median": q(0.50), "p90": q(0.90)}
+
+
+def _resolve_as_of(as_of: Optional[date]) -> date:
     today = date.today()
-    row = (
-        db.query(
-            func.avg(PriceEntry.price_per_unit).label("avg"),
-            func.min(PriceEntry.price_per_unit).label("min"),
-            func.max(PriceEntry.price_per_unit).label("max"),
-            func.count(PriceEntry.id).label("count"),
-        )
-        .filter(
-            PriceEntry.product_id == product_id,
-            PriceEntry.market_id == market_id,
-            PriceEntry.status == ApprovalStatus.approved,
-            PriceEntry.entry_date == today,
-        )
-        .one()
-    )
+    if as_of is None:
+        return today
+    if as_of > today:
+        raise HTTPException(status_code=400, detail="'as_of' cannot be in the future")
+    return as_of
+
+
+def _day_stats_max_age(day: date) -> float:
+    # Today's rows change with every approval (possibly on another host)
+    return settings.ANALYTICS_CACHE_TTL if day >= date.today() else settings.ANALYTICS_HISTORY_CACHE_TTL
+
+
+def _day_stats_from_rollup(row: Optional[PriceDailyStat]) -> dict:
+    if row is None or not row.entry_count:
+        return {"avg": None, "min": None, "max": None, "count": 0, "p10": None, "median": None, "p90": None}
     return {
-        "avg": float(row.avg) if row.avg else None,
-        "min": float(row.min) if row.min else None,
-        "max": float(row.max) if row.max else None,
-        "count": row.count,
+        "avg": float(row.price_sum) / row.entry_count,
+        "min": float(row.min_price),
+        "max": float(row.max_price),
+        "count": row.entry_count,
+        **_percentiles(QuantileSketch.from_dict(row.sketch)),
     }
 
 
-def get_7day_moving_average(db: Session, product_id: int, market_id: int) -> Optional[float]:
-    today = date.today()
-    since = today - timedelta(days=7)
-    row = (
-        db.query(func.avg(PriceEntry.price_per_unit))
-        .filter(
-            PriceEntry.product_id == product_id,
-            PriceEntry.market_id == market_id,
-            PriceEntry.status == ApprovalStatus.approved,
-            PriceEntry.entry_date >= since,
-            PriceEntry.entry_date < today,
+def _rollup_version(row: Optional[PriceDailyStat]) -> float:
+    return row.updated_at.timestamp() if row is not None and row.updated_at is not None else 0.0
+
+
+def get_day_stats(
+    db: Session, pairs: Iterable[Tuple[int, int]], since: date, until: date,
+) -> Dict[Tuple[int, int, date], dict]:
+    """
+    Approved price stats for every (product, market) pair and day in
+    [since, until], from the shared cache where present. The rest come from
+    one rollup query and are cached, tagged with their rollup version, for
+    the other workers. Days without approved prices have count 0.
+    """
+    days = [since + timedelta(days=i) for i in range((until - since).days + 1)]
+    stats, missing = {}, []
+    for pid, mid in pairs:
+        for day in days:
+            cached = day_stats_cache.get(pid, mid, day, _day_stats_max_age(day))
+            if cached is None:
+                missing.append((pid, mid, day))
+            else:
+                stats[(pid, mid, day)] = cached
+    if missing:
+        rows = {
+            (r.product_id, r.market_id, r.stat_date): r
+            for r in db.query(PriceDailyStat).filter(
+                tuple_(PriceDailyStat.product_id, PriceDailyStat.market_id).in_({k[:2] for k in missing}),
+                PriceDailyStat.stat_date >= min(k[2] for k in missing),
+                PriceDailyStat.stat_date <= max(k[2] for k in missing),
+            )
+        }
+        for key in missing:
+            row = rows.get(key)
+            stats[key] = _day_stats_from_rollup(row)
+            day_stats_cache.put(*key, stats[key], _day_stats_max_age(key[2]), _rollup_version(row))
+    return stats
+
+
+def get_product_market_stats_today(db: Session, product_id: int, market_id: int, as_of: Optional[date] = None) -> dict:
+    """Approved price stats for one day, from the shared cache or the daily rollup row"""
+    today = as_of or date.today()
+    return get_day_stats(db, [(product_id, market_id)], today, today)[(product_id, market_id, today)]
+
+
+def publish_day_stats(db: Session, keys: Iterable[Tuple[int, int, date]]) -> None:
+    """
+    Write freshly committed rollups for (product, market, day) keys to the
+    shared cache. Keys whose rollup row is gone are stored as empty, versioned
+    with the database clock so that no earlier read can replace them.
+    """
+    keys = list(set(keys))
+    if not keys:
+        return
+    rows = {
+        (r.product_id, r.market_id, r.stat_date): r
+        for r in db.query(PriceDailyStat).filter(
+            tuple_(PriceDailyStat.product_id, PriceDailyStat.market_id, PriceDailyStat.stat_date).in_(keys)
         )
-        .scalar()
-    )
-    return float(row) if row else None
+    }
+    now = None
+    for key in keys:
+        row = rows.get(key)
+        if row is None and now is None:
+            now = float(db.scalar(text("SELECT extract(epoch FROM clock_timestamp())")))
+        version = _rollup_version(row) if row is not None else now
+        day_stats_cache.put(*key, _day_stats_from_rollup(row), _day_stats_max_age(key[2]), version)
 
 
-def get_trend_30d(db: Session, product_id: int, market_id: int) -> List[PriceTrend]:
-    today = date.today()
-    since = today - timedelta(days=30)
+def _moving_average(day_stats: Dict[Tuple[int, int, date], dict], product_id: int, market_id: int, day: date) -> Optional[float]:
+    """Average of the approved prices in the 7 days before `day`, weighted by entries per day"""
+    week = [day_stats[(product_id, market_id, day - timedelta(days=i))] for i in range(1, 8)]
+    count = sum(s["count"] for s in week)
+    return sum(s["avg"] * s["count"] for s in week if s["count"]) / count if count else None
+
+
+def _trend(day_stats: Dict[Tuple[int, int, date], dict], product_id: int, market_id: int, day: date) -> List[PriceTrend]:
+    """Per-day approved stats for the LOOKBACK_DAYS up to and including `day`"""
+    trend = []
+    for i in range(LOOKBACK_DAYS, -1, -1):
+        d = day - timedelta(days=i)
+        s = day_stats[(product_id, market_id, d)]
+        if s["count"]:
+            trend.append(PriceTrend(
+                entry_date=d, avg_price=s["avg"], min_price=s["min"], max_price=s["max"], vendor_count=s["count"],
+            ))
+    return trend
+
+
+def get_7day_moving_average(db: Session, product_id: int, market_id: int, as_of: Optional[date] = None) -> Optional[float]:
+    today = as_of or date.today()
+    day_stats = get_day_stats(db, [(product_id, market_id)], today - timedelta(days=7), today - timedelta(days=1))
+    return _moving_average(day_stats, product_id, market_id, today)
+
+
+def get_trend_30d(db: Session, product_id: int, market_id: int, as_of: Optional[date] = None) -> List[PriceTrend]:
+    today = as_of or date.today()
+    day_stats = get_day_stats(db, [(product_id, market_id)], today - timedelta(days=LOOKBACK_DAYS), today)
+    return _trend(day_stats, product_id, market_id, today)
+
+
+def _bucket_count(from_date: date, to_date: date, bucket: str) -> int:
+    days = (to_date - from_date).days + 1
+    if bucket == "week":
+        return (to_date - from_date).days // 7 + 2
+    if bucket == "month":
+        return (to_date.year - from_date.year) * 12 + to_date.month - from_date.month + 1
+    return days
+
+
+def get_trend(
+    db: Session,
+    product_id: int,
+    market_id: int,
+    from_date: date,
+    to_date: date,
+    bucket: Optional[str] = None,
+    points: Optional[int] = None,
+) -> TrendSeries:
+    """
+    Price trend over an arbitrary range, downsampled server-side from the daily
+    rollups. Either a calendar bucket (day/week/month) or a target point count,
+    which is turned into fixed-width n-day buckets starting at `from_date`.
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    span = (to_date - from_date).days + 1
+
+    if points:
+        width = max(1, math.ceil(span / points))
+        bucket_label = f"{width}d"
+        bucket_col = cast(PriceDailyStat.stat_date - from_date, Integer) // width
+    else:
+        bucket = bucket or "day"
+        if _bucket_count(from_date, to_date, bucket) > settings.TREND_MAX_POINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Range too large for '{bucket}' buckets (max {settings.TREND_MAX_POINTS} points); "
+                       f"use a larger bucket or 'points'",
+            )
+        bucket_label = bucket
+        if bucket == "day":
+            bucket_col = PriceDailyStat.stat_date
+        else:
+            bucket_col = cast(func.date_trunc(bucket, PriceDailyStat.stat_date), Date)
+
     rows = (
         db.query(
-            PriceEntry.entry_date,
-            func.avg(PriceEntry.price_per_unit).label("avg"),
-            func.min(PriceEntry.price_per_unit).label("min"),
-            func.max(PriceEntry.price_per_unit).label("max"),
-            func.count(PriceEntry.id).label("count"),
+            bucket_col.label("bucket"),
+            func.sum(PriceDailyStat.price_sum).label("total"),
+            func.sum(PriceDailyStat.entry_count).label("count"),
+            func.min(PriceDailyStat.min_price).label("min"),
+            func.max(PriceDailyStat.max_price).label("max"),
         )
         .filter(
-            PriceEntry.product_id == product_id,
-            PriceEntry.market_id == market_id,
-            PriceEntry.status == ApprovalStatus.approved,
-            PriceEntry.entry_date >= since,
+            PriceDailyStat.product_id == product_id,
+            PriceDailyStat.market_id == market_id,
+            PriceDailyStat.stat_date >= from_date,
+            PriceDailyStat.stat_date <= to_date,
+            PriceDailyStat.entry_count > 0,
         )
-        .group_by(PriceEntry.entry_date)
-        .order_by(PriceEntry.entry_date)
+        .group_by("bucket")
+        .order_by("bucket")
+        .limit(settings.TREND_MAX_POINTS)
         .all()
     )
-    return [
-        PriceTrend(
-            entry_date=r.entry_date,
-            avg_price=float(r.avg),
-            min_price=float(r.min),
-            max_price=float(r.max),
-            vendor_count=r.count,
-        )
-        for r in rows
-    ]
+    return TrendSeries(
+        product_id=product_id,
+        market_id=market_id,
+        from_date=from_date,
+        to_date=to_date,
+        bucket=bucket_label,
+        points=[
+            PriceTrend(
+                entry_date=from_date + timedelta(days=r.bucket * width) if points else r.bucket,
+                avg_price=round(float(r.total) / r.count, 2),
+                min_price=float(r.min),
+                max_price=float(r.max),
+                vendor_count=r.count,
+            )
+            for r in rows
+        ],
+    )
+
+
+def _has_pending(
+    db: Session,
+    since: date,
+    until: date,
+    product_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+) -> bool:
+    q = db.query(PriceEntry.id).filter(
+        PriceEntry.status == ApprovalStatus.pending,
+        PriceEntry.entry_date >= since,
+        PriceEntry.entry_date <= until,
+    )
+    if product_id is not None:
+        q = q.filter(PriceEntry.product_id == product_id)
+    if market_id is not None:
+        q = q.filter(PriceEntry.market_id == market_id)
+    if city_id is not None:
+        q = q.filter(PriceEntry.city_id == city_id)
+    return db.query(q.exists()).scalar()
+
+
+def _cached(key: tuple, compute: Callable[[], object], settled: Callable[[], bool]):
+    """
+    Look up `key` in the long-lived cache, then the short one. On a miss for a
+    past date, `settled()` decides whether the result is final (no entries in
+    its window are still awaiting review) and can be kept long term.
+    """
+    value = history_cache.get(key)
+    if value is not None:
+        return value
+    value = analytics_cache.get(key)
+    if value is not None:
+        return value
+    generation = _generation
+    value = compute()
+    if key[3] < date.today() and generation == _generation and settled():
+        history_cache.set(key, value)
+    else:
+        analytics_cache.set(key, value)
+    return value
+
 
+def is_settled(kind: str, product_id: Optional[int], scope, as_of: Optional[date]) -> bool:
+    """Whether the response for this key is final and may be cached by clients for a while"""
+    return as_of is not None and history_cache.peek((kind, product_id, scope, as_of)) is not None
 
-def get_product_analytics(db: Session, product_id: int, market_id: int) -> ProductAnalytics:
+
+def get_product_analytics(db: Session, product_id: int, market_id: int, as_of: Optional[date] = None) -> ProductAnalytics:
+    if as_of is None:
+        hot_keys.hit(("product", product_id, market_id))
+    day = _resolve_as_of(as_of)
+    sync_invalidations(db)
+    return _cached(
+        ("product", product_id, market_id, day),
+        lambda: _compute_product_analytics(db, product_id, market_id, day),
+        lambda: not _has_pending(db, day - timedelta(days=LOOKBACK_DAYS), day, product_id, market_id=market_id),
+    )
+
+
+def _compute_product_analytics(db: Session, product_id: int, market_id: int, as_of: Optional[date] = None) -> ProductAnalytics:
     product = db.query(Product).filter(Product.id == product_id).first()
-    today_stats = get_product_market_stats_today(db, product_id, market_id)
-    moving_avg = get_7day_moving_average(db, product_id, market_id)
-    trend = get_trend_30d(db, product_id, market_id)
+    day = as_of or date.today()
+    day_stats = get_day_stats(db, [(product_id, market_id)], day - timedelta(days=LOOKBACK_DAYS), day)
+    return _product_analytics(
+        product_id, product, day_stats[(product_id, market_id, day)],
+        _moving_average(day_stats, product_id, market_id, day), _trend(day_stats, product_id, market_id, day),
+    )
+
 
+def _product_analytics(
+    product_id: int, product: Optional[Product], today_stats: dict, moving_avg: Optional[float], trend: List[PriceTrend],
+) -> ProductAnalytics:
     today_avg = today_stats["avg"]
     spike = False
     if today_avg and moving_avg:
@@ -103,6 +349,9 @@ def get_product_analytics(db: Session, product_id: int, market_id: int) -> Produ
         today_avg=today_avg,
         today_min=today_stats["min"],
         today_max=today_stats["max"],
+        today_p10=today_stats["p10"],
+        today_median=today_stats["median"],
+        today_p90=today_stats["p90"],
         vendor_count=today_stats["count"],
         moving_avg_7d=moving_avg,
         spike_alert=spike,
@@ -110,19 +359,107 @@ def get_product_analytics(db: Session, product_id: int, market_id: int) -> Produ
     )
 
 
-def get_all_markets_stats_for_product(db: Session, product_id: int, city_id: Optional[int] = None) -> List[MarketStats]:
-    today = date.today()
-    seven_days_ago = today - timedelta(days=7)
+def get_batch_analytics(
+    db: Session, pairs: List[ProductMarketPair], as_of: Optional[date] = None,
+) -> Tuple[List[BatchAnalyticsItem], bool]:
+    """
+    ProductAnalytics for many (product, market) pairs, in request order. Cached
+    cards are reused; the rest are computed together with at most three
+    set-based queries (products, pending check, the 30 days of rollups the
+    shared cache is missing) however many pairs there are. Also returns
+    whether every card is final (see `is_settled`).
+    """
+    day = _resolve_as_of(as_of)
+    sync_invalidations(db)
+    keys = list(dict.fromkeys((p.product_id, p.market_id) for p in pairs))
+    results: Dict[Tuple[int, int], ProductAnalytics] = {}
+    missing = []
+    for pid, mid in keys:
+        if as_of is None:
+            hot_keys.hit(("product", pid, mid))
+        cached = history_cache.get(("product", pid, mid, day)) or analytics_cache.get(("product", pid, mid, day))
+        if cached is not None:
+            results[(pid, mid)] = cached
+        else:
+            missing.append((pid, mid))
 
-    q = db.query(Market)
+    if missing:
+        results.update(_compute_batch_analytics(db, missing, day))
+    items = [
+        BatchAnalyticsItem(product_id=p.product_id, market_id=p.market_id, analytics=results[(p.product_id, p.market_id)])
+        for p in pairs
+    ]
+    settled = as_of is not None and all(history_cache.peek(("product", pid, mid, day)) is not None for pid, mid in keys)
+    return items, settled
+
+
+def _compute_batch_analytics(db: Session, keys: List[Tuple[int, int]], day: date) -> Dict[Tuple[int, int], ProductAnalytics]:
+    pair = tuple_(PriceEntry.product_id, PriceEntry.market_id)
+    generation = _generation
+    products = {p.id: p for p in db.query(Product).filter(Product.id.in_({pid for pid, _ in keys}))}
+
+    settled = set()
+    if day < date.today():
+        pending = set(
+            db.query(PriceEntry.product_id, PriceEntry.market_id)
+            .filter(
+                pair.in_(keys),
+                PriceEntry.status == ApprovalStatus.pending,
+                PriceEntry.entry_date >= day - timedelta(days=LOOKBACK_DAYS),
+                PriceEntry.entry_date <= day,
+            )
+            .distinct()
+            .all()
+        )
+        settled = set(keys) - {tuple(r) for r in pending}
+
+    day_stats = get_day_stats(db, keys, day - timedelta(days=LOOKBACK_DAYS), day)
+
+    results = {}
+    for key in keys:
+        pid, mid = key
+        value = results[key] = _product_analytics(
+            pid, products.get(pid), day_stats[(pid, mid, day)],
+            _moving_average(day_stats, pid, mid, day), _trend(day_stats, pid, mid, day),
+        )
+        cache = history_cache if key in settled and generation == _generation else analytics_cache
+        cache.set(("product", *key, day), value)
+    return results
+
+
+def get_all_markets_stats_for_product(
+    db: Session, product_id: int, city_id: Optional[int] = None, as_of: Optional[date] = None,
+) -> List[MarketStats]:
+    if as_of is None:
+        hot_keys.hit(("all_markets", product_id, city_id))
+    day = _resolve_as_of(as_of)
+    sync_invalidations(db)
+    return _cached(
+        ("all_markets", product_id, city_id, day),
+        lambda: _compute_all_markets_stats(db, product_id, city_id, day),
+        lambda: not _has_pending(db, day - timedelta(days=7), day, product_id, city_id=city_id),
+    )
+
+
+def _compute_all_markets_stats(
+    db: Session, product_id: int, city_id: Optional[int] = None, as_of: Optional[date] = None,
+) -> List[MarketStats]:
+    """
+    Day stats and spike alerts for every active market: one query for the
+    markets, then the eight days of rollups (today and the 7-day window) that
+    the shared cache does not hold, in one query for all markets.
+    """
+    day = as_of or date.today()
+    q = db.query(Market.id, Market.name, Market.area)
     if city_id:
         q = q.filter(Market.city_id == city_id)
     markets = q.filter(Market.is_active == True).all()
+    day_stats = get_day_stats(db, [(product_id, m.id) for m in markets], day - timedelta(days=7), day)
 
     result = []
     for market in markets:
-        stats = get_product_market_stats_today(db, product_id, market.id)
-        moving_avg = get_7day_moving_average(db, product_id, market.id)
+        stats = day_stats[(product_id, market.id, day)]
+        moving_avg = _moving_average(day_stats, product_id, market.id, day)
         spike = False
         if stats["avg"] and moving_avg:
             spike = stats["avg"] > moving_avg * (1 + SPIKE_THRESHOLD)
@@ -134,15 +471,97 @@ def get_all_markets_stats_for_product(db: Session, product_id: int, city_id: Opt
             avg_price=stats["avg"],
             min_price=stats["min"],
             max_price=stats["max"],
+            p10_price=stats["p10"],
+            median_price=stats["median"],
+            p90_price=stats["p90"],
             vendor_count=stats["count"],
             spike_alert=spike,
         ))
     return result
 
 
-def get_most_fluctuating_products(db: Session, city_id: Optional[int] = None, limit: int = 5):
-    """Products with highest standard deviation in last 30 days"""
-    since = date.today() - timedelta(days=30)
+def warm(db: Session, kind: str, product_id: int, scope_id: Optional[int]) -> None:
+    """Compute and cache one analytics key without counting it as a request"""
+    if kind == "product":
+        value = _compute_product_analytics(db, product_id, scope_id)
+    else:
+        value = _compute_all_markets_stats(db, product_id, scope_id)
+    analytics_cache.set((kind, product_id, scope_id, date.today()), value)
+
+
+def invalidate_price_changes(changes: Iterable[Tuple[int, date]]) -> int:
+    """
+    Drop cached analytics affected by approved prices changing for the given
+    (product_id, entry_date) pairs. Short-lived entries go for the whole
+    product; long-lived ones only where as_of falls within LOOKBACK_DAYS after
+    a changed date, so a late approval for a past day leaves older history cached.
+    """
+    changed_dates = {}
+    for product_id, entry_date in changes:
+        changed_dates.setdefault(product_id, set()).add(entry_date)
+    if not changed_dates:
+        return 0
+    window = timedelta(days=LOOKBACK_DAYS)
+    all_dates = set().union(*changed_dates.values())
+
+    def affected(key) -> bool:
+        kind, product_id, _, as_of = key
+        dates = all_dates if kind == "fluctuating" else changed_dates.get(product_id, ())
+        return any(d <= as_of <= d + window for d in dates)
+
+    global _generation
+    _generation += 1
+    dropped = analytics_cache.invalidate(lambda key: key[0] == "fluctuating" or key[1] in changed_dates)
+    return dropped + history_cache.invalidate(affected)
+
+
+def sync_invalidations(db: Session) -> int:
+    """
+    Apply price changes committed by any worker since the last poll, read
+    from the event log (ids become visible in order, so a cursor misses
+    nothing): their per-day stats and the analytics built on them are dropped. Runs at most every ANALYTICS_INVALIDATION_POLL_SECONDS; a
+    request arriving while another polls skips it rather than waiting.
+    """
+    global _event_cursor, _next_poll
+    now = time.monotonic()
+    if now < _next_poll or not _poll_lock.acquire(blocking=False):
+        return 0
+    try:
+        _next_poll = now + settings.ANALYTICS_INVALIDATION_POLL_SECONDS
+        if _event_cursor is None:
+            _event_cursor = latest_event_id(db)  # the long-lived cache is empty until the first request
+            return 0
+        rows = (
+            db.query(PriceEvent.id, PriceEvent.product_id, PriceEvent.market_id, PriceEvent.entry_date)
+            .filter(PriceEvent.id > _event_cursor, PriceEvent.event_type.in_(INVALIDATING_EVENTS))
+            .order_by(PriceEvent.id)
+            .all()
+        )
+        if not rows:
+            return 0
+        _event_cursor = rows[-1].id
+        # Per-day stats first: the analytics dropped below are rebuilt from them. The
+        # approving worker only refreshed its own host's table (or its own process).
+        for key in {(r.product_id, r.market_id, r.entry_date) for r in rows}:
+            day_stats_cache.discard(*key)
+        return invalidate_price_changes((r.product_id, r.entry_date) for r in rows)
+    finally:
+        _poll_lock.release()
+
+
+def get_most_fluctuating_products(db: Session, city_id: Optional[int] = None, limit: int = 5, as_of: Optional[date] = None):
+    """Products with highest standard deviation in the 30 days up to `as_of` (default today)"""
+    day = _resolve_as_of(as_of)
+    sync_invalidations(db)
+    return _cached(
+        ("fluctuating", None, (city_id, limit), day),
+        lambda: _compute_most_fluctuating(db, city_id, limit, day),
+        lambda: not _has_pending(db, day - timedelta(days=LOOKBACK_DAYS), day, city_id=city_id),
+    )
+
+
+def _compute_most_fluctuating(db: Session, city_id: Optional[int], limit: int, as_of: date):
+    since = as_of - timedelta(days=30)
     q = (
         db.query(
             PriceEntry.product_id,
@@ -154,13 +573,147 @@ def get_most_fluctuating_products(db: Session, city_id: Optional[int] = None, li
         .filter(
             PriceEntry.status == ApprovalStatus.approved,
             PriceEntry.entry_date >= since,
+            PriceEntry.entry_date <= as_of,
         )
-        .group_by(PriceEntry.product_id, Product.name)
+    )
+    if city_id:
+        q = q.filter(PriceEntry.city_id == city_id)
+    rows = (
+        q.group_by(PriceEntry.product_id, Product.name)
         .order_by(func.stddev(PriceEntry.price_per_unit).desc())
         .limit(limit)
+        .all()
     )
-    if city_id:
-        q = q.join(Market, PriceEntry.market_id == Market.id).filter(Market.city_id == city_id)
-    rows = q.all()
     return [{"product_id": r.product_id, "product_name": r.product_name,
              "stddev": float(r.stddev or 0), "avg_price": float(r.avg_price or 0)} for r in rows]
+
+
+def get_price_forecasts(
+    db: Session, product_id: int, market_id: Optional[int] = None, city_id: Optional[int] = None,
+) -> List[dict]:
+    """Stored forecasts for a product from today onwards, one series per market"""
+    q = (
+        db.query(PriceForecast, Market.name)
+        .join(Market, PriceForecast.market_id == Market.id)
+        .filter(PriceForecast.product_id == product_id, PriceForecast.target_date >= date.today())
+    )
+    if market_id is not None:
+        q = q.filter(PriceForecast.market_id == market_id)
+    if city_id is not None:
+        q = q.filter(Market.city_id == city_id)
+
+    series = {}
+    for f, market_name in q.order_by(PriceForecast.market_id, PriceForecast.target_date):
+        s = series.setdefault(f.market_id, {
+            "product_id": f.product_id,
+            "market_id": f.market_id,
+            "market_name": market_name,
+            "fitted_through": f.fitted_through,
+            "observations": f.observations,
+            "alpha": f.alpha,
+            "beta": f.beta,
+            "points": [],
+        })
+        s["points"].append({
+            "target_date": f.target_date, "horizon": f.horizon,
+            "point": f.point, "lower": f.lower, "upper": f.upper,
+        })
+    return list(series.values())
+
+
+def get_price_percentiles(
+    db: Session,
+    product_id: int,
+    market_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+    days: int = 7,
+) -> PricePercentiles:
+    """p10/median/p90 over the last `days` days, merged from daily sketches"""
+    today = date.today()
+    since = today - timedelta(days=days - 1)
+    sketch = merged_sketch(db, product_id, since, today, market_id=market_id, city_id=city_id)
+    pct = _percentiles(sketch)
+    return PricePercentiles(
+        product_id=product_id,
+        market_id=market_id,
+        city_id=city_id,
+        from_date=since,
+        to_date=today,
+        entry_count=sketch.count,
+        p10=pct["p10"],
+        median=pct["median"],
+        p90=pct["p90"],
+        relative_error=sketch.relative_accuracy,
+    )
+
+
+def get_basket_costs(db: Session, city_id: int, items: List[BasketItem], max_age_days: int = 7) -> BasketComparison:
+    """
+    Cost of a basket in every active market of a city, from each market's most
+    recent approved daily average per product (no older than `max_age_days`).
+    One query: active markets LEFT JOIN a DISTINCT ON over the daily rollups.
+    """
+    quantities = {}
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    since = date.today() - timedelta(days=max_age_days)
+
+    latest = (
+        db.query(
+            PriceDailyStat.market_id,
+            PriceDailyStat.product_id,
+            PriceDailyStat.stat_date,
+            (PriceDailyStat.price_sum / PriceDailyStat.entry_count).label("avg"),
+        )
+        .join(Market, PriceDailyStat.market_id == Market.id)
+        .filter(
+            Market.city_id == city_id,
+            PriceDailyStat.product_id.in_(quantities),
+            PriceDailyStat.stat_date >= since,
+            PriceDailyStat.stat_date <= date.today(),
+            PriceDailyStat.entry_count > 0,
+        )
+        .distinct(PriceDailyStat.market_id, PriceDailyStat.product_id)
+        .order_by(PriceDailyStat.market_id, PriceDailyStat.product_id, PriceDailyStat.stat_date.desc())
+        .subquery()
+    )
+    rows = (
+        db.query(Market.id, Market.name, Market.area, latest.c.product_id, latest.c.stat_date, latest.c.avg)
+        .outerjoin(latest, latest.c.market_id == Market.id)
+        .filter(Market.city_id == city_id, Market.is_active == True)
+        .order_by(Market.id)
+        .all()
+    )
+
+    markets = {}
+    for r in rows:
+        m = markets.setdefault(r.id, {"market_id": r.id, "market_name": r.name, "area": r.area, "lines": []})
+        if r.product_id is not None:
+            qty = quantities[r.product_id]
+            m["lines"].append(BasketLine(
+                product_id=r.product_id,
+                quantity=float(qty),
+                unit_price=round(float(r.avg), 2),
+                line_cost=round(float(r.avg * qty), 2),
+                price_date=r.stat_date,
+            ))
+
+    baskets = []
+    for m in markets.values():
+        priced = {line.product_id for line in m["lines"]}
+        baskets.append(dict(
+            m,
+            total_cost=round(sum(line.line_cost for line in m["lines"]), 2),
+            items_priced=len(priced),
+            items_missing=[pid for pid in quantities if pid not in priced],
+            coverage=round(len(priced) / len(quantities), 3),
+            complete=len(priced) == len(quantities),
+        ))
+    # Full baskets are comparable with each other; partial ones rank after them by coverage
+    baskets.sort(key=lambda b: (-b["items_priced"], b["total_cost"], b["market_id"]))
+    return BasketComparison(
+        city_id=city_id,
+        item_count=len(quantities),
+        priced_since=since,
+        markets=[MarketBasket(rank=i + 1, **b) for i, b in enumerate(baskets)],
+    )
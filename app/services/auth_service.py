@@ -37,7 +37,7 @@ def authenticate_user(db: Session, email: str, password: str) -> User:
 
 def login_user(db: Session, email: str, password: str) -> dict:
     user = authenticate_user(db, email, password)
-    token = create_access_token(data={"sub": user.id, "role": user.role})
+    token = create_access_token(data={"sub": str(user.id), "role": user.role})  # JWT "sub" must be a string
     return {
         "access_token": token,
         "token_type": "bearer",
@@ -0,0 +1,178 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from app.models.price_entry import PriceEntry, ApprovalStatus
+from app.models.price_stats import PriceDailyStat
+from app.models.market import Market
+from app.services.quantile_sketch import QuantileSketch
+
+StatKey = Tuple[int, int, date]  # (product_id, market_id, day)
+CHUNK_SIZE = 1000
+ROLLUP_LOCK_CLASS = 0x46505253  # "FPRS"; two-key advisory locks, apart from the single-key ones
+
+
+class _DayRollup:
+    __slots__ = ("sketch", "total", "low", "high")
+
+    def __init__(self):
+        self.sketch = QuantileSketch()
+        self.total = Decimal(0)
+        self.low = None
+        self.high = None
+
+    def add(self, price: Decimal) -> None:
+        self.sketch.add(float(price))
+        self.total += price
+        self.low = price if self.low is None else min(self.low, price)
+        self.high = price if self.high is None else max(self.high, price)
+
+
+def _build_rollups(rows) -> Dict[StatKey, _DayRollup]:
+    rollups: Dict[StatKey, _DayRollup] = {}
+    for r in rows:
+        key = (r.product_id, r.market_id, r.entry_date)
+        rollups.setdefault(key, _DayRollup()).add(r.price_per_unit)
+    return rollups
+
+
+def _upsert(db: Session, rollups: Dict[StatKey, _DayRollup]) -> None:
+    if not rollups:
+        return
+    stmt = insert(PriceDailyStat).values([
+        {
+            "product_id": p,
+            "market_id": m,
+            "stat_date": d,
+            "entry_count": r.sketch.count,
+            "price_sum": r.total,
+            "min_price": r.low,
+            "max_price": r.high,
+            "sketch": r.sketch.to_dict(),
+            "updated_at": func.clock_timestamp(),
+        }
+        for (p, m, d), r in rollups.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        constraint="uq_price_daily_stats_key",
+        set_={
+            "entry_count": stmt.excluded.entry_count,
+            "price_sum": stmt.excluded.price_sum,
+            "min_price": stmt.excluded.min_price,
+            "max_price": stmt.excluded.max_price,
+            "sketch": stmt.excluded.sketch,
+            # Not now(): a refresh that waited on another's key lock must get the later version
+            "updated_at": func.clock_timestamp(),
+        },
+    ))
+
+
+def _approved_rows(db: Session):
+    return db.query(
+        PriceEntry.product_id,
+        PriceEntry.market_id,
+        PriceEntry.entry_date,
+        PriceEntry.price_per_unit,
+    ).filter(PriceEntry.status == ApprovalStatus.approved)
+
+
+def _lock_keys(db: Session, keys) -> None:
+    """
+    Serialize refreshes of the same key until commit. Without this, two
+    overlapping approvals each rebuild the rollup from rows that leave out
+    the other's uncommitted approval, and the later commit wins. The locks
+    are taken in hash order in one statement, so multi-key refreshes
+    (screening) cannot deadlock with each other.
+    """
+    db.execute(
+        text("""
+            SELECT pg_advisory_xact_lock(:lock_class, h)
+            FROM (SELECT DISTINCT hashtext(k) AS h FROM unnest(CAST(:keys AS text[])) AS k ORDER BY h) AS locks
+        """),
+        {"lock_class": ROLLUP_LOCK_CLASS, "keys": [f"{p}:{m}:{d.isoformat()}" for p, m, d in keys]},
+    )
+
+
+def refresh_daily_stats(db: Session, keys: Iterable[StatKey]) -> int:
+    """
+    Recompute the rollup rows for the given (product, market, day) keys. Caller
+    commits. Takes a per-key lock first, so rows approved by a concurrent
+    transaction are counted once it commits instead of being overwritten.
+    """
+    keys = sorted(set(keys))
+    if keys:
+        _lock_keys(db, keys)  # all of them up front, so two multi-chunk refreshes cannot deadlock
+    for i in range(0, len(keys), CHUNK_SIZE):
+        chunk = keys[i:i + CHUNK_SIZE]
+        rows = _approved_rows(db).filter(
+            tuple_(PriceEntry.product_id, PriceEntry.market_id, PriceEntry.entry_date).in_(chunk)
+        ).all()
+        rollups = _build_rollups(rows)
+        _upsert(db, rollups)
+        emptied = [k for k in chunk if k not in rollups]
+        if emptied:
+            db.query(PriceDailyStat).filter(
+                tuple_(PriceDailyStat.product_id, PriceDailyStat.market_id, PriceDailyStat.stat_date).in_(emptied)
+            ).delete(synchronize_session=False)
+    return len(keys)
+
+
+def rebuild_daily_stats(db: Session, since: date, until: Optional[date] = None) -> int:
+    """Rebuild every rollup row in [since, until] from raw approved entries. Caller commits."""
+    until = until or date.today()
+    db.query(PriceDailyStat).filter(
+        PriceDailyStat.stat_date >= since,
+        PriceDailyStat.stat_date <= until,
+    ).delete(synchronize_session=False)
+    rows = _approved_rows(db).filter(
+        PriceEntry.entry_date >= since,
+        PriceEntry.entry_date <= until,
+    ).all()
+    rollups = _build_rollups(rows)
+    items = list(rollups.items())
+    for i in range(0, len(items), CHUNK_SIZE):
+        _upsert(db, dict(items[i:i + CHUNK_SIZE]))
+    return len(rollups)
+
+
+def merged_sketch(
+    db: Session,
+    product_id: int,
+    since: date,
+    until: date,
+    market_id: Optional[int] = None,
+    city_id: Optional[int] = None,
+) -> QuantileSketch:
+    """Merge the stored daily sketches for a product over a date range, market or city"""
+    q = db.query(PriceDailyStat.sketch).filter(
+        PriceDailyStat.product_id == product_id,
+        PriceDailyStat.stat_date >= since,
+        PriceDailyStat.stat_date <= until,
+    )
+    if market_id:
+        q = q.filter(PriceDailyStat.market_id == market_id)
+    if city_id:
+        q = q.join(Market, PriceDailyStat.market_id == Market.id).filter(Market.city_id == city_id)
+    result = QuantileSketch()
+    for (sketch,) in q.all():
+        result.merge(QuantileSketch.from_dict(sketch))
+    return result
+
+
+if __name__ == "__main__":
+    # Backfill rollups for existing data:  python -m app.services.daily_stats_service [YYYY-MM-DD]
+    import sys
+    from datetime import timedelta
+    from app.db.database import SessionLocal
+    from app import models  # noqa - register models
+
+    since = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else date.today() - timedelta(days=365)
+    db = SessionLocal()
+    try:
+        n = rebuild_daily_stats(db, since)
+        db.commit()
+        print(f"Rebuilt {n} daily stat rows since {since}")
+    finally:
+        db.close()
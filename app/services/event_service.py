@@ -0,0 +1,139 @@
+"""
+Change-data log for price entries (transactional outbox).
+
+Every write path that changes a price entry appends a PriceEvent in the same
+transaction, so the log and the table never disagree: a rolled-back change
+leaves no event, a committed one always has its event. Consumers (caches,
+rollups, alerts, exports) read events in id order after their last cursor
+and can rewind the cursor to replay.
+
+Sequence ids are assigned under a transaction-scoped advisory lock that is
+held until commit, so events become visible in id order and a consumer that
+has read up to id N never later finds a committed event below N. Writers
+therefore call record_events() last, right before commit, keeping the
+serialized section to one INSERT and the commit itself.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import ARRAY, Integer, String, any_, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.price_entry import PriceEntry
+from app.models.price_event import PriceEvent, PriceEventConsumer, PriceEventType
+
+EVENT_LOCK_KEY = 0x46505445  # "FPTE"; the scheduler uses "FPTR"
+SNAPSHOT_COLUMNS = (
+    "entry_id", "vendor_id", "product_id", "market_id", "city_id", "entry_date", "status", "price_per_unit",
+)
+
+
+def record_events(
+    db: Session, event_type: PriceEventType, entry_ids: Iterable[int], actor_id: Optional[int] = None,
+) -> int:
+    """Append one event per entry, snapshotting the entries as they stand in this transaction"""
+    entry_ids = sorted(set(entry_ids))
+    if not entry_ids:
+        return 0
+    db.flush()
+    db.execute(select(func.pg_advisory_xact_lock(EVENT_LOCK_KEY)))
+    snapshot = (
+        select(
+            literal(event_type.value, String),
+            PriceEntry.id, PriceEntry.vendor_id, PriceEntry.product_id, PriceEntry.market_id,
+            PriceEntry.city_id, PriceEntry.entry_date, PriceEntry.status, PriceEntry.price_per_unit,
+            literal(actor_id, Integer),
+        )
+        .where(PriceEntry.id == any_(literal(entry_ids, ARRAY(Integer))))
+        .order_by(PriceEntry.id)
+    )
+    result = db.execute(
+        insert(PriceEvent).from_select(["event_type", *SNAPSHOT_COLUMNS, "actor_id"], snapshot)
+    )
+    return result.rowcount
+
+
+def read_events(
+    db: Session, after: int = 0, limit: int = 500, types: Optional[List[PriceEventType]] = None,
+) -> dict:
+    """Up to `limit` events with id > `after`, oldest first, and the cursor to pass next time"""
+    query = select(PriceEvent).where(PriceEvent.id > after)
+    if types:
+        query = query.where(PriceEvent.event_type.in_([t.value for t in types]))
+    events = db.scalars(query.order_by(PriceEvent.id).limit(limit + 1)).all()
+    has_more = len(events) > limit
+    events = events[:limit]
+    return {
+        "events": events,
+        "next_cursor": events[-1].id if events else after,
+        "has_more": has_more,
+    }
+
+
+def latest_event_id(db: Session) -> int:
+    return db.scalar(select(func.coalesce(func.max(PriceEvent.id), 0)))
+
+
+def _consumer_out(consumer: PriceEventConsumer, latest: int) -> dict:
+    return {
+        "name": consumer.name,
+        "last_event_id": consumer.last_event_id,
+        "lag": max(latest - consumer.last_event_id, 0),
+        "updated_at": consumer.updated_at,
+    }
+
+
+def get_consumers(db: Session) -> List[dict]:
+    latest = latest_event_id(db)
+    return [
+        _consumer_out(c, latest)
+        for c in db.scalars(select(PriceEventConsumer).order_by(PriceEventConsumer.name))
+    ]
+
+
+def set_cursor(db: Session, name: str, last_event_id: int) -> dict:
+    """Create the consumer or move its cursor, backwards too, to replay from there"""
+    stmt = insert(PriceEventConsumer).values(name=name, last_event_id=last_event_id)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[PriceEventConsumer.name],
+        set_={"last_event_id": stmt.excluded.last_event_id, "updated_at": func.now()},
+    ))
+    db.commit()
+    return _consumer_out(db.get(PriceEventConsumer, name, populate_existing=True), latest_event_id(db))
+
+
+def consume(
+    db: Session, name: str, handler: Callable[[Session, List[PriceEvent]], None], limit: int = 500,
+    types: Optional[List[PriceEventType]] = None,
+) -> int:
+    """
+    Hand the next batch after `name`'s cursor to `handler` and advance the
+    cursor in the same transaction. Handlers that write to this database get
+    exactly-once processing; if the handler raises, neither moves. The cursor
+    row is locked meanwhile, so parallel runs of one consumer take turns.
+    """
+    db.execute(
+        insert(PriceEventConsumer).values(name=name, last_event_id=0).on_conflict_do_nothing()
+    )
+    consumer = db.scalars(
+        select(PriceEventConsumer).where(PriceEventConsumer.name == name).with_for_update()
+    ).one()
+    page = read_events(db, consumer.last_event_id, limit, types)
+    try:
+        if page["events"]:
+            handler(db, page["events"])
+        consumer.last_event_id = page["next_cursor"]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(page["events"])
+
+
+def prune_events(db: Session, older_than_days: int) -> int:
+    """Drop events past the retention window; consumers further behind than that lose them"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    count = db.execute(delete(PriceEvent).where(PriceEvent.created_at < cutoff)).rowcount
+    db.commit()
+    return count
@@ -0,0 +1,180 @@
+"""
+Nightly price forecasts for every (product, market) series.
+
+The job loads the approved daily averages of the last FORECAST_HISTORY_DAYS
+from the rollups in one query, lays them out as a (series x days) matrix and
+fits Holt's linear trend method to all series at once: the recursion runs
+over days, while each step updates every series and every (alpha, beta)
+grid point with array operations. Each series keeps the smoothing
+parameters with the smallest one-step-ahead squared error. Days without an
+approved price carry the level forward along the trend.
+
+Point forecasts and 95% intervals for the next FORECAST_HORIZON_DAYS replace
+the contents of price_forecasts in one transaction; requests only read that
+table (analytics_service.get_price_forecasts), so numpy is never loaded on
+the request path.
+"""
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.price_stats import PriceDailyStat, PriceForecast
+
+ALPHAS = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+Z_95 = 1.96
+
+
+def fit_holt(y: np.ndarray, alphas: np.ndarray = ALPHAS, betas: np.ndarray = BETAS) -> dict:
+    """
+    Fit Holt's method to each row of `y` (series x days, NaN where no price).
+    Returns per-series arrays: final level and trend, chosen alpha and beta,
+    residual sigma and the number of observed days.
+    """
+    n_series, n_days = y.shape
+    a, b = (g.ravel()[:, None] for g in np.meshgrid(alphas, betas, indexing="ij"))  # (params, 1)
+    observed = ~np.isnan(y)
+    first = np.where(observed.any(axis=1), observed.argmax(axis=1), n_days)
+
+    start = np.nan_to_num(y[np.arange(n_series), np.minimum(first, n_days - 1)])
+    level = np.repeat(start[None, :], len(a), axis=0)
+    trend = np.zeros_like(level)
+    sse = np.zeros_like(level)
+    errors = np.zeros(n_series)
+    for t in range(n_days):
+        after = t > first  # the first observation initialises the level
+        update = observed[:, t] & after
+        predicted = level + trend
+        err = np.where(update, np.nan_to_num(y[:, t]) - predicted, 0.0)
+        sse += err * err
+        errors += update
+        new_level = np.where(update, predicted + a * err, np.where(after, predicted, level))
+        trend = np.where(update, b * (new_level - level) + (1 - b) * trend, trend)
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    cols = np.arange(n_series)
+    return {
+        "level": level[best, cols],
+        "trend": trend[best, cols],
+        "alpha": a[best, 0],
+        "beta": b[best, 0],
+        "sigma": np.sqrt(sse[best, cols] / np.maximum(errors - 2, 1)),
+        "observations": observed.sum(axis=1),
+    }
+
+
+def forecast_holt(fit: dict, horizon: int) -> tuple:
+    """Point forecasts and 95% bounds, each (series x horizon), for 1..horizon steps ahead"""
+    h = np.arange(1, horizon + 1)
+    point = fit["level"][:, None] + h * fit["trend"][:, None]
+    # Var of the h-step error: sigma^2 * (1 + sum_{j<h} (alpha * (1 + j * beta))^2)
+    j = np.arange(horizon)
+    c = (fit["alpha"][:, None] * (1 + j * fit["beta"][:, None])) ** 2
+    c[:, 0] = 0.0
+    half_width = Z_95 * fit["sigma"][:, None] * np.sqrt(1 + np.cumsum(c, axis=1))
+    return point, np.maximum(point - half_width, 0.0), point + half_width
+
+
+def load_series(db: Session, through: date, days: int):
+    """Approved daily averages as ((product_ids, market_ids), series x days matrix)"""
+    since = through - timedelta(days=days - 1)
+    rows = np.array(
+        db.query(
+            PriceDailyStat.product_id,
+            PriceDailyStat.market_id,
+            PriceDailyStat.stat_date - since,
+            PriceDailyStat.price_sum / PriceDailyStat.entry_count,
+        )
+        .filter(
+            PriceDailyStat.stat_date >= since,
+            PriceDailyStat.stat_date <= through,
+            PriceDailyStat.entry_count > 0,
+        )
+        .all(),
+        dtype=np.float64,
+    ).reshape(-1, 4)
+    keys = rows[:, :2].astype(np.int64)
+    pairs, series = np.unique(keys, axis=0, return_inverse=True)
+    y = np.full((len(pairs), days), np.nan)
+    y[series.ravel(), rows[:, 2].astype(np.int64)] = rows[:, 3]
+    return pairs, y
+
+
+def run_forecasts(db: Session, through: Optional[date] = None) -> dict:
+    """Fit every series up to `through` (default yesterday) and replace the stored forecasts"""
+    started = time.perf_counter()
+    through = through or date.today() - timedelta(days=1)
+    horizon = settings.FORECAST_HORIZON_DAYS
+    pairs, y = load_series(db, through, settings.FORECAST_HISTORY_DAYS)
+    loaded = time.perf_counter()
+
+    fit = fit_holt(y)
+    observed = ~np.isnan(y)
+    days_since_last = np.where(observed.any(axis=1), observed[:, ::-1].argmax(axis=1), y.shape[1])
+    keep = (fit["observations"] >= settings.FORECAST_MIN_OBSERVATIONS) & (days_since_last <= settings.FORECAST_MAX_GAP_DAYS)
+    point, lower, upper = forecast_holt({k: v[keep] for k, v in fit.items()}, horizon)
+    computed = time.perf_counter()
+
+    n = int(keep.sum())
+    h = np.tile(np.arange(1, horizon + 1), n)
+    db.query(PriceForecast).delete(synchronize_session=False)
+    if n:
+        db.execute(
+            text("""
+                INSERT INTO price_forecasts
+                    (product_id, market_id, target_date, horizon, point, lower, upper,
+                     fitted_through, observations, alpha, beta)
+                SELECT v.product_id, v.market_id, CAST(:through AS date) + v.horizon, v.horizon,
+                       v.point, v.lower, v.upper, :through, v.observations, v.alpha, v.beta
+                FROM unnest(
+                    CAST(:product_ids AS integer[]), CAST(:market_ids AS integer[]), CAST(:horizons AS integer[]),
+                    CAST(:points AS double precision[]), CAST(:lowers AS double precision[]),
+                    CAST(:uppers AS double precision[]), CAST(:observations AS integer[]),
+                    CAST(:alphas AS double precision[]), CAST(:betas AS double precision[])
+                ) AS v(product_id, market_id, horizon, point, lower, upper, observations, alpha, beta)
+            """),
+            {
+                "through": through,
+                "product_ids": np.repeat(pairs[keep, 0], horizon).tolist(),
+                "market_ids": np.repeat(pairs[keep, 1], horizon).tolist(),
+                "horizons": h.tolist(),
+                "points": point.ravel().round(2).tolist(),
+                "lowers": lower.ravel().round(2).tolist(),
+                "uppers": upper.ravel().round(2).tolist(),
+                "observations": np.repeat(fit["observations"][keep], horizon).tolist(),
+                "alphas": np.repeat(fit["alpha"][keep], horizon).tolist(),
+                "betas": np.repeat(fit["beta"][keep], horizon).tolist(),
+            },
+        )
+    db.commit()
+    return {
+        "fitted_through": through.isoformat(),
+        "series": len(pairs),
+        "forecast": n,
+        "skipped": len(pairs) - n,
+        "timing_ms": {
+            "load": round((loaded - started) * 1000, 1),
+            "fit": round((computed - loaded) * 1000, 1),
+            "store": round((time.perf_counter() - computed) * 1000, 1),
+        },
+    }
+
+
+if __name__ == "__main__":
+    # Run the nightly job by hand:  python -m app.services.forecast_service [YYYY-MM-DD]
+    import sys
+    from app.db.database import SessionLocal
+    from app import models  # noqa - register models
+
+    through = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    db = SessionLocal()
+    try:
+        print(run_forecasts(db, through))
+    finally:
+        db.close()
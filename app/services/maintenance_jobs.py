@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+from typing import Callable
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.scheduler import Scheduler
+from app.db.database import SessionLocal
+from app.models.price_stats import PriceDailyStat
+from app.services import analytics_service, event_service, price_service
+from app.services.daily_stats_service import rebuild_daily_stats
+
+
+def _with_session(fn: Callable[[Session], object]) -> Callable[[], object]:
+    def run():
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+    return run
+
+
+def screen_pending(db: Session) -> dict:
+    from app.services import screening_service  # defers numpy until the first run
+    report = screening_service.screen_pending_entries(db)
+    return {k: report[k] for k in ("scanned", "auto_approved", "flagged", "skipped")}
+
+
+def _rollup_keys(db: Session, since: date) -> set:
+    return set(
+        db.query(PriceDailyStat.product_id, PriceDailyStat.market_id, PriceDailyStat.stat_date)
+        .filter(PriceDailyStat.stat_date >= since)
+        .all()
+    )
+
+
+def rebuild_recent_daily_stats(db: Session) -> int:
+    """
+    Safety net for the incremental rollups: rebuild yesterday and today from
+    raw rows, then republish those days (including rows that went away) to
+    the shared stats cache
+    """
+    since = date.today() - timedelta(days=1)
+    before = _rollup_keys(db, since)
+    n = rebuild_daily_stats(db, since)
+    db.commit()
+    analytics_service.publish_day_stats(db, before | _rollup_keys(db, since))
+    return n
+
+
+def expire_stale_pending(db: Session) -> int:
+    return price_service.expire_stale_pending(db, settings.STALE_PENDING_DAYS)
+
+
+def prune_price_events(db: Session) -> int:
+    return event_service.prune_events(db, settings.PRICE_EVENT_RETENTION_DAYS)
+
+
+def prune_idempotency_keys() -> int:
+    from app.core.idempotency import idempotency_store
+    return idempotency_store.prune()
+
+
+def run_forecasts(db: Session) -> dict:
+    from app.services import forecast_service  # defers numpy until the first run
+    return forecast_service.run_forecasts(db)
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    if settings.SCREEN_JOB_ENABLED:
+        scheduler.add_job("screen_pending", _with_session(screen_pending), cron=settings.SCREEN_CRON)
+    scheduler.add_job("rebuild_recent_daily_stats", _with_session(rebuild_recent_daily_stats), cron="20 0 * * *")
+    if settings.EXPIRE_STALE_PENDING_ENABLED:
+        scheduler.add_job("expire_stale_pending", _with_session(expire_stale_pending), cron="40 0 * * *")
+    scheduler.add_job("run_forecasts", _with_session(run_forecasts), cron=settings.FORECAST_CRON)
+    scheduler.add_job("prune_price_events", _with_session(prune_price_events), cron="10 1 * * *")
+    scheduler.add_job("prune_idempotency_keys", prune_idempotency_keys, cron="25 * * * *")
@@ -1,37 +1,179 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Numeric, Date
+from sqlalchemy.orm import Session, aliased, joinedload
+from sqlalchemy import func, cast, literal_column, select, tablesample, text, tuple_, update, Boolean, Numeric, Date, String, and_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from fastapi import HTTPException
 from datetime import date, timedelta
-from typing import List, Optional
+import json
+from typing import List, Optional, Tuple
 from app.models.price_entry import PriceEntry, ApprovalStatus
 from app.models.market import Market, Product
+from app.models.price_event import PriceEventType
+from app.models.price_stats import PriceDailyStat
+from app.core.config import settings
 from app.schemas.schemas import PriceEntryCreate, PriceEntryUpdate, AdminReview
+from app.services.daily_stats_service import refresh_daily_stats
+from app.services.event_service import record_events
+from app.services.analytics_service import invalidate_price_changes, publish_day_stats
 
+# Loaded with the entries so that serializing PriceEntryOut needs no further queries
+ENTRY_RELATIONS = (joinedload(PriceEntry.product), joinedload(PriceEntry.market))
 
-def submit_price(db: Session, payload: PriceEntryCreate, vendor_id: int) -> PriceEntry:
-    entry = PriceEntry(
+
+def submit_price(db: Session, payload: PriceEntryCreate, vendor_id: int) -> Tuple[PriceEntry, bool]:
+    """
+    Insert the vendor's entry for (product, market, day), or update it in place
+    when one exists and is not approved. A resubmission after rejection reopens
+    the entry as pending. Single INSERT ... ON CONFLICT, so concurrent
+    resubmissions cannot create duplicates. The market's city_id is copied
+    onto the entry in the same statement. xmax = 0 on the returned row tells
+    a fresh insert from an update; returns the entry and whether it was inserted.
+    """
+    values = dict(
         vendor_id=vendor_id,
         product_id=payload.product_id,
         market_id=payload.market_id,
+        city_id=select(Market.city_id).where(Market.id == payload.market_id).scalar_subquery(),
         price_per_unit=payload.price_per_unit,
         entry_date=payload.entry_date or date.today(),
         status=ApprovalStatus.pending,
     )
-    db.add(entry)
+    stmt = insert(PriceEntry).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_price_entries_vendor_product_market_date",
+        set_={
+            "price_per_unit": stmt.excluded.price_per_unit,
+            "status": ApprovalStatus.pending,
+            "admin_note": None,
+            "reviewed_by": None,
+            "reviewed_at": None,
+            "screening_score": None,
+            "flagged": False,
+            "updated_at": func.now(),
+        },
+        where=PriceEntry.status != ApprovalStatus.approved,
+    ).returning(PriceEntry.id, literal_column("xmax = 0", Boolean))
+    row = db.execute(stmt).first()
+    if row is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="An approved entry already exists for this product, market and date",
+        )
+    entry_id, inserted = row
+    record_events(db, PriceEventType.submitted if inserted else PriceEventType.resubmitted, [entry_id])
     db.commit()
-    db.refresh(entry)
-    return entry
+    return db.get(PriceEntry, entry_id, options=ENTRY_RELATIONS), inserted
 
 
 def get_vendor_submissions(db: Session, vendor_id: int) -> List[PriceEntry]:
     return (
         db.query(PriceEntry)
+        .options(*ENTRY_RELATIONS)
         .filter(PriceEntry.vendor_id == vendor_id)
         .order_by(PriceEntry.created_at.desc())
         .all()
     )
 
 
+def _pct(value) -> Optional[float]:
+    return None if value is None else round(float(value) * 100, 2)
+
+
+def get_vendor_stats(db: Session, vendor_id: int, today: Optional[date] = None) -> dict:
+    """
+    Per (product, market) dashboard for a vendor: latest price against that
+    day's market average, average deviation over the last 30 days, the 30
+    before that and all time, and approval counts. One aggregate query over
+    the vendor's entries (an index range scan on the unique submission key)
+    joined to the daily rollups, whatever the length of the history.
+    """
+    today = today or date.today()
+    recent, previous = today - timedelta(days=29), today - timedelta(days=59)
+    market_avg = PriceDailyStat.price_sum / func.nullif(PriceDailyStat.entry_count, 0)
+    deviation = (PriceEntry.price_per_unit - market_avg) / market_avg
+    newest_first = PriceEntry.entry_date.desc()
+
+    def latest(expr):
+        return func.array_agg(aggregate_order_by(expr, newest_first))[1]
+
+    def count_status(status):
+        return func.count().filter(PriceEntry.status == status)
+
+    per_key = (
+        select(
+            PriceEntry.product_id,
+            PriceEntry.market_id,
+            func.count().label("submissions"),
+            count_status(ApprovalStatus.approved).label("approved"),
+            count_status(ApprovalStatus.rejected).label("rejected"),
+            count_status(ApprovalStatus.pending).label("pending"),
+            func.max(PriceEntry.entry_date).label("latest_date"),
+            latest(PriceEntry.price_per_unit).label("latest_price"),
+            latest(cast(PriceEntry.status, String)).label("latest_status"),
+            latest(market_avg).label("latest_market_avg"),
+            func.count(market_avg).label("compared_entries"),
+            func.avg(deviation).filter(PriceEntry.entry_date >= recent).label("deviation_30d"),
+            func.avg(deviation).filter(PriceEntry.entry_date.between(previous, recent - timedelta(days=1)))
+            .label("deviation_prev_30d"),
+            func.avg(deviation).label("deviation_all_time"),
+        )
+        .outerjoin(PriceDailyStat, and_(
+            PriceDailyStat.product_id == PriceEntry.product_id,
+            PriceDailyStat.market_id == PriceEntry.market_id,
+            PriceDailyStat.stat_date == PriceEntry.entry_date,
+        ))
+        .where(PriceEntry.vendor_id == vendor_id)
+        .group_by(PriceEntry.product_id, PriceEntry.market_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(per_key, Product.name.label("product_name"), Product.unit, Market.name.label("market_name"))
+        .join(Product, Product.id == per_key.c.product_id)
+        .join(Market, Market.id == per_key.c.market_id)
+        .order_by(per_key.c.latest_date.desc(), Product.name)
+    ).all()
+
+    products = []
+    for r in rows:
+        latest_price = float(r.latest_price)
+        latest_avg = float(r.latest_market_avg) if r.latest_market_avg is not None else None
+        reviewed = r.approved + r.rejected
+        products.append({
+            "product_id": r.product_id,
+            "product_name": r.product_name,
+            "unit": r.unit,
+            "market_id": r.market_id,
+            "market_name": r.market_name,
+            "latest_date": r.latest_date,
+            "latest_price": latest_price,
+            "latest_status": r.latest_status,
+            "latest_market_avg": round(latest_avg, 2) if latest_avg is not None else None,
+            "latest_deviation_pct": _pct((latest_price - latest_avg) / latest_avg) if latest_avg else None,
+            "deviation_30d_pct": _pct(r.deviation_30d),
+            "deviation_prev_30d_pct": _pct(r.deviation_prev_30d),
+            "deviation_all_time_pct": _pct(r.deviation_all_time),
+            "compared_entries": r.compared_entries,
+            "submissions": r.submissions,
+            "approved": r.approved,
+            "rejected": r.rejected,
+            "pending": r.pending,
+            "approval_rate": round(r.approved / reviewed, 3) if reviewed else None,
+        })
+
+    approved = sum(p["approved"] for p in products)
+    reviewed = approved + sum(p["rejected"] for p in products)
+    return {
+        "vendor_id": vendor_id,
+        "as_of": today,
+        "submissions": sum(p["submissions"] for p in products),
+        "approved": approved,
+        "rejected": reviewed - approved,
+        "pending": sum(p["pending"] for p in products),
+        "approval_rate": round(approved / reviewed, 3) if reviewed else None,
+        "products": products,
+    }
+
+
 def update_vendor_submission(db: Session, entry_id: int, vendor_id: int, payload: PriceEntryUpdate) -> PriceEntry:
     entry = db.query(PriceEntry).filter(
         PriceEntry.id == entry_id,
@@ -41,6 +183,7 @@ def update_vendor_submission(db: Session, entry_id: int, vendor_id: int, payload
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found or not editable")
     entry.price_per_unit = payload.price_per_unit
+    record_events(db, PriceEventType.updated, [entry.id])
     db.commit()
     db.refresh(entry)
     return entry
@@ -51,32 +194,156 @@ def admin_review_entry(db: Session, entry_id: int, payload: AdminReview, admin_i
     entry = db.query(PriceEntry).filter(PriceEntry.id == entry_id).first()
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
+    was_approved = entry.status == ApprovalStatus.approved
     entry.status = payload.status
     entry.admin_note = payload.admin_note
     entry.reviewed_by = admin_id
     entry.reviewed_at = datetime.utcnow()
+    affects_stats = was_approved or payload.status.value == ApprovalStatus.approved.value
+    key = (entry.product_id, entry.market_id, entry.entry_date)
+    if affects_stats:
+        db.flush()
+        refresh_daily_stats(db, [key])
+    record_events(db, PriceEventType.reviewed, [entry.id], actor_id=admin_id)
     db.commit()
+    if affects_stats:
+        publish_day_stats(db, [key])
+        invalidate_price_changes([(entry.product_id, entry.entry_date)])
     db.refresh(entry)
     return entry
 
 
-def get_all_submissions(
-    db: Session,
+def _submission_conditions(
+    entity,
     product_id: Optional[int] = None,
     market_id: Optional[int] = None,
     vendor_id: Optional[int] = None,
     status: Optional[ApprovalStatus] = None,
     entry_date: Optional[date] = None,
-) -> List[PriceEntry]:
-    q = db.query(PriceEntry)
+    flagged: Optional[bool] = None,
+) -> list:
+    """WHERE clauses of the admin submissions filters, for PriceEntry or an alias of it"""
+    conditions = []
     if product_id:
-        q = q.filter(PriceEntry.product_id == product_id)
+        conditions.append(entity.product_id == product_id)
     if market_id:
-        q = q.filter(PriceEntry.market_id == market_id)
+        conditions.append(entity.market_id == market_id)
     if vendor_id:
-        q = q.filter(PriceEntry.vendor_id == vendor_id)
+        conditions.append(entity.vendor_id == vendor_id)
     if status:
-        q = q.filter(PriceEntry.status == status)
+        conditions.append(entity.status == status)
     if entry_date:
-        q = q.filter(PriceEntry.entry_date == entry_date)
-    return q.order_by(PriceEntry.created_at.desc()).all()
+        conditions.append(entity.entry_date == entry_date)
+    if flagged is not None:
+        conditions.append(entity.flagged == flagged)
+    return conditions
+
+
+def get_all_submissions(
+    db: Session,
+    product_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    vendor_id: Optional[int] = None,
+    status: Optional[ApprovalStatus] = None,
+    entry_date: Optional[date] = None,
+    flagged: Optional[bool] = None,
+) -> List[PriceEntry]:
+    conditions = _submission_conditions(PriceEntry, product_id, market_id, vendor_id, status, entry_date, flagged)
+    return (
+        db.query(PriceEntry)
+        .options(*ENTRY_RELATIONS)
+        .filter(*conditions)
+        .order_by(PriceEntry.created_at.desc())
+        .all()
+    )
+
+
+def _planner_row_estimate(db: Session, stmt) -> int:
+    """Row count the planner expects `stmt` to return, from EXPLAIN without running it"""
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_submission_facets(db: Session, **filters) -> dict:
+    """
+    Total and per status/market/product counts for the admin submissions
+    filters. The planner's estimate decides the method: up to
+    FACET_EXACT_THRESHOLD matching rows, one exact GROUPING SETS query;
+    above it, the total is the planner estimate and the facets come from the
+    same query over a TABLESAMPLE SYSTEM page sample, scaled up. Every count
+    says whether it is exact.
+    """
+    conditions = _submission_conditions(PriceEntry, **filters)
+    estimate = _planner_row_estimate(db, select(PriceEntry.id).where(*conditions))
+    exact = estimate <= settings.FACET_EXACT_THRESHOLD
+
+    entity = PriceEntry
+    if not exact:
+        table_rows = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = 'price_entries'::regclass")
+        ).scalar() or 0
+        percent = min(100.0, max(0.01, 100.0 * settings.FACET_SAMPLE_ROWS / max(table_rows, 1)))
+        entity = aliased(PriceEntry, tablesample(PriceEntry.__table__, func.system(percent)))
+        conditions = _submission_conditions(entity, **filters)
+
+    grouping = func.grouping(entity.status, entity.market_id, entity.product_id)
+    rows = db.execute(
+        select(entity.status, entity.market_id, entity.product_id, grouping.label("g"), func.count().label("n"))
+        .where(*conditions)
+        .group_by(func.grouping_sets(
+            tuple_(entity.status), tuple_(entity.market_id), tuple_(entity.product_id), tuple_(),
+        ))
+    ).all()
+
+    # grouping() sets the bits of the columns *not* grouped: 0b011 = by status, 0b101 = by market, 0b110 = by product
+    total = next((r.n for r in rows if r.g == 0b111), 0)
+    # Sampled: the sample gives the proportions, the planner estimate the magnitude
+    scale = 1.0 if exact else (estimate / total if total else 0.0)
+    by_set = {0b011: [], 0b101: [], 0b110: []}
+    for r in rows:
+        if r.g in by_set:
+            key = r.status.value if r.g == 0b011 else r.market_id if r.g == 0b101 else r.product_id
+            by_set[r.g].append((key, int(round(r.n * scale))))
+    if not exact:
+        total = estimate
+
+    market_names = dict(db.query(Market.id, Market.name).filter(Market.id.in_([k for k, _ in by_set[0b101]])).all())
+    product_names = dict(db.query(Product.id, Product.name).filter(Product.id.in_([k for k, _ in by_set[0b110]])).all())
+
+    def facet(pairs, labels=None):
+        return [
+            {"value": key, "label": labels.get(key) if labels else None, "count": count, "exact": exact}
+            for key, count in sorted(pairs, key=lambda kv: kv[1], reverse=True)
+        ]
+
+    return {
+        "total": total,
+        "total_exact": exact,
+        "method": "exact" if exact else "sampled",
+        "status": facet(by_set[0b011]),
+        "market": facet(by_set[0b101], market_names),
+        "product": facet(by_set[0b110], product_names),
+    }
+
+
+def expire_stale_pending(db: Session, older_than_days: int) -> int:
+    """Reject pending entries nobody reviewed within `older_than_days` of their entry date"""
+    from datetime import datetime
+    cutoff = date.today() - timedelta(days=older_than_days)
+    expired = db.scalars(
+        update(PriceEntry)
+        .where(PriceEntry.status == ApprovalStatus.pending, PriceEntry.entry_date < cutoff)
+        .values(
+            status=ApprovalStatus.rejected,
+            admin_note=f"Expired: not reviewed within {older_than_days} days",
+            reviewed_at=datetime.utcnow(),
+        )
+        .returning(PriceEntry.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    record_events(db, PriceEventType.expired, expired)
+    db.commit()
+    return len(expired)
@@ -0,0 +1,256 @@
+"""
+In-memory product search over English and Marathi product names and
+category names.
+
+The catalogue is small and changes rarely, so each worker keeps a trigram
+index (for typo-tolerant matching) and a sorted token list (for prefix
+matching) in memory and answers lookups without the database. The index is
+rebuilt by the worker that changes the catalogue and, in the background,
+by every worker once it is older than PRODUCT_SEARCH_REFRESH_SECONDS, to
+pick up changes made elsewhere.
+
+Text is NFKC-normalized and case-folded. Words are split on whitespace,
+punctuation and symbols only, so Devanagari vowel signs and viramas stay
+inside their words.
+"""
+import bisect
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.market import Product, ProductCategory
+
+logger = logging.getLogger(__name__)
+
+FIELD_WEIGHTS = {"name": 1.0, "name_marathi": 1.0, "category": 0.6, "category_marathi": 0.6}
+MIN_SCORE = 0.3
+PREFIX_BONUS = 0.5
+EXACT_BONUS = 1.0
+
+
+def normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join("".join(
+        " " if unicodedata.category(ch)[0] in "PSZC" else ch for ch in text
+    ).split())
+
+
+def trigrams(text: str) -> set:
+    """pg_trgm style: each word padded with two leading blanks and one trailing"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ProductSearchIndex:
+    """
+    Everything a lookup needs is laid out at build time. Identical texts in
+    the same field (category names, the Marathi name shared by variants of a
+    product) are one entry, scored once per query, holding the ranks of its
+    products in name order. A lookup counts shared trigrams per entry,
+    drops entries that cannot reach MIN_SCORE, scores the rest and expands
+    entries best-first into products only until `limit` are found.
+    """
+
+    def __init__(self, catalogue: List[Tuple[dict, dict]]):
+        """`catalogue` holds (product, searchable texts by field) pairs"""
+        self.products: Dict[int, dict] = {p["id"]: p for p, _ in catalogue}
+        by_name = sorted(self.products.values(), key=lambda p: (p["name"], p["id"]))
+        self._ranked_ids = [p["id"] for p in by_name]
+        self._ranked_categories = [p["category_id"] for p in by_name]
+        rank = {pid: i for i, pid in enumerate(self._ranked_ids)}
+
+        entries: Dict[Tuple[str, str], List[int]] = {}  # (field, text) -> product ranks
+        for p, texts in catalogue:
+            for field in FIELD_WEIGHTS:
+                text = normalize(texts.get(field))
+                if text:
+                    entries.setdefault((field, text), []).append(rank[p["id"]])
+
+        # Per entry, in parallel lists: field, text, weight, trigram count, product ranks
+        self._field: List[str] = []
+        self._text: List[str] = []
+        self._weight: List[float] = []
+        self._n_grams: List[int] = []
+        self._ranks: List[Tuple[int, ...]] = []
+        postings: Dict[str, List[int]] = defaultdict(list)  # trigram -> entries
+        tokens = []
+        for idx, ((field, text), ranks) in enumerate(entries.items()):
+            grams = trigrams(text)
+            self._field.append(field)
+            self._text.append(text)
+            self._weight.append(FIELD_WEIGHTS[field])
+            self._n_grams.append(len(grams))
+            self._ranks.append(tuple(sorted(set(ranks))))
+            for gram in grams:
+                postings[gram].append(idx)
+            tokens.extend((token, idx) for token in set(text.split()))
+        self._postings: Dict[str, Tuple[int, ...]] = {g: tuple(ids) for g, ids in postings.items()}
+        tokens.sort()
+        self._token_keys = [t for t, _ in tokens]
+        self._token_entries = [i for _, i in tokens]
+        self._max_weight = max(FIELD_WEIGHTS.values())
+        self.built_at = time.time()
+
+    def _prefixed(self, tokens: List[str]) -> set:
+        """Entries with a word starting with each query token"""
+        found = None
+        for token in tokens:
+            lo = bisect.bisect_left(self._token_keys, token)
+            hi = bisect.bisect_left(self._token_keys, token + "\U0010ffff", lo)
+            entries = set(self._token_entries[lo:hi])
+            found = entries if found is None else found & entries
+            if not found:
+                break
+        return found
+
+    def search(self, query: str, limit: int = 10, category_id: Optional[int] = None) -> List[dict]:
+        text = normalize(query)
+        if not text:
+            return []
+        q_grams = trigrams(text)
+        n_query = len(q_grams)
+        shared = Counter()
+        for gram in q_grams:
+            shared.update(self._postings.get(gram, ()))
+        prefixed = self._prefixed(text.split())
+
+        # Without the prefix bonus a score is at most coverage * weight, so
+        # entries sharing fewer trigrams than this cannot reach MIN_SCORE
+        min_common = MIN_SCORE * n_query / self._max_weight
+        candidates = {idx for idx, common in shared.items() if common >= min_common}
+        candidates |= prefixed
+
+        scored = []
+        for idx in candidates:
+            common = shared.get(idx, 0)
+            coverage = common / n_query  # how much of the query the field contains
+            jaccard = common / (n_query + self._n_grams[idx] - common)
+            score = 0.7 * coverage + 0.3 * jaccard
+            if idx in prefixed:
+                score += PREFIX_BONUS
+                if self._text[idx] == text:
+                    score += EXACT_BONUS
+            score *= self._weight[idx]
+            if score >= MIN_SCORE:
+                scored.append((score, idx))
+        scored.sort(reverse=True)
+
+        # Best entries first; entries with equal scores merge their products by name.
+        # A product's first appearance is its best-scoring field.
+        results: List[dict] = []
+        seen = set()
+        i = 0
+        while i < len(scored) and len(results) < limit:
+            score = scored[i][0]
+            group = []
+            while i < len(scored) and scored[i][0] == score:
+                group.append(scored[i][1])
+                i += 1
+            ranked = [zip(self._ranks[idx], repeat(self._field[idx])) for idx in group]
+            for r, field in (heapq.merge(*ranked) if len(ranked) > 1 else ranked[0]):
+                if r in seen:
+                    continue
+                seen.add(r)
+                if category_id is not None and self._ranked_categories[r] != category_id:
+                    continue
+                results.append({
+                    "product": self.products[self._ranked_ids[r]], "score": round(score, 3), "matched_field": field,
+                })
+                if len(results) == limit:
+                    break
+        return results
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+
+_index: Optional[ProductSearchIndex] = None
+_rebuild_lock = threading.Lock()
+state = {"products": 0, "built_at": None, "build_ms": None, "rebuilds": 0}
+
+
+def _load_catalogue(db: Session) -> List[Tuple[dict, dict]]:
+    rows = (
+        db.query(Product, ProductCategory.name, ProductCategory.name_marathi)
+        .outerjoin(ProductCategory, Product.category_id == ProductCategory.id)
+        .filter(Product.is_active == True)
+        .all()
+    )
+    return [
+        (
+            {
+                "id": p.id,
+                "name": p.name,
+                "name_marathi": p.name_marathi,
+                "category_id": p.category_id,
+                "unit": p.unit,
+                "is_active": p.is_active,
+            },
+            {
+                "name": p.name,
+                "name_marathi": p.name_marathi,
+                "category": category,
+                "category_marathi": category_marathi,
+            },
+        )
+        for p, category, category_marathi in rows
+    ]
+
+
+def rebuild(db: Optional[Session] = None) -> ProductSearchIndex:
+    """Reload the active catalogue and swap in a new index"""
+    global _index
+    started = time.perf_counter()
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        index = ProductSearchIndex(_load_catalogue(db))
+    finally:
+        if own_session:
+            db.close()
+    _index = index
+    state.update(
+        products=len(index),
+        built_at=index.built_at,
+        build_ms=round((time.perf_counter() - started) * 1000, 2),
+        rebuilds=state["rebuilds"] + 1,
+    )
+    return index
+
+
+def _refresh_in_background() -> None:
+    if not _rebuild_lock.acquire(blocking=False):
+        return  # a rebuild is already running
+
+    def run():
+        try:
+            rebuild()
+        except Exception:
+            logger.exception("Product search index rebuild failed; keeping the current index")
+        finally:
+            _rebuild_lock.release()
+    threading.Thread(target=run, name="product-search-rebuild", daemon=True).start()
+
+
+def search(query: str, limit: int = 10, category_id: Optional[int] = None) -> List[dict]:
+    index = _index
+    if index is None:
+        with _rebuild_lock:
+            index = _index or rebuild()
+    elif time.time() - index.built_at > settings.PRODUCT_SEARCH_REFRESH_SECONDS:
+        _refresh_in_background()  # keep serving the current index meanwhile
+    return index.search(query, limit, category_id)
@@ -0,0 +1,94 @@
+import math
+from typing import Dict, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 1024
+MIN_VALUE = 0.01  # smallest representable price (1 paisa)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with log-spaced buckets (DDSketch).
+
+    Error bound: for any quantile q, the returned value v satisfies
+    |v - x| <= relative_accuracy * x, where x is the exact order statistic at
+    rank floor(q * (count - 1)). With the default 1% accuracy a ₹40 median is
+    reported within ±₹0.40.
+
+    Memory: bucket k covers (gamma^(k-1), gamma^k] with
+    gamma = (1 + a) / (1 - a), so the full valid price range (₹0.01 to
+    ₹99,999) spans at most ~807 buckets at 1% accuracy and the bound holds
+    for every quantile. The sketch never holds more than `max_bins` buckets;
+    if that is ever exceeded the lowest buckets are collapsed, which only
+    degrades accuracy for the lowest quantiles.
+
+    Merging two sketches adds bucket counts, so the merged sketch carries
+    the same error bound as one built over the combined raw values.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        max_bins: int = DEFAULT_MAX_BINS,
+        bins: Optional[Dict[int, int]] = None,
+    ):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = dict(bins or {})
+        self.count = sum(self.bins.values())
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(max(value, MIN_VALUE)) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        key = self._key(float(value))
+        self.bins[key] = self.bins.get(key, 0) + weight
+        self.count += weight
+        self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.count += other.count
+        self._collapse()
+
+    def _collapse(self) -> None:
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        overflow = keys[: len(keys) - self.max_bins + 1]
+        target = overflow[-1]
+        self.bins[target] = sum(self.bins.pop(k) for k in overflow[:-1]) + self.bins[target]
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = math.floor(q * (self.count - 1))
+        seen = 0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.bins))
+
+    def to_dict(self) -> dict:
+        return {
+            "a": self.relative_accuracy,
+            "bins": {str(k): n for k, n in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "QuantileSketch":
+        if not data:
+            return cls()
+        return cls(
+            relative_accuracy=data.get("a", DEFAULT_RELATIVE_ACCURACY),
+            bins={int(k): n for k, n in data.get("bins", {}).items()},
+        )
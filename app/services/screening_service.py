@@ -0,0 +1,175 @@
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.price_entry import PriceEntry, ApprovalStatus
+from app.models.price_event import PriceEventType
+from app.services.daily_stats_service import refresh_daily_stats
+from app.services.analytics_service import invalidate_price_changes, publish_day_stats
+from app.services.event_service import record_events
+
+MAD_TO_SIGMA = 1.4826  # scales MAD to a standard deviation for normally distributed prices
+AUTO_APPROVE_NOTE = "Auto-approved by statistical screening"
+REPORT_SAMPLE_SIZE = 50
+
+
+def _pair_keys(product_ids: np.ndarray, market_ids: np.ndarray) -> np.ndarray:
+    return (product_ids.astype(np.int64) << 32) | market_ids.astype(np.int64)
+
+
+def _group_medians(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+    return (sorted_values[lo] + sorted_values[hi]) / 2
+
+
+def score_pending(
+    approved_keys: np.ndarray,
+    approved_prices: np.ndarray,
+    pending_keys: np.ndarray,
+    pending_prices: np.ndarray,
+    min_samples: int = settings.SCREEN_MIN_SAMPLES,
+    min_scale_pct: float = settings.SCREEN_MIN_SCALE_PCT,
+):
+    """
+    Robust z-scores of pending prices against the median/MAD of approved prices
+    for the same (product, market) key. Returns (median, scale, score) arrays
+    aligned with the pending input; score is NaN where history is too thin.
+    """
+    n = len(pending_keys)
+    median = np.full(n, np.nan)
+    scale = np.full(n, np.nan)
+    if len(approved_keys) == 0 or n == 0:
+        return median, scale, np.full(n, np.nan)
+
+    order = np.lexsort((approved_prices, approved_keys))
+    keys = approved_keys[order]
+    prices = approved_prices[order]
+    uniq, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+
+    group_median = _group_medians(prices, starts, counts)
+    deviations = np.abs(prices - np.repeat(group_median, counts))
+    group_index = np.repeat(np.arange(len(uniq)), counts)
+    deviations = deviations[np.lexsort((deviations, group_index))]
+    group_scale = np.maximum(
+        MAD_TO_SIGMA * _group_medians(deviations, starts, counts),
+        group_median * min_scale_pct,
+    )
+
+    pos = np.clip(np.searchsorted(uniq, pending_keys), 0, len(uniq) - 1)
+    matched = (uniq[pos] == pending_keys) & (counts[pos] >= min_samples)
+    median[matched] = group_median[pos[matched]]
+    scale[matched] = group_scale[pos[matched]]
+    score = np.abs(pending_prices - median) / scale
+    return median, scale, score
+
+
+def screen_pending_entries(
+    db: Session,
+    band: Optional[float] = None,
+    dry_run: bool = False,
+    window_days: Optional[int] = None,
+) -> dict:
+    """
+    Score every pending entry in one pass. Entries within `band` robust
+    standard deviations of the approved median are auto-approved, the rest are
+    flagged for manual review. Pairs without enough history are left untouched.
+    """
+    started = time.perf_counter()
+    band = band if band is not None else settings.SCREEN_APPROVE_BAND
+    since = date.today() - timedelta(days=window_days or settings.SCREEN_WINDOW_DAYS)
+
+    approved = (
+        db.query(PriceEntry.product_id, PriceEntry.market_id, PriceEntry.price_per_unit)
+        .filter(
+            PriceEntry.status == ApprovalStatus.approved,
+            PriceEntry.entry_date >= since,
+        )
+        .all()
+    )
+    pending = (
+        db.query(
+            PriceEntry.id, PriceEntry.product_id, PriceEntry.market_id,
+            PriceEntry.price_per_unit, PriceEntry.entry_date,
+        )
+        .filter(PriceEntry.status == ApprovalStatus.pending)
+        .all()
+    )
+    loaded = time.perf_counter()
+
+    a = np.array(approved, dtype=np.float64).reshape(-1, 3)
+    p = np.array([r[:4] for r in pending], dtype=np.float64).reshape(-1, 4)
+    ids = p[:, 0].astype(np.int64)
+    median, scale, score = score_pending(
+        _pair_keys(a[:, 0], a[:, 1]), a[:, 2],
+        _pair_keys(p[:, 1], p[:, 2]), p[:, 3],
+    )
+    scored = ~np.isnan(score)
+    approve = scored & (score <= band)
+    flag = scored & ~approve
+    computed = time.perf_counter()
+
+    if not dry_run and scored.any():
+        auto_approved = db.scalars(
+            text("""
+                UPDATE price_entries AS pe
+                SET screening_score = v.score,
+                    flagged = v.flag,
+                    status = CASE WHEN v.approve THEN 'approved'::approvalstatus ELSE pe.status END,
+                    admin_note = CASE WHEN v.approve THEN :note ELSE pe.admin_note END,
+                    reviewed_at = CASE WHEN v.approve THEN now() ELSE pe.reviewed_at END
+                FROM unnest(
+                    CAST(:ids AS integer[]), CAST(:scores AS double precision[]),
+                    CAST(:flags AS boolean[]), CAST(:approve AS boolean[])
+                ) AS v(id, score, flag, approve)
+                WHERE pe.id = v.id AND pe.status = 'pending'
+                RETURNING CASE WHEN v.approve THEN pe.id END
+            """),
+            {
+                "ids": ids[scored].tolist(),
+                "scores": score[scored].round(3).tolist(),
+                "flags": flag[scored].tolist(),
+                "approve": approve[scored].tolist(),
+                "note": AUTO_APPROVE_NOTE,
+            },
+        ).all()
+        approved_keys = [
+            (pending[i].product_id, pending[i].market_id, pending[i].entry_date)
+            for i in np.flatnonzero(approve)
+        ]
+        refresh_daily_stats(db, approved_keys)
+        record_events(db, PriceEventType.auto_approved, filter(None, auto_approved))
+        db.commit()
+        publish_day_stats(db, approved_keys)
+        invalidate_price_changes((k[0], k[2]) for k in approved_keys)
+
+    flagged_idx = np.flatnonzero(flag)
+    flagged_idx = flagged_idx[np.argsort(-score[flagged_idx])][:REPORT_SAMPLE_SIZE]
+    return {
+        "dry_run": dry_run,
+        "band": band,
+        "window_days": window_days or settings.SCREEN_WINDOW_DAYS,
+        "scanned": int(len(ids)),
+        "auto_approved": int(approve.sum()),
+        "flagged": int(flag.sum()),
+        "skipped": int((~scored).sum()),
+        "top_flagged": [
+            {
+                "entry_id": int(ids[i]),
+                "price_per_unit": float(p[i, 3]),
+                "median": float(median[i]),
+                "score": round(float(score[i]), 3),
+            }
+            for i in flagged_idx
+        ],
+        "timing_ms": {
+            "load": round((loaded - started) * 1000, 2),
+            "score": round((computed - loaded) * 1000, 2),
+            "total": round((time.perf_counter() - started) * 1000, 2),
+        },
+    }
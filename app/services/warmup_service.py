@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.market import Market
+from app.models.price_stats import PriceDailyStat
+from app.services import analytics_service
+
+logger = logging.getLogger(__name__)
+
+WarmKey = Tuple[str, int, Optional[int]]  # (kind, product_id, market_id or city_id)
+
+state = {
+    "ready": False,
+    "started_at": None,
+    "duration_ms": None,
+    "planned": 0,
+    "warmed": 0,
+    "failed": 0,
+    "timed_out": False,
+    "source": None,
+}
+
+
+def _load_saved_keys(n: int) -> List[WarmKey]:
+    try:
+        with open(settings.WARMUP_STATE_FILE) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return []
+    # Halve inherited counts on every restart so yesterday's hot keys fade out
+    analytics_service.hot_keys.merge((tuple(k), (c + 1) // 2) for k, c in saved)
+    return [key for key, _ in analytics_service.hot_keys.top(n)]
+
+
+def save_hot_keys() -> None:
+    """Persist request counts so the next worker start warms the same keys"""
+    top = analytics_service.hot_keys.top(settings.WARMUP_TOP_N * 4)
+    tmp = f"{settings.WARMUP_STATE_FILE}.{os.getpid()}"
+    try:
+        with open(tmp, "w") as f:
+            json.dump([[list(k), c] for k, c in top], f)
+        os.replace(tmp, settings.WARMUP_STATE_FILE)
+    except OSError:
+        logger.warning("Could not save hot analytics keys", exc_info=True)
+
+
+def _busiest_keys(db: Session, n: int) -> List[WarmKey]:
+    """Fallback when no request history is saved: the pairs with the most approved entries this week"""
+    since = date.today() - timedelta(days=7)
+    rows = (
+        db.query(PriceDailyStat.product_id, PriceDailyStat.market_id, Market.city_id)
+        .join(Market, PriceDailyStat.market_id == Market.id)
+        .filter(PriceDailyStat.stat_date >= since)
+        .group_by(PriceDailyStat.product_id, PriceDailyStat.market_id, Market.city_id)
+        .order_by(func.sum(PriceDailyStat.entry_count).desc())
+        .limit(n)
+        .all()
+    )
+    keys: List[WarmKey] = [("product", r.product_id, r.market_id) for r in rows]
+    keys += list(dict.fromkeys(("all_markets", r.product_id, r.city_id) for r in rows))
+    keys += list(dict.fromkeys(("all_markets", r.product_id, None) for r in rows))
+    return keys
+
+
+def plan_keys(n: int) -> List[WarmKey]:
+    """Most-requested keys from the saved history, topped up with the busiest pairs"""
+    keys = _load_saved_keys(n)
+    state["source"] = "request_history" if keys else "approved_volume"
+    if len(keys) < n:
+        db = SessionLocal()
+        try:
+            keys = list(dict.fromkeys(keys + _busiest_keys(db, n - len(keys))))
+        finally:
+            db.close()
+    return keys
+
+
+def _warm_one(key: WarmKey) -> None:
+    db = SessionLocal()
+    try:
+        analytics_service.warm(db, *key)
+    finally:
+        db.close()
+
+
+async def warm_analytics_cache() -> None:
+    """
+    Pre-compute today's analytics for the hottest keys, at most
+    WARMUP_CONCURRENCY at a time, within WARMUP_TIME_BUDGET_SECONDS. The
+    worker is marked ready when this finishes or the budget runs out.
+    """
+    started = time.perf_counter()
+    state["started_at"] = time.time()
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=settings.WARMUP_CONCURRENCY, thread_name_prefix="warmup")
+    try:
+        keys = await loop.run_in_executor(executor, plan_keys, settings.WARMUP_TOP_N)
+        state["planned"] = len(keys)
+        futures = [loop.run_in_executor(executor, _warm_one, key) for key in keys]
+        remaining = settings.WARMUP_TIME_BUDGET_SECONDS - (time.perf_counter() - started)
+        if futures:
+            done, pending = await asyncio.wait(futures, timeout=max(remaining, 0))
+            state["warmed"] = sum(1 for f in done if f.exception() is None)
+            state["failed"] = sum(1 for f in done if f.exception() is not None)
+            state["timed_out"] = bool(pending)
+            for f in pending:
+                f.cancel()
+    except Exception:
+        logger.exception("Analytics warm-up failed; serving cold")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        state["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        state["ready"] = True
+        logger.info("Analytics warm-up: %s", state)
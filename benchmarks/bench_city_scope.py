@@ -0,0 +1,115 @@
+"""
+City-scoped aggregation with and without the denormalized price_entries.city_id:
+  python benchmarks/bench_city_scope.py [days]
+
+Uses DATABASE_URL. Generates cities x markets x products x days approved
+entries server-side inside one transaction that is rolled back at the end,
+so the database is left untouched. Each case runs the same aggregate once
+filtering through a join to markets and once on price_entries.city_id
+(served by ix_price_entries_city_product_date).
+"""
+import sys
+import os
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, timedelta
+from sqlalchemy import func, text
+from app.db.database import SessionLocal
+from app import models  # noqa - register models
+from app.models.user import User, UserRole
+from app.models.market import City, Market, Product, ProductCategory
+from app.models.price_entry import PriceEntry, ApprovalStatus
+
+CITIES = 4
+MARKETS_PER_CITY = 8
+PRODUCTS = 40
+
+
+def timed(fn, runs=7):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def plan_nodes(db, query) -> str:
+    compiled = query.statement.compile(db.get_bind())
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    nodes, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node["Node Type"] + (f" {node['Index Name']}" if "Index Name" in node else ""))
+        stack.extend(node.get("Plans", []))
+    return ", ".join(dict.fromkeys(nodes))
+
+
+def main(days: int = 365):
+    db = SessionLocal()
+    try:
+        stamp = time.time_ns()
+        cities = [City(name=f"Bench City {stamp}-{i}", state="Bench") for i in range(CITIES)]
+        cat = ProductCategory(name=f"Bench Category {stamp}")
+        vendor = User(full_name="Bench Vendor", email=f"bench{stamp}@example.com",
+                      hashed_password="x", role=UserRole.vendor)
+        db.add_all([*cities, cat, vendor])
+        db.flush()
+        markets = [Market(name=f"Bench Market {i}", area="Bench", city_id=c.id)
+                   for c in cities for i in range(MARKETS_PER_CITY)]
+        products = [Product(name=f"Bench Product {i}", category_id=cat.id, unit="kg") for i in range(PRODUCTS)]
+        db.add_all(markets + products)
+        db.flush()
+
+        today = date.today()
+        db.execute(text("""
+            INSERT INTO price_entries (vendor_id, product_id, market_id, city_id, price_per_unit, entry_date, status, flagged)
+            SELECT :vendor, p, m.id, m.city_id, round((20 + random() * 60)::numeric, 2), d::date, 'approved', false
+            FROM unnest(CAST(:products AS int[])) AS p,
+                 markets AS m,
+                 generate_series(CAST(:start AS date), CAST(:today AS date), interval '1 day') AS d
+            WHERE m.id = ANY(CAST(:markets AS int[]))
+        """), {
+            "vendor": vendor.id, "products": [p.id for p in products], "markets": [m.id for m in markets],
+            "start": today - timedelta(days=days - 1), "today": today,
+        })
+        db.execute(text("ANALYZE price_entries"))
+        db.execute(text("ANALYZE markets"))
+        total = CITIES * MARKETS_PER_CITY * PRODUCTS * days
+        print(f"entries: {total:,}  ({CITIES} cities x {MARKETS_PER_CITY} markets x {PRODUCTS} products x {days} days)")
+
+        city_id, product_id, since = cities[0].id, products[0].id, today - timedelta(days=30)
+
+        def fluctuating(q, city_filter):
+            return (
+                q.filter(city_filter, PriceEntry.status == ApprovalStatus.approved,
+                         PriceEntry.entry_date >= since, PriceEntry.entry_date <= today)
+                .group_by(PriceEntry.product_id)
+                .order_by(func.stddev(PriceEntry.price_per_unit).desc())
+                .limit(5)
+            )
+
+        def product_in_city(q, city_filter):
+            return q.filter(city_filter, PriceEntry.product_id == product_id, PriceEntry.entry_date >= since)
+
+        base = lambda: db.query(PriceEntry.product_id, func.stddev(PriceEntry.price_per_unit))
+        count = lambda: db.query(func.count(), func.avg(PriceEntry.price_per_unit))
+        joined = lambda q: q.join(Market, PriceEntry.market_id == Market.id)
+        cases = [
+            ("fluctuating 30d, join markets", fluctuating(joined(base()), Market.city_id == city_id)),
+            ("fluctuating 30d, city_id", fluctuating(base(), PriceEntry.city_id == city_id)),
+            ("one product 30d, join markets", product_in_city(joined(count()), Market.city_id == city_id)),
+            ("one product 30d, city_id", product_in_city(count(), PriceEntry.city_id == city_id)),
+        ]
+        for name, query in cases:
+            ms, rows = timed(query.all)
+            print(f"{name:<32} {ms:8.2f} ms  {len(rows):>2} rows  plan: {plan_nodes(db, query)}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,70 @@
+"""
+Measures worker cold start (interpreter + imports + lifespan startup) in a
+fresh process per run, for the create_all boot and the fast boot:
+  python benchmarks/bench_cold_start.py [runs]
+
+Uses DATABASE_URL; the fast-boot run needs a database migrated with
+`alembic upgrade head`. Scheduler and warm-up are disabled so only boot
+work is measured. Also prints the heaviest imports from one profiled run.
+"""
+import sys
+import os
+import json
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+async def boot():
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+        from app.core import startup_profile
+        print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000,
+                          "profile": startup_profile.report(top=8)}))
+asyncio.run(boot())
+"""
+
+
+def run_child(extra_env):
+    env = {**os.environ, "SCHEDULER_ENABLED": "false", "WARMUP_ENABLED": "false", **extra_env}
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1]
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = wall
+    return result, None
+
+
+def main(runs: int = 5):
+    modes = [("create_all boot", {"FAST_BOOT": "false"}), ("fast boot", {"FAST_BOOT": "true"})]
+    for name, env in modes:
+        samples, error = [], None
+        for _ in range(runs):
+            result, error = run_child(env)
+            if result is None:
+                break
+            samples.append(result)
+        if not samples:
+            print(f"{name:<16} failed: {error}")
+            continue
+        med = {k: statistics.median(s[k] for s in samples) for k in ("wall_ms", "import_ms", "startup_ms")}
+        print(f"{name:<16} wall {med['wall_ms']:7.1f} ms   imports {med['import_ms']:7.1f} ms   "
+              f"lifespan startup {med['startup_ms']:6.1f} ms   (median of {len(samples)})")
+
+    profiled, error = run_child({"STARTUP_PROFILE": "1"})
+    if profiled:
+        print("\nheaviest imports by package (self time, ms):")
+        for pkg, ms in profiled["profile"]["by_package_ms"].items():
+            print(f"  {pkg:<32} {ms:8.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,98 @@
+"""
+Back-tests the nightly Holt forecasts and times the vectorized fit:
+  python benchmarks/bench_forecast.py [series] [history_days]
+
+Runs on synthetic arrays only, no database needed. Each series is a drifting
+random walk with weekly seasonality, day-to-day noise and missing days. The
+model is fitted on the history, then the next 7 days are compared with
+held-out values, against the last observed price and the trailing 7-day mean
+as baselines. A plain per-series Python loop over the same parameter grid is
+timed on a subset for reference.
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.forecast_service import ALPHAS, BETAS, fit_holt, forecast_holt
+
+HORIZON = 7
+MISSING = 0.2
+LOOP_SAMPLE = 100
+
+
+def synthetic(series: int, days: int, rng) -> np.ndarray:
+    base = rng.uniform(20, 200, (series, 1))
+    drift = rng.normal(0, 0.002, (series, 1))
+    walk = np.cumsum(rng.normal(0, 0.01, (series, days)), axis=1)
+    weekly = 0.02 * np.sin(2 * np.pi * np.arange(days) / 7 + rng.uniform(0, 2 * np.pi, (series, 1)))
+    noise = rng.normal(0, 0.03, (series, days))
+    return base * np.exp(drift * np.arange(days) + walk + weekly + noise)
+
+
+def holt_loop(y: np.ndarray) -> tuple:
+    """Reference: one series at a time, one grid point at a time"""
+    best = (np.inf, None, None)
+    observed = [(t, v) for t, v in enumerate(y) if not np.isnan(v)]
+    for a in ALPHAS:
+        for b in BETAS:
+            level, trend, sse, last_t = observed[0][1], 0.0, 0.0, observed[0][0]
+            for t, v in observed[1:]:
+                for _ in range(t - last_t - 1):
+                    level += trend
+                predicted = level + trend
+                sse += (v - predicted) ** 2
+                new_level = predicted + a * (v - predicted)
+                trend = b * (new_level - level) + (1 - b) * trend
+                level, last_t = new_level, t
+            if sse < best[0]:
+                best = (sse, level, trend)
+    return best
+
+
+def errors(forecast: np.ndarray, actual: np.ndarray) -> tuple:
+    mae = np.mean(np.abs(forecast - actual))
+    mape = np.mean(np.abs(forecast - actual) / actual) * 100
+    return mae, mape
+
+
+def main(series: int = 10_000, days: int = 90):
+    rng = np.random.default_rng(7)
+    full = synthetic(series, days + HORIZON, rng)
+    history, actual = full[:, :days].copy(), full[:, days:]
+    history[rng.random(history.shape) < MISSING] = np.nan
+    history[:, -1] = full[:, days - 1]  # every series has a price on the last day
+
+    runs = []
+    for _ in range(3):
+        started = time.perf_counter()
+        fit = fit_holt(history)
+        point, lower, upper = forecast_holt(fit, HORIZON)
+        runs.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for row in history[:LOOP_SAMPLE]:
+        holt_loop(row)
+    loop = (time.perf_counter() - started) * series / LOOP_SAMPLE
+
+    last = history[:, -1:].repeat(HORIZON, axis=1)
+    mean7 = np.nanmean(history[:, -7:], axis=1, keepdims=True).repeat(HORIZON, axis=1)
+    coverage = np.mean((actual >= lower) & (actual <= upper)) * 100
+
+    print(f"series={series:,} history={days} days ({MISSING:.0%} missing) horizon={HORIZON} "
+          f"grid={len(ALPHAS) * len(BETAS)} (alpha, beta) pairs")
+    print(f"vectorized fit + forecast: best {min(runs) * 1000:.1f} ms, median {sorted(runs)[1] * 1000:.1f} ms")
+    print(f"per-series Python loop:    ~{loop:.1f} s (extrapolated from {LOOP_SAMPLE} series)")
+    print(f"{'method':<16}{'MAE':>10}{'MAPE %':>10}")
+    for name, forecast in (("holt", point), ("last value", last), ("7-day mean", mean7)):
+        mae, mape = errors(forecast, actual)
+        print(f"{name:<16}{mae:>10.3f}{mape:>10.2f}")
+    print(f"holt 95% interval coverage: {coverage:.1f}%")
+    for h in (1, HORIZON):
+        mae, mape = errors(point[:, h - 1], actual[:, h - 1])
+        print(f"  h={h}: MAE {mae:.3f}  MAPE {mape:.2f}%")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]])
@@ -0,0 +1,124 @@
+"""
+Payload size and encode time of the negotiated response formats:
+  python benchmarks/bench_payload_size.py [markets] [trend_days] [products]
+
+Runs on synthetic payloads shaped like /analytics/product/{id}/all-markets,
+the daily trend and the product catalogue, no database needed. The baseline
+is the current response_model path: validate, dump to JSON-able Python, then
+json.dumps, as FastAPI does. The negotiated formats go through the same
+validation and then encode with orjson/msgpack, so "ms" is the whole
+serialization per request; "+br ms" adds brotli at the configured quality.
+"""
+import sys
+import os
+import json
+import random
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, timedelta
+from typing import List
+from pydantic import TypeAdapter
+from app.core import compression, serialization
+from app.core.serialization import RESPONSE_FORMATS
+from app.schemas.schemas import MarketStats, ProductOut, TrendSeries
+
+FORMATS = [
+    "application/json",
+    "application/msgpack",
+    "application/vnd.fairprice.columnar+json",
+    "application/vnd.fairprice.columnar+msgpack",
+]
+AREAS = ["Dadar", "Andheri", "Bandra", "Borivali", "Vasai", "Navi Mumbai", "Thane", "Kurla", "Malad", "Chembur"]
+NAMES_MARATHI = ["टोमॅटो", "कांदा", "बटाटा", "हिरवी मिरची", "केळ", "आंबा", "तांदूळ", "गहू पीठ"]
+
+
+def all_markets(n, rng):
+    rows = []
+    for i in range(n):
+        area = AREAS[i % len(AREAS)]
+        avg = round(rng.uniform(30, 60), 2)
+        rows.append({
+            "market_id": i + 1, "market_name": f"{area} Market {i // len(AREAS) + 1}", "area": area,
+            "avg_price": avg, "min_price": round(avg * 0.9, 2), "max_price": round(avg * 1.1, 2),
+            "p10_price": round(avg * 0.92, 2), "median_price": avg, "p90_price": round(avg * 1.08, 2),
+            "vendor_count": rng.randint(1, 12), "spike_alert": rng.random() < 0.05,
+        })
+    return List[MarketStats], rows
+
+
+def trend(days, rng):
+    start = date.today() - timedelta(days=days - 1)
+    price, points = 40.0, []
+    for d in range(days):
+        price = max(price * (1 + rng.gauss(0, 0.02)), 5)
+        points.append({
+            "entry_date": start + timedelta(days=d), "avg_price": round(price, 2),
+            "min_price": round(price * 0.9, 2), "max_price": round(price * 1.1, 2), "vendor_count": rng.randint(1, 8),
+        })
+    series = {"product_id": 1, "market_id": 1, "from_date": start, "to_date": date.today(), "bucket": "day",
+              "points": points}
+    return TrendSeries, series
+
+
+def catalogue(n, rng):
+    rows = [
+        {"id": i + 1, "name": f"Product {i + 1}", "name_marathi": f"{NAMES_MARATHI[i % len(NAMES_MARATHI)]} {i + 1}",
+         "category_id": i % 12 + 1, "unit": rng.choice(["kg", "kg", "kg", "dozen", "litre", "piece"]), "is_active": True}
+        for i in range(n)
+    ]
+    return List[ProductOut], rows
+
+
+def timed(fn, runs=7):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), out
+
+
+def main(markets: int = 60, trend_days: int = 365, products: int = 300):
+    rng = random.Random(7)
+    encoder = "orjson" if serialization._orjson() else "stdlib json"
+    print(f"json encoder: {encoder}, gzip level {compression.settings.COMPRESSION_GZIP_LEVEL}, "
+          f"brotli quality {compression.settings.COMPRESSION_BROTLI_QUALITY}")
+    for label, (schema, payload) in (
+        (f"all-markets ({markets} markets)", all_markets(markets, rng)),
+        (f"trend ({trend_days} days)", trend(trend_days, rng)),
+        (f"catalogue ({products} products)", catalogue(products, rng)),
+    ):
+        adapter = TypeAdapter(schema)
+
+        def response_model_path():
+            content = adapter.dump_python(adapter.validate_python(payload), mode="json")
+            return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        def validated():
+            return adapter.dump_python(adapter.validate_python(payload), mode="json")
+
+        base_ms, base = timed(response_model_path)
+        print(f"\n{label}")
+        print(f"{'format':<44}{'bytes':>8}{'vs json':>9}{'ms':>8}{'gzip':>8}{'br':>8}{'+br ms':>8}")
+        rows = [("response_model json (current)", base, base_ms)]
+        for media_type in FORMATS:
+            fmt = RESPONSE_FORMATS[media_type]
+            if fmt.msgpack and serialization._msgpack() is None:
+                print(f"{media_type:<44}  (msgpack not installed)")
+                continue
+            ms, body = timed(lambda: fmt.encode(validated()))
+            rows.append((media_type, body, ms))
+        for name, body, ms in rows:
+            gz = len(compression.compress(body, "gzip"))
+            if compression._brotli() is not None:
+                br_ms, br = timed(lambda: compression.compress(body, "br"))
+                br_cols = f"{len(br):>8,}{ms + br_ms:>8.2f}"
+            else:
+                br_cols = f"{'-':>8}{'-':>8}"
+            print(f"{name:<44}{len(body):>8,}{len(body) / len(base):>8.0%} {ms:>7.2f}{gz:>8,}{br_cols}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:4]])
@@ -0,0 +1,74 @@
+"""
+Product search lookup latency on a synthetic catalogue:
+  python benchmarks/bench_product_search.py [products]
+
+Builds the in-memory index directly (no database) from generated English
+and Marathi names, then times exact, prefix, typo and Marathi queries.
+Exits 1 when the p95 over all queries exceeds BUDGET_P95_US (at 2000
+products a scan of every field took 1-3 ms per lookup).
+"""
+import sys
+import os
+import random
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.product_search import ProductSearchIndex
+
+BASES = [
+    ("Tomato", "टोमॅटो"), ("Onion", "कांदा"), ("Potato", "बटाटा"), ("Green Chilli", "हिरवी मिरची"),
+    ("Cauliflower", "फुलकोबी"), ("Spinach", "पालक"), ("Brinjal", "वांगी"), ("Ginger", "आले"),
+    ("Garlic", "लसूण"), ("Coriander", "कोथिंबीर"), ("Wheat", "गहू"), ("Rice", "तांदूळ"),
+    ("Toor Dal", "तूर डाळ"), ("Groundnut Oil", "शेंगदाणा तेल"), ("Banana", "केळी"), ("Mango", "आंबा"),
+]
+VARIANTS = ["", "Local", "Hybrid", "Organic", "Premium", "Nashik", "Pune", "Loose", "Small", "Large"]
+CATEGORIES = [("Vegetables", "भाजी"), ("Grains", "धान्य"), ("Pulses", "डाळी"), ("Oils", "तेल"), ("Fruits", "फळे")]
+QUERIES = {
+    "exact": ["Tomato", "Green Chilli", "Groundnut Oil"],
+    "prefix": ["tom", "oni", "caul", "grou"],
+    "typo": ["tomatoe", "onoin", "cauliflour", "corriander"],
+    "marathi": ["टोमॅटो", "कांदा", "मिरची", "भाजी"],
+}
+BUDGET_P95_US = 1000.0
+
+
+def catalogue(n: int):
+    rng = random.Random(1)
+    rows = []
+    for i in range(n):
+        name, marathi = BASES[i % len(BASES)]
+        variant = VARIANTS[(i // len(BASES)) % len(VARIANTS)]
+        category, category_marathi = rng.choice(CATEGORIES)
+        full_name = f"{variant} {name} {i}".strip()
+        product = {"id": i + 1, "name": full_name, "name_marathi": marathi,
+                   "category_id": CATEGORIES.index((category, category_marathi)) + 1, "unit": "kg", "is_active": True}
+        rows.append((product, {"name": full_name, "name_marathi": marathi,
+                               "category": category, "category_marathi": category_marathi}))
+    return rows
+
+
+def main(n: int = 2000):
+    started = time.perf_counter()
+    index = ProductSearchIndex(catalogue(n))
+    print(f"{n} products indexed in {(time.perf_counter() - started) * 1000:.1f} ms")
+    everything = []
+    for kind, queries in QUERIES.items():
+        samples = []
+        for _ in range(50):
+            for q in queries:
+                t = time.perf_counter()
+                index.search(q, limit=10)
+                samples.append((time.perf_counter() - t) * 1e6)
+        top = index.search(queries[0], limit=1)
+        print(f"{kind:8s} median {statistics.median(samples):9.1f} us  p95 {sorted(samples)[int(0.95 * len(samples))]:9.1f} us"
+              f"  top hit for {queries[0]!r}: {top[0]['product']['name'] if top else None}")
+        everything += samples
+    p95 = sorted(everything)[int(0.95 * len(everything))]
+    ok = p95 <= BUDGET_P95_US
+    print(f"all      p95 {p95:.1f} us, budget {BUDGET_P95_US:.0f} us: {'ok' if ok else 'OVER BUDGET'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
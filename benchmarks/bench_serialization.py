@@ -0,0 +1,76 @@
+"""
+Compares the response_model path with the fast serialization path:
+  python benchmarks/bench_serialization.py [rows ...]
+
+Runs on transient ORM objects, no database needed. The "response_model"
+column mirrors what FastAPI does: validate every row from attributes, dump
+to JSON-able Python, then json.dumps.
+"""
+import sys
+import os
+import json
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import List
+from pydantic import TypeAdapter
+from app import models  # noqa - register models
+from app.models.market import Market, Product
+from app.models.price_entry import PriceEntry, ApprovalStatus
+from app.schemas.schemas import PriceEntryOut
+from app.core import serialization
+
+
+def make_rows(n):
+    products = [Product(id=i, name=f"Product {i}", name_marathi="टोमॅटो", category_id=1, unit="kg", is_active=True)
+                for i in range(50)]
+    markets = [Market(id=i, name=f"Market {i}", area="Dadar", city_id=1, address="Mumbai", is_active=True)
+               for i in range(10)]
+    now = datetime.now(timezone.utc)
+    return [
+        PriceEntry(
+            id=i, vendor_id=7, product_id=i % 50, market_id=i % 10, city_id=1,
+            price_per_unit=Decimal("42.50"), entry_date=date.today(), status=ApprovalStatus.approved,
+            admin_note=None, screening_score=0.4, flagged=False, created_at=now,
+            product=products[i % 50], market=markets[i % 10],
+        )
+        for i in range(n)
+    ]
+
+
+def timed(fn, runs=5):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), out
+
+
+def main(sizes):
+    adapter = TypeAdapter(List[PriceEntryOut])
+
+    def response_model_path(rows):
+        validated = adapter.validate_python(rows, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast_path(rows):
+        return serialization.dumps(serialization.serialize_many(rows, PriceEntryOut))
+
+    encoder = "orjson" if serialization._orjson() else "stdlib json"
+    print(f"fast path encoder: {encoder}")
+    for n in sizes:
+        rows = make_rows(n)
+        slow_ms, slow = timed(lambda: response_model_path(rows))
+        fast_ms, fast = timed(lambda: fast_path(rows))
+        assert json.loads(slow) == json.loads(fast), "fast path diverged from the response_model contract"
+        print(f"{n:>7,} rows  response_model {slow_ms:8.1f} ms   fast {fast_ms:7.1f} ms   "
+              f"x{slow_ms / fast_ms:4.1f}   {len(fast) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
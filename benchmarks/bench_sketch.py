@@ -0,0 +1,74 @@
+"""
+Checks the quantile sketch error bound and reports its size and speed:
+  python benchmarks/bench_sketch.py
+
+Exits non-zero if any quantile falls outside the documented relative error.
+"""
+import sys
+import os
+import json
+import math
+import random
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.quantile_sketch import QuantileSketch
+
+QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[math.floor(q * (len(ordered) - 1))]
+
+
+def check(name, values, sketch):
+    worst = 0.0
+    for q in QUANTILES:
+        truth = exact(values, q)
+        err = abs(sketch.quantile(q) - truth) / truth
+        worst = max(worst, err)
+    ok = worst <= sketch.relative_accuracy + 1e-12
+    print(f"{name:<34} n={len(values):>8,} bins={len(sketch.bins):>4} "
+          f"json={len(json.dumps(sketch.to_dict())):>6}B worst_rel_err={worst:.4%} {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    rng = random.Random(7)
+    ok = True
+
+    # One busy (product, market, day), prices around ₹40 with a fat-finger entry
+    day = [round(rng.gauss(40, 4), 2) for _ in range(200)] + [4000.0]
+    s = QuantileSketch()
+    for v in day:
+        s.add(v)
+    ok &= check("single day with outlier", day, s)
+
+    # City-wide month: merge 30 days x 20 markets of daily sketches
+    all_values, merged = [], QuantileSketch()
+    started = time.perf_counter()
+    for _ in range(30 * 20):
+        daily = QuantileSketch()
+        for _ in range(rng.randint(5, 60)):
+            v = round(rng.lognormvariate(math.log(60), 0.35), 2)
+            daily.add(v)
+            all_values.append(v)
+        merged.merge(QuantileSketch.from_dict(daily.to_dict()))
+    merge_ms = (time.perf_counter() - started) * 1000
+    ok &= check("merged 30 days x 20 markets", all_values, merged)
+    print(f"  build+merge of 600 daily sketches: {merge_ms:.1f} ms")
+
+    # Full price range: bins stay bounded
+    wide = [10 ** rng.uniform(-2, 5) for _ in range(200_000)]
+    s = QuantileSketch()
+    for v in wide:
+        s.add(v)
+    ok &= check("₹0.01–₹99,999 log-uniform", wide, s)
+    print(f"  bins={len(s.bins)} (max_bins={s.max_bins})")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
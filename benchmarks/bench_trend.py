@@ -0,0 +1,102 @@
+"""
+Compares the 30-day raw-row trend with 5-year trends served from daily rollups:
+  python benchmarks/bench_trend.py [entries_per_day]
+
+Uses DATABASE_URL. Synthetic rows are inserted in one transaction that is
+rolled back at the end, so the database is left untouched.
+"""
+import sys
+import os
+import random
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, timedelta
+from sqlalchemy import func, cast, Date
+from app.db.database import SessionLocal
+from app import models  # noqa - register models
+from app.models.user import User, UserRole
+from app.models.market import City, Market, Product, ProductCategory
+from app.models.price_entry import PriceEntry, ApprovalStatus
+from app.services import analytics_service
+from app.services.daily_stats_service import refresh_daily_stats
+
+YEARS = 5
+
+
+def timed(fn, runs=7):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def main(entries_per_day: int = 40):
+    db = SessionLocal()
+    try:
+        city = City(name=f"Bench City {time.time_ns()}", state="Bench")
+        cat = ProductCategory(name=f"Bench Category {time.time_ns()}")
+        db.add_all([city, cat])
+        db.flush()
+        market = Market(name="Bench Market", area="Bench", city_id=city.id)
+        product = Product(name="Bench Tomato", category_id=cat.id, unit="kg")
+        # One vendor per daily entry: entries are unique per vendor, product, market and day
+        vendors = [User(full_name=f"Bench Vendor {i}", email=f"bench{time.time_ns()}-{i}@example.com",
+                        hashed_password="x", role=UserRole.vendor) for i in range(entries_per_day)]
+        db.add_all([market, product, *vendors])
+        db.flush()
+
+        today = date.today()
+        start = today - timedelta(days=365 * YEARS)
+        rng = random.Random(1)
+        rows, keys = [], []
+        day = start
+        while day <= today:
+            for vendor in vendors:
+                rows.append({
+                    "vendor_id": vendor.id, "product_id": product.id, "market_id": market.id, "city_id": city.id,
+                    "price_per_unit": round(rng.uniform(30, 50), 2), "entry_date": day,
+                    "status": ApprovalStatus.approved,
+                })
+            keys.append((product.id, market.id, day))
+            day += timedelta(days=1)
+        db.bulk_insert_mappings(PriceEntry, rows)
+        refresh_daily_stats(db, keys)
+        db.flush()
+        print(f"raw rows: {len(rows):,}  daily rollups: {len(keys):,}")
+
+        def raw_5y_monthly():
+            bucket = cast(func.date_trunc("month", PriceEntry.entry_date), Date)
+            return (
+                db.query(bucket, func.avg(PriceEntry.price_per_unit), func.min(PriceEntry.price_per_unit),
+                         func.max(PriceEntry.price_per_unit), func.count(PriceEntry.id))
+                .filter(PriceEntry.product_id == product.id, PriceEntry.market_id == market.id,
+                        PriceEntry.status == ApprovalStatus.approved, PriceEntry.entry_date >= start)
+                .group_by(bucket).order_by(bucket).all()
+            )
+
+        cases = [
+            ("get_trend_30d (rollups via shared cache)", lambda: analytics_service.get_trend_30d(db, product.id, market.id)),
+            ("raw rows, 5y monthly GROUP BY", raw_5y_monthly),
+            ("get_trend 30d daily (rollups)", lambda: analytics_service.get_trend(
+                db, product.id, market.id, today - timedelta(days=30), today).points),
+            ("get_trend 5y monthly (rollups)", lambda: analytics_service.get_trend(
+                db, product.id, market.id, start, today, bucket="month").points),
+            ("get_trend 5y weekly (rollups)", lambda: analytics_service.get_trend(
+                db, product.id, market.id, start, today, bucket="week").points),
+            ("get_trend 5y points=400 (rollups)", lambda: analytics_service.get_trend(
+                db, product.id, market.id, start, today, points=400).points),
+        ]
+        for name, fn in cases:
+            ms, result = timed(fn)
+            print(f"{name:<38} {ms:8.2f} ms  {len(result):>4} points")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,343 @@
+"""
+Load driver for the whole API: replays a weighted mix of public catalogue and
+analytics reads, vendor submissions and admin reviews over authenticated
+sessions, and reports throughput and p50/p95/p99 latency per route as JSON.
+
+  python benchmarks/loadtest.py --base-url http://localhost:8000 --duration 60 --concurrency 32
+  python benchmarks/loadtest.py --in-process --duration 20 --out runs/$(date +%F).json
+  python benchmarks/loadtest.py --scenario scenario.json
+
+--in-process runs the ASGI app (with its lifespan) inside this process through
+httpx.ASGITransport, using DATABASE_URL; otherwise a live server is targeted.
+Accounts default to the users created by seed.py. A scenario file may
+override any of:
+
+  {"weights": {"analytics.product_market": 30, "vendor.submit": 0, ...},
+   "accounts": {"consumer": ["consumer@fairprice.in", "consumer123"],
+                "vendors": [["vendor1@fairprice.in", "vendor123"]],
+                "admin": ["admin@fairprice.in", "admin123"]},
+   "concurrency": 32, "duration": 60, "warmup": 5, "think_ms": 0, "seed": 1}
+
+Submissions go through the per-vendor rate limit (429s are reported per
+route); raise VENDOR_SUBMIT_RATE_PER_MINUTE on the server to measure
+submission throughput rather than the limiter. Submissions land on the last
+seven days, so run against a scratch database.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+API = "/api/v1"
+SEARCH_TERMS = ["tom", "onion", "potatoe", "chili", "mango", "rice", "wheat", "टोमॅटो", "कांदा", "भाजी"]
+DEFAULT_ACCOUNTS = {
+    "consumer": ["consumer@fairprice.in", "consumer123"],
+    "vendors": [["vendor1@fairprice.in", "vendor123"], ["vendor2@fairprice.in", "vendor123"]],
+    "admin": ["admin@fairprice.in", "admin123"],
+}
+
+
+# ─── Scenario ────────────────────────────────────────────────────────────────
+
+class Session:
+    """Shared state of one run: tokens, catalogue ids, entries awaiting review"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random):
+        self.client = client
+        self.rng = rng
+        self.tokens = {}
+        self.vendor_roles = []
+        self.product_ids = []
+        self.markets = []  # (market_id, city_id)
+        self.city_ids = []
+        self.to_review = deque(maxlen=10000)
+
+    def auth(self, role: str) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[role]}"}
+
+    def product(self) -> int:
+        return self.rng.choice(self.product_ids)
+
+    def market(self) -> tuple:
+        return self.rng.choice(self.markets)
+
+    def city(self) -> int:
+        return self.rng.choice(self.city_ids)
+
+    async def login(self, role: str, email: str, password: str) -> None:
+        r = await self.client.post(f"{API}/auth/login", json={"email": email, "password": password})
+        r.raise_for_status()
+        self.tokens[role] = r.json()["access_token"]
+
+    async def setup(self, accounts: dict) -> None:
+        await self.login("consumer", *accounts["consumer"])
+        await self.login("admin", *accounts["admin"])
+        for i, (email, password) in enumerate(accounts["vendors"]):
+            await self.login(f"vendor{i}", email, password)
+            self.vendor_roles.append(f"vendor{i}")
+        products = (await self.client.get(f"{API}/products")).json()
+        markets = (await self.client.get(f"{API}/markets")).json()
+        self.product_ids = [p["id"] for p in products]
+        self.markets = [(m["id"], m["city_id"]) for m in markets]
+        self.city_ids = sorted({city for _, city in self.markets})
+        if not self.product_ids or not self.markets:
+            raise SystemExit("No products or markets to drive load against; run seed.py first")
+
+
+async def catalogue_products(s: Session):
+    return await s.client.get(f"{API}/products")
+
+
+async def catalogue_markets(s: Session):
+    return await s.client.get(f"{API}/markets", params={"city_id": s.city()})
+
+
+async def catalogue_search(s: Session):
+    return await s.client.get(f"{API}/products/search", params={"q": s.rng.choice(SEARCH_TERMS)})
+
+
+async def analytics_product_market(s: Session):
+    market_id, _ = s.market()
+    return await s.client.get(f"{API}/analytics/product/{s.product()}/market/{market_id}", headers=s.auth("consumer"))
+
+
+async def analytics_all_markets(s: Session):
+    return await s.client.get(
+        f"{API}/analytics/product/{s.product()}/all-markets", params={"city_id": s.city()}, headers=s.auth("consumer"),
+    )
+
+
+async def analytics_trend(s: Session):
+    market_id, _ = s.market()
+    since = date.today() - timedelta(days=s.rng.choice([30, 90, 365]))
+    return await s.client.get(
+        f"{API}/analytics/product/{s.product()}/market/{market_id}/trend",
+        params={"from": since.isoformat(), "points": 60}, headers=s.auth("consumer"),
+    )
+
+
+async def analytics_fluctuating(s: Session):
+    return await s.client.get(
+        f"{API}/analytics/fluctuating-products", params={"city_id": s.city()}, headers=s.auth("consumer"),
+    )
+
+
+async def vendor_submit(s: Session):
+    market_id, _ = s.market()
+    base = s.rng.uniform(20, 120)
+    r = await s.client.post(f"{API}/prices", headers=s.auth(s.rng.choice(s.vendor_roles)), json={
+        "product_id": s.product(),
+        "market_id": market_id,
+        "price_per_unit": round(base, 2),
+        "entry_date": (date.today() - timedelta(days=s.rng.randrange(7))).isoformat(),
+    })
+    if r.status_code in (200, 201):  # 200: an unapproved entry was resubmitted
+        s.to_review.append(r.json()["id"])
+    return r
+
+
+async def vendor_my_stats(s: Session):
+    return await s.client.get(f"{API}/prices/my-stats", headers=s.auth(s.rng.choice(s.vendor_roles)))
+
+
+async def admin_pending(s: Session):
+    r = await s.client.get(f"{API}/admin/prices", params={"status": "pending"}, headers=s.auth("admin"))
+    if r.status_code == 200 and not s.to_review:
+        s.to_review.extend(e["id"] for e in r.json()[:100])
+    return r
+
+
+async def admin_review(s: Session):
+    if not s.to_review:
+        return await admin_pending(s)
+    entry_id = s.to_review.popleft()
+    decision = "approved" if s.rng.random() < 0.9 else "rejected"
+    return await s.client.post(
+        f"{API}/admin/prices/{entry_id}/review", json={"status": decision}, headers=s.auth("admin"),
+    )
+
+
+# name -> (request, default weight)
+ROUTES = {
+    "catalogue.products": (catalogue_products, 8),
+    "catalogue.markets": (catalogue_markets, 4),
+    "catalogue.search": (catalogue_search, 6),
+    "analytics.product_market": (analytics_product_market, 24),
+    "analytics.all_markets": (analytics_all_markets, 12),
+    "analytics.trend": (analytics_trend, 8),
+    "analytics.fluctuating": (analytics_fluctuating, 4),
+    "vendor.submit": (vendor_submit, 10),
+    "vendor.my_stats": (vendor_my_stats, 2),
+    "admin.pending": (admin_pending, 1),
+    "admin.review": (admin_review, 5),
+}
+
+
+# ─── Measurement ─────────────────────────────────────────────────────────────
+
+def _percentile(ordered: list, q: float):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # route -> ms
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)  # transport errors and 5xx
+
+    def add(self, route: str, status, ms: float) -> None:
+        self.latencies[route].append(ms)
+        self.statuses[route][str(status)] += 1
+        if not isinstance(status, int) or status >= 500:
+            self.errors[route] += 1
+
+    def summary(self, route: str, seconds: float) -> dict:
+        ordered = sorted(self.latencies[route])
+        return {
+            "requests": len(ordered),
+            "rps": round(len(ordered) / seconds, 2),
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+            "p99_ms": _percentile(ordered, 0.99),
+            "max_ms": round(ordered[-1], 3) if ordered else None,
+            "errors": self.errors[route],
+            "statuses": dict(sorted(self.statuses[route].items())),
+        }
+
+    def report(self, seconds: float) -> dict:
+        everything = sorted(ms for values in self.latencies.values() for ms in values)
+        return {
+            "totals": {
+                "requests": len(everything),
+                "rps": round(len(everything) / seconds, 2),
+                "p50_ms": _percentile(everything, 0.50),
+                "p95_ms": _percentile(everything, 0.95),
+                "p99_ms": _percentile(everything, 0.99),
+                "errors": sum(self.errors.values()),
+            },
+            "routes": {route: self.summary(route, seconds) for route in sorted(self.latencies)},
+        }
+
+
+async def worker(s: Session, recorder: Recorder, names: list, weights: list,
+                 measure_from: float, deadline: float, think: float) -> None:
+    while time.perf_counter() < deadline:
+        name = s.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            status = (await ROUTES[name][0](s)).status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        if started >= measure_from:
+            recorder.add(name, status, (time.perf_counter() - started) * 1000)
+        if think:
+            await asyncio.sleep(think)
+
+
+async def drive(client: httpx.AsyncClient, config: dict) -> dict:
+    s = Session(client, random.Random(config["seed"]))
+    await s.setup(config["accounts"])
+    weights = {name: w for name, w in config["weights"].items() if w > 0}
+    names, values = list(weights), list(weights.values())
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    measure_from = started + config["warmup"]
+    deadline = measure_from + config["duration"]
+    await asyncio.gather(*(
+        worker(s, recorder, names, values, measure_from, deadline, config["think_ms"] / 1000)
+        for _ in range(config["concurrency"])
+    ))
+    return recorder.report(time.perf_counter() - measure_from)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(config: dict) -> dict:
+    timeout = httpx.Timeout(30.0)
+    if config["in_process"]:
+        from app.main import app
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+                results = await drive(client, config)
+    else:
+        limits = httpx.Limits(max_connections=config["concurrency"], max_keepalive_connections=config["concurrency"])
+        async with httpx.AsyncClient(base_url=config["base_url"], timeout=timeout, limits=limits) as client:
+            results = await drive(client, config)
+    return {
+        "started_at": config["started_at"],
+        "git_commit": _git_commit(),
+        "target": "in-process" if config["in_process"] else config["base_url"],
+        "concurrency": config["concurrency"],
+        "duration_s": config["duration"],
+        "warmup_s": config["warmup"],
+        "think_ms": config["think_ms"],
+        "weights": config["weights"],
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="drive the ASGI app in this process")
+    parser.add_argument("--scenario", help="JSON file overriding weights, accounts and run settings")
+    parser.add_argument("--concurrency", type=int)
+    parser.add_argument("--duration", type=float, help="measured seconds")
+    parser.add_argument("--warmup", type=float, help="seconds of load before measuring")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    config = {
+        "weights": {name: weight for name, (_, weight) in ROUTES.items()},
+        "accounts": DEFAULT_ACCOUNTS,
+        "concurrency": 16, "duration": 30.0, "warmup": 3.0, "think_ms": 0, "seed": 1,
+    }
+    if args.scenario:
+        with open(args.scenario) as f:
+            scenario = json.load(f)
+        unknown = set(scenario.get("weights", {})) - set(ROUTES)
+        if unknown:
+            raise SystemExit(f"Unknown routes in scenario: {', '.join(sorted(unknown))} (known: {', '.join(ROUTES)})")
+        config["weights"].update(scenario.pop("weights", {}))
+        config["accounts"] = {**DEFAULT_ACCOUNTS, **scenario.pop("accounts", {})}
+        config.update(scenario)
+    for key in ("concurrency", "duration", "warmup"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    config.update(
+        base_url=args.base_url, in_process=args.in_process,
+        started_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+    report = json.dumps(asyncio.run(run(config)), indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+        print(f"wrote {args.out}")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,12 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from datetime import date, timedelta
 from decimal import Decimal
 from app.db.database import SessionLocal, engine, Base
-from app.models import user, market, price_entry  # noqa - register models
+from app.models import user, market, price_entry, price_stats  # noqa - register models
 from app.models.user import User, UserRole
 from app.models.market import City, Market, Product, ProductCategory
 from app.models.price_entry import PriceEntry, ApprovalStatus, VendorProfile
 from app.core.security import get_password_hash
+from app.services.daily_stats_service import rebuild_daily_stats
 
 Base.metadata.create_all(bind=engine)
 db = SessionLocal()
@@ -125,6 +126,7 @@ def seed():
                         vendor_id=vendor_id,
                         product_id=prod_id,
                         market_id=mkt.id,
+                        city_id=mkt.city_id,
                         price_per_unit=price,
                         entry_date=entry_date,
                         status=ApprovalStatus.approved,
@@ -138,12 +140,16 @@ def seed():
             vendor_id=vendor1.id,
             product_id=prod.id,
             market_id=markets[0].id,
+            city_id=markets[0].city_id,
             price_per_unit=Decimal(str(base_prices[prod.id])),
             entry_date=today,
             status=ApprovalStatus.pending,
         )
         db.add(entry)
 
+    db.flush()
+    rebuild_daily_stats(db, today - timedelta(days=30))
+
     db.commit()
     print("✅ Seed data inserted successfully!")
     print("\nTest accounts:")
@@ -0,0 +1,67 @@
+"""
+Shared fixtures. Tests that need Postgres use the `db_world` fixture, which
+skips when DATABASE_URL is unreachable and otherwise creates a throwaway
+city, market, product and two vendors, removing them (and everything
+written for them) afterwards.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import models  # noqa - register models
+from app.core.security import get_password_hash
+from app.db.database import Base, SessionLocal, engine
+from app.models import City, Market, Product, ProductCategory, User, UserRole
+
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as exc:
+        pytest.skip(f"Postgres not reachable: {exc.orig}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db_world(database):
+    tag = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    city = City(name=f"Test City {tag}", state="Test")
+    db.add(city)
+    db.flush()
+    market = Market(name=f"Test Market {tag}", area="Test", city_id=city.id)
+    category = ProductCategory(name=f"Test Category {tag}")
+    db.add_all([market, category])
+    db.flush()
+    product = Product(name=f"Test Product {tag}", category_id=category.id, unit="kg")
+    password = "test-password"
+    vendors = [
+        User(full_name=f"Vendor {i}", email=f"vendor{i}-{tag}@test.local",
+             hashed_password=get_password_hash(password), role=UserRole.vendor)
+        for i in range(2)
+    ]
+    db.add(product)
+    db.add_all(vendors)
+    db.commit()
+    world = {
+        "city_id": city.id, "market_id": market.id, "category_id": category.id, "product_id": product.id,
+        "vendor_ids": [v.id for v in vendors], "vendor_emails": [v.email for v in vendors], "password": password,
+    }
+    db.close()
+    yield world
+
+    with engine.begin() as conn:
+        params = {"product_id": world["product_id"], "vendor_ids": world["vendor_ids"]}
+        conn.execute(text("DELETE FROM price_events WHERE product_id = :product_id"), params)
+        conn.execute(text("DELETE FROM price_daily_stats WHERE product_id = :product_id"), params)
+        conn.execute(text("DELETE FROM price_entries WHERE product_id = :product_id"), params)
+        conn.execute(text("DELETE FROM users WHERE id = ANY(:vendor_ids)"), params)
+        conn.execute(text("DELETE FROM products WHERE id = :product_id"), params)
+        conn.execute(text("DELETE FROM product_categories WHERE id = :id"), {"id": world["category_id"]})
+        conn.execute(text("DELETE FROM markets WHERE city_id = :id"), {"id": world["city_id"]})  # and any a test added
+        conn.execute(text("DELETE FROM cities WHERE id = :id"), {"id": world["city_id"]})
@@ -0,0 +1,20 @@
+import pytest
+
+from app.core.admission import classify
+
+
+@pytest.mark.parametrize("method, path, route_class", [
+    ("GET", "/api/v1/users/me", "public"),
+    ("GET", "/api/v1/users/me/", "public"),
+    ("GET", "/api/v1/users/", "admin"),
+    ("PATCH", "/api/v1/users/12/deactivate", "admin"),
+    ("PATCH", "/api/v1/users/12/activate", "admin"),
+    ("GET", "/api/v1/admin/submissions", "admin"),
+    ("POST", "/api/v1/auth/login", "auth"),
+    ("POST", "/api/v1/prices", "vendor"),
+    ("GET", "/api/v1/analytics/product/1/market/2", "public"),
+    ("POST", "/api/v1/products", "admin"),
+    ("GET", "/ready", None),
+])
+def test_classify(method, path, route_class):
+    assert classify(method, path) == route_class
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.db.database import SessionLocal, engine
+from app.models import ApprovalStatus, Market, PriceEntry
+from app.services import analytics_service
+from app.services.daily_stats_service import refresh_daily_stats
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self)
+
+
+def test_all_markets_reads_every_market_in_two_queries(db_world):
+    pid, city_id = db_world["product_id"], db_world["city_id"]
+    day = date.today() - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        markets = [db_world["market_id"]]
+        for i in range(5):
+            market = Market(name=f"Extra {i} {pid}", area=f"Area {i}", city_id=city_id)
+            db.add(market)
+            db.flush()
+            markets.append(market.id)
+        # market i: yesterday's price 40 + 10 * i against a week at 40
+        keys = []
+        for i, market_id in enumerate(markets[:4]):
+            for offset, price in ((0, 40 + 10 * i), (3, 40)):
+                entry_date = day - timedelta(days=offset)
+                db.add(PriceEntry(
+                    vendor_id=db_world["vendor_ids"][0], product_id=pid, market_id=market_id, city_id=city_id,
+                    price_per_unit=Decimal(price), entry_date=entry_date, status=ApprovalStatus.approved,
+                ))
+                keys.append((pid, market_id, entry_date))
+        db.flush()
+        refresh_daily_stats(db, keys)
+        db.commit()
+
+        with QueryCounter() as queries:
+            stats = analytics_service._compute_all_markets_stats(db, pid, city_id, day)
+        assert queries.count == 2  # markets, then the rollups of all of them
+
+        by_market = {s.market_id: s for s in stats}
+        assert set(by_market) == set(markets)
+        assert [by_market[m].avg_price for m in markets] == [40.0, 50.0, 60.0, 70.0, None, None]
+        assert [by_market[m].spike_alert for m in markets] == [False, True, True, True, False, False]
+        assert by_market[markets[5]].vendor_count == 0
+
+        with QueryCounter() as queries:
+            again = analytics_service._compute_all_markets_stats(db, pid, city_id, day)
+        assert queries.count == 1  # the day stats now come from the shared cache
+        assert again == stats
+    finally:
+        db.close()
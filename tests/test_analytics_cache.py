@@ -0,0 +1,145 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.core.config import settings
+from app.core.shared_cache import SharedDayStatsCache
+from app.db.database import SessionLocal
+from app.models import ApprovalStatus, PriceEntry
+from app.models.price_event import PriceEvent, PriceEventType
+from app.services import analytics_service
+from app.services.daily_stats_service import refresh_daily_stats
+
+
+@pytest.fixture
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_INVALIDATION_POLL_SECONDS", 0)
+    monkeypatch.setattr(analytics_service, "_event_cursor", None)
+    monkeypatch.setattr(analytics_service, "_next_poll", 0.0)
+    analytics_service.history_cache.clear()
+    analytics_service.analytics_cache.clear()
+    yield
+    analytics_service.history_cache.clear()
+    analytics_service.analytics_cache.clear()
+
+
+def _event_from_another_worker(world, event_type, entry_date):
+    db = SessionLocal()
+    db.add(PriceEvent(
+        event_type=event_type.value, entry_id=0, vendor_id=world["vendor_ids"][0], product_id=world["product_id"],
+        market_id=world["market_id"], city_id=world["city_id"], entry_date=entry_date,
+        status=ApprovalStatus.approved, price_per_unit=Decimal("40.00"),
+    ))
+    db.commit()
+    db.close()
+
+
+def test_approval_logged_elsewhere_drops_long_lived_entries(db_world, fresh_caches):
+    pid, mid = db_world["product_id"], db_world["market_id"]
+    as_of = date.today() - timedelta(days=10)
+    db = SessionLocal()
+    try:
+        assert analytics_service.sync_invalidations(db) == 0  # first poll only sets the cursor
+        analytics_service.history_cache.set(("product", pid, mid, as_of), "final")
+        analytics_service.history_cache.set(("product", pid, mid, as_of - timedelta(days=40)), "older")
+
+        _event_from_another_worker(db_world, PriceEventType.submitted, as_of - timedelta(days=2))
+        assert analytics_service.sync_invalidations(db) == 0  # a pending submission changes nothing yet
+
+        _event_from_another_worker(db_world, PriceEventType.reviewed, as_of - timedelta(days=2))
+        assert analytics_service.sync_invalidations(db) >= 1
+        assert analytics_service.history_cache.peek(("product", pid, mid, as_of)) is None
+        assert analytics_service.history_cache.peek(("product", pid, mid, as_of - timedelta(days=40))) == "older"
+        assert analytics_service.sync_invalidations(db) == 0  # cursor moved past it
+    finally:
+        db.close()
+
+
+def test_fluctuating_products_pick_up_approvals_from_other_workers(db_world, fresh_caches):
+    as_of = date.today() - timedelta(days=10)
+    key = ("fluctuating", None, (db_world["city_id"], 5), as_of)
+    db = SessionLocal()
+    try:
+        analytics_service.sync_invalidations(db)
+        analytics_service.history_cache.set(key, "cached before the approval")
+        assert analytics_service.get_most_fluctuating_products(db, db_world["city_id"], 5, as_of) == "cached before the approval"
+
+        _event_from_another_worker(db_world, PriceEventType.reviewed, as_of - timedelta(days=3))
+        assert analytics_service.get_most_fluctuating_products(db, db_world["city_id"], 5, as_of) == []
+    finally:
+        db.close()
+
+def test_result_computed_during_an_invalidation_is_not_kept_long_term(fresh_caches):
+    key = ("product", 1, 1, date.today() - timedelta(days=5))
+
+    def compute():
+        analytics_service.invalidate_price_changes([(1, key[3])])  # an approval lands mid-computation
+        return "maybe stale"
+
+    assert analytics_service._cached(key, compute, lambda: True) == "maybe stale"
+    assert analytics_service.history_cache.peek(key) is None
+    assert analytics_service.analytics_cache.peek(key) == "maybe stale"
+
+
+def test_trend_and_moving_average_come_from_the_rollups(db_world, fresh_caches):
+    pid, mid = db_world["product_id"], db_world["market_id"]
+    today = date.today() - timedelta(days=1)
+    prices = {today - timedelta(days=d): [Decimal(p) for p in ps] for d, ps in {
+        0: ["40.00"], 2: ["30.00", "36.00"], 6: ["50.00"], 9: ["20.00"], 31: ["99.00"],
+    }.items()}
+    db = SessionLocal()
+    try:
+        for day, day_prices in prices.items():
+            for vendor_id, price in zip(db_world["vendor_ids"], day_prices):
+                db.add(PriceEntry(
+                    vendor_id=vendor_id, product_id=pid, market_id=mid, city_id=db_world["city_id"],
+                    price_per_unit=price, entry_date=day, status=ApprovalStatus.approved,
+                ))
+        db.flush()
+        refresh_daily_stats(db, [(pid, mid, day) for day in prices])
+        db.commit()
+
+        trend = analytics_service.get_trend_30d(db, pid, mid, today)
+        assert [(t.entry_date, t.avg_price, t.min_price, t.max_price, t.vendor_count) for t in trend] == [
+            (today - timedelta(days=9), 20.0, 20.0, 20.0, 1),
+            (today - timedelta(days=6), 50.0, 50.0, 50.0, 1),
+            (today - timedelta(days=2), 33.0, 30.0, 36.0, 2),
+            (today, 40.0, 40.0, 40.0, 1),
+        ]
+        # entries in the 7 days before `today`, each counted once: (30 + 36 + 50) / 3
+        assert analytics_service.get_7day_moving_average(db, pid, mid, today) == pytest.approx(116 / 3)
+    finally:
+        db.close()
+
+
+def test_late_approval_on_another_host_drops_day_stats(db_world, fresh_caches, monkeypatch, tmp_path):
+    pid, mid = db_world["product_id"], db_world["market_id"]
+    day = date.today() - timedelta(days=4)
+    here = SharedDayStatsCache(str(tmp_path / "this-host"), 64)
+    there = SharedDayStatsCache(str(tmp_path / "other-host"), 64)
+    monkeypatch.setattr(analytics_service, "day_stats_cache", here)
+    db = SessionLocal()
+    try:
+        analytics_service.sync_invalidations(db)
+        assert analytics_service.get_product_market_stats_today(db, pid, mid, day)["count"] == 0
+
+        # the approving worker writes the rollup, logs the event and refreshes its own host's table
+        db.add(PriceEntry(
+            vendor_id=db_world["vendor_ids"][0], product_id=pid, market_id=mid, city_id=db_world["city_id"],
+            price_per_unit=Decimal("40.00"), entry_date=day, status=ApprovalStatus.approved,
+        ))
+        db.flush()
+        refresh_daily_stats(db, [(pid, mid, day)])
+        db.commit()
+        monkeypatch.setattr(analytics_service, "day_stats_cache", there)
+        analytics_service.publish_day_stats(db, [(pid, mid, day)])
+        _event_from_another_worker(db_world, PriceEventType.reviewed, day)
+
+        monkeypatch.setattr(analytics_service, "day_stats_cache", here)
+        assert analytics_service.get_product_market_stats_today(db, pid, mid, day)["count"] == 0  # not polled yet
+        assert analytics_service.sync_invalidations(db) == 0  # nothing else was cached for the product
+        stats = analytics_service.get_product_market_stats_today(db, pid, mid, day)
+        assert (stats["count"], stats["avg"]) == (1, 40.0)
+    finally:
+        db.close()
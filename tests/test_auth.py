@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.main import app
+
+API = "/api/v1"
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)  # no lifespan: the scheduler and warm-up stay off
+
+
+def test_login_then_authenticated_request(client, db_world):
+    response = client.post(f"{API}/auth/login", json={
+        "email": db_world["vendor_emails"][0], "password": db_world["password"],
+    })
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    # RFC 7519 makes "sub" a string; python-jose rejects tokens with an integer one
+    assert jwt.get_unverified_claims(token)["sub"] == str(db_world["vendor_ids"][0])
+
+    response = client.get(f"{API}/prices/my-submissions", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_wrong_password_is_rejected(client, db_world):
+    response = client.post(f"{API}/auth/login", json={"email": db_world["vendor_emails"][0], "password": "nope"})
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("claims", [{"sub": "not-a-number"}, {"role": "vendor"}])
+def test_tokens_without_a_numeric_subject_are_rejected(client, database, claims):
+    token = create_access_token(claims)
+    response = client.get(f"{API}/prices/my-submissions", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_token_signed_with_another_key_is_rejected(client, database):
+    token = jwt.encode({"sub": "1"}, settings.SECRET_KEY + "-other", algorithm=settings.ALGORITHM)
+    response = client.get(f"{API}/prices/my-submissions", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
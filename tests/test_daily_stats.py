@@ -0,0 +1,60 @@
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.db.database import SessionLocal
+from app.models import ApprovalStatus, PriceDailyStat, PriceEntry
+from app.services.daily_stats_service import refresh_daily_stats
+
+
+def _pending_entry(db, world, vendor_id, price, day):
+    entry = PriceEntry(
+        vendor_id=vendor_id, product_id=world["product_id"], market_id=world["market_id"],
+        city_id=world["city_id"], price_per_unit=Decimal(price), entry_date=day, status=ApprovalStatus.pending,
+    )
+    db.add(entry)
+    db.flush()
+    return entry.id
+
+
+def _approve_and_refresh(db, entry_id, key):
+    db.query(PriceEntry).filter(PriceEntry.id == entry_id).update({PriceEntry.status: ApprovalStatus.approved})
+    refresh_daily_stats(db, [key])
+
+
+def test_overlapping_approvals_of_one_day_are_both_counted(db_world):
+    day = date.today() - timedelta(days=30)
+    key = (db_world["product_id"], db_world["market_id"], day)
+    setup = SessionLocal()
+    first = _pending_entry(setup, db_world, db_world["vendor_ids"][0], "40.00", day)
+    second = _pending_entry(setup, db_world, db_world["vendor_ids"][1], "50.00", day)
+    setup.commit()
+    setup.close()
+
+    s1, s2 = SessionLocal(), SessionLocal()
+    try:
+        _approve_and_refresh(s1, first, key)  # refreshed, not yet committed
+
+        def second_approval():
+            _approve_and_refresh(s2, second, key)
+            s2.commit()
+        worker = threading.Thread(target=second_approval)
+        worker.start()
+        time.sleep(0.3)
+        assert worker.is_alive(), "the second refresh should wait for the first transaction"
+        s1.commit()
+        worker.join(timeout=10)
+        assert not worker.is_alive()
+    finally:
+        s1.close()
+        s2.close()
+
+    check = SessionLocal()
+    stat = check.query(PriceDailyStat).filter_by(
+        product_id=key[0], market_id=key[1], stat_date=day,
+    ).one()
+    check.close()
+    assert stat.entry_count == 2
+    assert stat.price_sum == Decimal("90.00")
+    assert (stat.min_price, stat.max_price) == (Decimal("40.00"), Decimal("50.00"))
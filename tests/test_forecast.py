@@ -0,0 +1,71 @@
+import numpy as np
+
+from app.services.forecast_service import ALPHAS, BETAS, fit_holt, forecast_holt
+
+
+def holt_loop(y):
+    """Reference: one series and one (alpha, beta) pair at a time, first of equal errors wins"""
+    observed = [(t, v) for t, v in enumerate(y) if not np.isnan(v)]
+    best = None
+    for a in ALPHAS:
+        for b in BETAS:
+            level, trend, sse, last_t = observed[0][1], 0.0, 0.0, observed[0][0]
+            for t, v in observed[1:]:
+                for _ in range(t - last_t - 1):
+                    level += trend
+                predicted = level + trend
+                sse += (v - predicted) ** 2
+                new_level = predicted + a * (v - predicted)
+                trend = b * (new_level - level) + (1 - b) * trend
+                level, last_t = new_level, t
+            level += trend * (len(y) - 1 - last_t)  # carried forward to the last day
+            if best is None or sse < best[0] - 1e-9:
+                best = (sse, level, trend, a, b)
+    return best
+
+
+def test_matches_per_series_loop_with_missing_days():
+    rng = np.random.default_rng(5)
+    days = 60
+    y = 40 * np.exp(np.cumsum(rng.normal(0, 0.02, (25, days)), axis=1))
+    y[rng.random(y.shape) < 0.25] = np.nan
+    y[:, 0] = np.where(np.arange(25) % 5 == 0, np.nan, y[:, 0])  # some series start late
+    fit = fit_holt(y)
+    for i, row in enumerate(y):
+        sse, level, trend, a, b = holt_loop(row)
+        n = np.count_nonzero(~np.isnan(row))
+        assert np.isclose(fit["level"][i], level) and np.isclose(fit["trend"][i], trend)
+        assert np.isclose(fit["sigma"][i], np.sqrt(sse / max(n - 3, 1)))
+        assert (fit["alpha"][i], fit["beta"][i]) == (a, b)
+        assert fit["observations"][i] == n
+
+
+def test_constant_series_forecasts_the_constant_with_zero_width():
+    y = np.full((1, 30), 50.0)
+    point, lower, upper = forecast_holt(fit_holt(y), 7)
+    np.testing.assert_allclose(point, 50.0)
+    np.testing.assert_allclose(lower, point)
+    np.testing.assert_allclose(upper, point)
+
+
+def test_linear_series_extends_the_line():
+    y = (20 + 0.5 * np.arange(40))[None, :]
+    point, _, _ = forecast_holt(fit_holt(y), 5)
+    np.testing.assert_allclose(point[0], 20 + 0.5 * np.arange(40, 45), rtol=1e-6)
+
+
+def test_intervals_widen_with_horizon_and_stay_non_negative():
+    rng = np.random.default_rng(9)
+    y = 1 + rng.normal(0, 0.8, (50, 45)).cumsum(axis=1) * 0.1
+    point, lower, upper = forecast_holt(fit_holt(np.abs(y)), 7)
+    width = upper - lower
+    assert (np.diff(upper - point, axis=1) >= -1e-12).all()
+    assert (lower >= 0).all() and (width >= 0).all()
+    assert ((lower <= point) & (point <= upper)).all()
+
+
+def test_series_without_observations_do_not_break_the_batch():
+    y = np.array([[np.nan] * 10, [10.0] * 10])
+    fit = fit_holt(y)
+    assert fit["observations"].tolist() == [0, 10]
+    assert fit["level"][1] == 10.0
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text, update
+
+from app.core.config import settings
+from app.core.idempotency import IdempotencyStore, _digest
+from app.core.security import create_access_token
+from app.db.database import engine
+from app.main import app
+from app.models import ApprovalStatus, PriceEntry
+from app.models.idempotency import IdempotencyKey
+
+SUBMIT = "/api/v1/prices"
+
+
+@pytest.fixture
+def vendor(db_world):
+    with engine.connect() as conn:
+        started = conn.scalar(select(func.now()))
+    vendor_id = db_world["vendor_ids"][0]
+    token = create_access_token({"sub": str(vendor_id), "role": "vendor"})
+    yield {
+        "id": vendor_id,
+        "client": TestClient(app),
+        "payload": {"product_id": db_world["product_id"], "market_id": db_world["market_id"], "price_per_unit": "40.00"},
+        "store_key": lambda key: _digest(f"user:{vendor_id}".encode(), SUBMIT.encode(), key.encode()),
+        "headers": lambda key: {"Authorization": f"Bearer {token}", "Idempotency-Key": key},
+    }
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM idempotency_keys WHERE created_at >= :started"), {"started": started})
+
+
+def _entries(vendor_id):
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(PriceEntry).where(PriceEntry.vendor_id == vendor_id))
+
+
+def test_retry_after_approval_replays_the_original_response(vendor):
+    client, headers = vendor["client"], vendor["headers"]("retry-1")
+    first = client.post(SUBMIT, json=vendor["payload"], headers=headers)
+    assert first.status_code == 201
+    with engine.begin() as conn:  # an admin approves before the retry arrives
+        conn.execute(update(PriceEntry).where(PriceEntry.id == first.json()["id"]).values(status=ApprovalStatus.approved))
+
+    retry = client.post(SUBMIT, json=vendor["payload"], headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert _entries(vendor["id"]) == 1
+
+
+def test_stored_response_is_visible_to_another_worker(vendor):
+    vendor["client"].post(SUBMIT, json=vendor["payload"], headers=vendor["headers"]("retry-2"))
+    other_worker = IdempotencyStore(engine, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS)
+    stored = other_worker.claim(vendor["store_key"]("retry-2"), _digest(b"any body"))
+    assert stored is not None and stored.status == 201
+
+
+def test_same_key_with_another_body_is_rejected(vendor):
+    client, headers = vendor["client"], vendor["headers"]("retry-3")
+    assert client.post(SUBMIT, json=vendor["payload"], headers=headers).status_code == 201
+    changed = {**vendor["payload"], "price_per_unit": "41.00"}
+    assert client.post(SUBMIT, json=changed, headers=headers).status_code == 422
+
+
+def test_duplicate_waits_for_a_claim_held_elsewhere(vendor, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.2)
+    client, headers = vendor["client"], vendor["headers"]("retry-4")
+    other_worker = IdempotencyStore(engine, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS)
+    fingerprint = _digest(client.build_request("POST", SUBMIT, json=vendor["payload"]).read())
+    assert other_worker.claim(vendor["store_key"]("retry-4"), fingerprint) is None  # still running there
+
+    response = client.post(SUBMIT, json=vendor["payload"], headers=headers)
+    assert response.status_code == 409
+    assert _entries(vendor["id"]) == 0
+
+    with engine.begin() as conn:  # that worker died: its claim outlives the lease
+        conn.execute(
+            update(IdempotencyKey).where(IdempotencyKey.key == vendor["store_key"]("retry-4"))
+            .values(created_at=func.now() - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS + 1))
+        )
+    assert client.post(SUBMIT, json=vendor["payload"], headers=headers).status_code == 201
+    assert _entries(vendor["id"]) == 1
+
+
+def test_failed_requests_release_their_claim(vendor):
+    client, headers = vendor["client"], vendor["headers"]("retry-5")
+    assert client.post(SUBMIT, json=vendor["payload"], headers={**headers, "Authorization": "Bearer nope"}).status_code == 401
+    with engine.connect() as conn:
+        assert conn.scalar(select(IdempotencyKey.key).where(IdempotencyKey.key == vendor["store_key"]("retry-5"))) is None
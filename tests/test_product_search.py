@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from app.services.product_search import ProductSearchIndex
+
+BASES = [
+    ("Tomato", "टोमॅटो"), ("Onion", "कांदा"), ("Potato", "बटाटा"), ("Green Chilli", "हिरवी मिरची"),
+    ("Cauliflower", "फुलकोबी"), ("Spinach", "पालक"), ("Wheat", "गहू"), ("Rice", "तांदूळ"),
+    ("Toor Dal", "तूर डाळ"), ("Groundnut Oil", "शेंगदाणा तेल"), ("Banana", "केळी"), ("Mango", "आंबा"),
+]
+VARIANTS = ["", "Local", "Hybrid", "Organic", "Premium", "Nashik", "Pune", "Loose"]
+CATEGORIES = [("Vegetables", "भाजी"), ("Grains", "धान्य"), ("Pulses", "डाळी"), ("Oils", "तेल"), ("Fruits", "फळे")]
+
+
+def catalogue(n):
+    rng = random.Random(1)
+    rows = []
+    for i in range(n):
+        name, marathi = BASES[i % len(BASES)]
+        variant = VARIANTS[(i // len(BASES)) % len(VARIANTS)]
+        category_id = rng.randrange(len(CATEGORIES))
+        full_name = f"{variant} {name} {i}".strip() if i >= len(BASES) else name
+        product = {"id": i + 1, "name": full_name, "name_marathi": marathi,
+                   "category_id": category_id + 1, "unit": "kg", "is_active": True}
+        rows.append((product, {"name": full_name, "name_marathi": marathi,
+                               "category": CATEGORIES[category_id][0], "category_marathi": CATEGORIES[category_id][1]}))
+    return rows
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ProductSearchIndex(catalogue(2000))
+
+
+def names(hits):
+    return [h["product"]["name"] for h in hits]
+
+
+def test_exact_prefix_typo_and_marathi_lookups(index):
+    assert names(index.search("Tomato", limit=1)) == ["Tomato"]
+    assert names(index.search("green chil", limit=1)) == ["Green Chilli"]
+    assert names(index.search("cauliflour", limit=1)) == ["Cauliflower"]
+    hit = index.search("कांदा", limit=1)[0]
+    assert hit["matched_field"] == "name_marathi" and "Onion" in hit["product"]["name"]
+
+
+def test_equal_scores_rank_by_name_and_respect_limit(index):
+    hits = index.search("टोमॅटो", limit=25)  # every tomato variant shares the Marathi name
+    assert len(hits) == 25
+    assert len({h["score"] for h in hits}) == 1
+    assert names(hits) == sorted(names(hits))
+    assert len({h["product"]["id"] for h in hits}) == 25
+
+
+def test_category_filter_and_category_matches(index):
+    hits = index.search("oil", limit=50, category_id=4)
+    assert hits and all(h["product"]["category_id"] == 4 for h in hits)
+    by_category = index.search("भाजी", limit=5)
+    assert by_category and all(h["matched_field"] == "category_marathi" for h in by_category)
+
+
+def test_nothing_to_match(index):
+    assert index.search("   ") == []
+    assert index.search("qqqqzz") == []
+
@@ -0,0 +1,84 @@
+import math
+import random
+
+import pytest
+
+from app.services.quantile_sketch import DEFAULT_RELATIVE_ACCURACY, QuantileSketch
+
+QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[math.floor(q * (len(ordered) - 1))]
+
+
+def day_of_prices(rng, n, center):
+    return [round(max(rng.lognormvariate(math.log(center), 0.3), 0.01), 2) for _ in range(n)]
+
+
+def assert_within_bound(sketch, values, quantiles=QUANTILES, accuracy=DEFAULT_RELATIVE_ACCURACY):
+    for q in quantiles:
+        x = exact(values, q)
+        assert abs(sketch.quantile(q) - x) <= accuracy * x + 1e-9, f"q={q}: {sketch.quantile(q)} vs {x}"
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 100, 5000])
+def test_single_day_sketch_within_relative_error(n):
+    rng = random.Random(n)
+    values = day_of_prices(rng, n, 40)
+    sketch = QuantileSketch()
+    for v in values:
+        sketch.add(v)
+    assert sketch.count == n
+    assert_within_bound(sketch, values)
+
+
+def test_merged_sketches_keep_the_bound_over_combined_values():
+    rng = random.Random(1)
+    days = [day_of_prices(rng, rng.randint(1, 60), rng.uniform(5, 500)) for _ in range(90)]
+    merged = QuantileSketch()
+    for values in days:
+        daily = QuantileSketch()
+        for v in values:
+            daily.add(v)
+        merged.merge(QuantileSketch.from_dict(daily.to_dict()))  # as stored in price_daily_stats
+    combined = [v for values in days for v in values]
+    assert merged.count == len(combined)
+    assert_within_bound(merged, combined)
+
+
+def test_full_price_range_fits_default_bins():
+    sketch = QuantileSketch()
+    for v in (0.01, 0.5, 40, 1_000, 99_999):
+        sketch.add(v)
+    assert_within_bound(sketch, [0.01, 0.5, 40, 1_000, 99_999])
+
+
+def test_collapse_caps_bins_and_only_affects_lowest_quantiles():
+    rng = random.Random(2)
+    values = [round(10 ** rng.uniform(-2, 5), 2) or 0.01 for _ in range(20_000)]  # ₹0.01 to ₹99,999
+    sketch = QuantileSketch(max_bins=100)
+    for v in values:
+        sketch.add(v)
+    assert len(sketch.bins) <= 100
+
+    lowest_kept = min(sketch.bins)
+    collapsed_upto = sketch._value(lowest_kept)
+    for q in [i / 100 for i in range(101)]:
+        x = exact(values, q)
+        reported = sketch.quantile(q)
+        if sketch._key(x) > lowest_kept:
+            assert abs(reported - x) <= DEFAULT_RELATIVE_ACCURACY * x + 1e-9
+        else:
+            # collapsed into the lowest kept bucket: overestimates, never beyond that bucket
+            assert x * (1 - DEFAULT_RELATIVE_ACCURACY) <= reported <= collapsed_upto + 1e-9
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_empty_sketch_has_no_quantiles():
+    assert QuantileSketch().quantile(0.5) is None
@@ -0,0 +1,58 @@
+import uuid
+
+import pytest
+from sqlalchemy import inspect, select, text
+
+from app.db.database import SessionLocal, engine
+from app.db.request_scope import release_connections, request_sessions, track
+from app.models import City
+
+
+@pytest.fixture
+def request_session(database):
+    token = request_sessions.set([])
+    db = SessionLocal()
+    track(db)
+    yield db
+    db.close()
+    request_sessions.reset(token)
+
+
+def _city_exists(name):
+    with engine.connect() as conn:
+        return conn.scalar(select(City.id).where(City.name == name)) is not None
+
+
+def test_read_only_transaction_ends_and_keeps_loaded_objects(request_session, db_world):
+    city = request_session.get(City, db_world["city_id"])
+    release_connections()
+    assert not request_session.in_transaction()
+    assert not inspect(city).expired_attributes
+    assert city.name.startswith("Test City")
+
+
+@pytest.mark.parametrize("write", ["core", "flush"])
+def test_uncommitted_writes_are_not_committed(request_session, write):
+    name = f"Uncommitted {uuid.uuid4().hex[:8]}"
+    if write == "core":
+        request_session.execute(text("INSERT INTO cities (name, state) VALUES (:name, 'Test')"), {"name": name})
+    else:
+        request_session.add(City(name=name, state="Test"))
+        request_session.flush()
+    request_session.execute(select(City.id).limit(1))  # a later read does not clear the flag
+    release_connections()
+    request_session.close()
+    assert not _city_exists(name)
+
+
+def test_flag_is_reset_for_the_next_transaction(request_session, db_world):
+    name = f"Committed {uuid.uuid4().hex[:8]}"
+    request_session.execute(text("INSERT INTO cities (name, state) VALUES (:name, 'Test')"), {"name": name})
+    request_session.commit()
+    try:
+        request_session.get(City, db_world["city_id"])
+        release_connections()
+        assert not request_session.in_transaction()
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM cities WHERE name = :name"), {"name": name})
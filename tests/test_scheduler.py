@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.core.scheduler import CronSchedule, Scheduler
+
+
+@pytest.mark.parametrize("expr, after, expected", [
+    ("*/15 * * * *", datetime(2026, 3, 1, 10, 7, 30), datetime(2026, 3, 1, 10, 15)),
+    ("*/15 * * * *", datetime(2026, 3, 1, 10, 45), datetime(2026, 3, 1, 11, 0)),
+    ("20 0 * * *", datetime(2026, 3, 1, 0, 20), datetime(2026, 3, 2, 0, 20)),
+    ("50 0 * * *", datetime(2026, 12, 31, 23, 59), datetime(2027, 1, 1, 0, 50)),
+    ("0 9 * * 1-5", datetime(2026, 3, 6, 9, 0), datetime(2026, 3, 9, 9, 0)),  # Friday -> Monday
+    ("0 0 * * 7", datetime(2026, 3, 2), datetime(2026, 3, 8)),  # 7 is Sunday too
+    ("0 0 29 2 *", datetime(2026, 3, 1), datetime(2028, 2, 29)),
+    ("0 0 1 * 1", datetime(2026, 3, 1), datetime(2026, 3, 2)),  # day-of-month OR day-of-week
+    ("5,35 8-9 * * *", datetime(2026, 3, 1, 8, 35), datetime(2026, 3, 1, 9, 5)),
+])
+def test_cron_next_after(expr, after, expected):
+    assert CronSchedule(expr).next_after(after) == expected
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "0 0 31 2 *"])
+def test_cron_rejects_invalid_or_impossible(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr).next_after(datetime(2026, 1, 1))
+
+
+class AlwaysLeader:
+    held = True
+
+    def try_acquire(self):
+        return True
+
+    def release(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_running_jobs_are_referenced_until_done():
+    release = threading.Event()
+    scheduler = Scheduler(engine=None, lock_file="/dev/null")
+    scheduler.leader = AlwaysLeader()
+    job = scheduler.add_job("slow", lambda: release.wait(5), every=0.01)
+    await scheduler.start()
+    try:
+        for _ in range(100):
+            if job.running:
+                break
+            await asyncio.sleep(0.01)
+        assert len(scheduler._runs) == 1 and job.running
+        await asyncio.sleep(0.05)
+        assert job.skipped > 0  # still running: later ticks are skipped, not stacked
+        release.set()
+        for _ in range(100):
+            if not scheduler._runs:
+                break
+            await asyncio.sleep(0.01)
+        assert job.runs >= 1
+    finally:
+        release.set()
+        await scheduler.stop()
+
+
+def test_early_wake_up_or_clock_step_back_does_not_run_a_slot_twice():
+    job = Scheduler(engine=None, lock_file="/dev/null").add_job("nightly", lambda: None, cron="*/15 * * * *")
+    job.schedule_next(datetime(2026, 3, 1, 10, 7))
+    assert job.next_run == datetime(2026, 3, 1, 10, 15)
+    assert not job.take_due(datetime(2026, 3, 1, 10, 14, 59, 990000))  # asyncio woke a little early
+    assert job.take_due(datetime(2026, 3, 1, 10, 15, 0, 2000))
+    assert job.next_run == datetime(2026, 3, 1, 10, 30)
+    assert not job.take_due(datetime(2026, 3, 1, 10, 14, 58))  # NTP stepped the clock back
+    assert not job.take_due(datetime(2026, 3, 1, 10, 15, 1))
+    assert job.take_due(datetime(2026, 3, 1, 10, 30))
+    assert job.last_due == datetime(2026, 3, 1, 10, 30)
+
+
+def test_a_slot_older_than_the_last_run_is_not_taken():
+    job = Scheduler(engine=None, lock_file="/dev/null").add_job("nightly", lambda: None, cron="20 0 * * *")
+    job.last_due = datetime(2026, 3, 2, 0, 20)
+    job.next_run = datetime(2026, 3, 2, 0, 20)  # rescheduled from a clock that had stepped back
+    assert not job.take_due(datetime(2026, 3, 2, 0, 21))
+    assert job.next_run == datetime(2026, 3, 3, 0, 20)
+
+
+def test_clock_step_forward_runs_once_then_resumes_from_now():
+    job = Scheduler(engine=None, lock_file="/dev/null").add_job("quarterly", lambda: None, cron="*/15 * * * *")
+    job.schedule_next(datetime(2026, 3, 1, 10, 7))
+    assert job.take_due(datetime(2026, 3, 1, 11, 20))  # slept through 10:15 to 11:15
+    assert job.next_run == datetime(2026, 3, 1, 11, 30)
+    assert not job.take_due(datetime(2026, 3, 1, 11, 21))
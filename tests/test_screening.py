@@ -0,0 +1,59 @@
+import math
+import statistics
+
+import numpy as np
+
+from app.services.screening_service import MAD_TO_SIGMA, _pair_keys, score_pending
+
+
+def reference(approved, pending, min_samples, min_scale_pct):
+    """One key at a time with the statistics module"""
+    out = []
+    for key, price in pending:
+        history = [p for k, p in approved if k == key]
+        if len(history) < min_samples:
+            out.append((math.nan, math.nan, math.nan))
+            continue
+        med = statistics.median(history)
+        mad = statistics.median(abs(p - med) for p in history)
+        scale = max(MAD_TO_SIGMA * mad, med * min_scale_pct)
+        out.append((med, scale, abs(price - med) / scale))
+    return out
+
+
+def arrays(pairs):
+    keys = np.array([k for k, _ in pairs], dtype=np.int64)
+    prices = np.array([p for _, p in pairs], dtype=np.float64)
+    return keys, prices
+
+
+def test_matches_per_key_reference():
+    rng = np.random.default_rng(3)
+    keys = _pair_keys(np.arange(1, 41) % 8 + 1, np.arange(1, 41) % 5 + 1)
+    approved = [(int(k), float(round(rng.normal(40 + k % 17, 3), 2))) for k in rng.choice(keys, 600)]
+    pending = [(int(k), float(round(rng.normal(40 + k % 17, 6), 2))) for k in rng.choice(keys, 200)]
+    median, scale, score = score_pending(*arrays(approved), *arrays(pending), min_samples=5, min_scale_pct=0.02)
+    expected = np.array(reference(approved, pending, 5, 0.02))
+    np.testing.assert_allclose(median, expected[:, 0], equal_nan=True)
+    np.testing.assert_allclose(scale, expected[:, 1], equal_nan=True)
+    np.testing.assert_allclose(score, expected[:, 2], equal_nan=True)
+
+
+def test_thin_or_missing_history_is_not_scored():
+    approved = [(1, 40.0)] * 4 + [(2, 40.0)] * 5
+    pending = [(1, 41.0), (2, 41.0), (3, 41.0)]
+    _, _, score = score_pending(*arrays(approved), *arrays(pending), min_samples=5, min_scale_pct=0.02)
+    assert np.isnan(score[0]) and not np.isnan(score[1]) and np.isnan(score[2])
+
+
+def test_identical_history_uses_scale_floor():
+    approved = [(1, 50.0)] * 10
+    median, scale, score = score_pending(*arrays(approved), *arrays([(1, 52.0)]), min_samples=5, min_scale_pct=0.02)
+    assert median[0] == 50.0 and scale[0] == 1.0 and score[0] == 2.0
+
+
+def test_empty_inputs():
+    empty = np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+    _, _, score = score_pending(*empty, *arrays([(1, 10.0)]))
+    assert np.isnan(score).all()
+    assert len(score_pending(*arrays([(1, 10.0)]), *empty)[2]) == 0
@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.core.compression import choose_encoding
+from app.core.serialization import PRICE_SCALE, RESPONSE_FORMATS, dumps, negotiate, to_columnar
+
+COLUMNAR_JSON = RESPONSE_FORMATS["application/vnd.fairprice.columnar+json"]
+COLUMNAR_MSGPACK = RESPONSE_FORMATS["application/vnd.fairprice.columnar+msgpack"]
+
+
+@pytest.mark.parametrize("accept, media_type", [
+    (None, "application/json"),
+    ("*/*", "application/json"),
+    ("text/html, application/msgpack", "application/msgpack"),
+    ("application/x-msgpack", "application/msgpack"),
+    ("application/msgpack;q=0.5, application/vnd.fairprice.columnar+json", "application/vnd.fairprice.columnar+json"),
+    ("application/vnd.fairprice.columnar+msgpack;q=0.9, application/json;q=0.8", "application/vnd.fairprice.columnar+msgpack"),
+    ("application/msgpack;q=0", "application/json"),
+    ("application/msgpack;q=oops", "application/json"),
+])
+def test_negotiate(accept, media_type):
+    assert negotiate(accept).media_type == media_type
+
+
+def rows(n):
+    return [
+        {"market_name": f"Market {i % 3}", "area": "Dadar", "avg_price": 40 + i / 4, "vendor_count": i,
+         "spike_score": 1 / (i + 1), "median": None if i == 0 else 42.5}
+        for i in range(n)
+    ]
+
+
+def test_columnar_dictionary_encodes_repeats_and_scales_declared_prices():
+    out = to_columnar({"markets": rows(12)})["markets"]
+    assert out["@rows"] == 12
+    columns = out["@columns"]
+    assert columns["market_name"] == {"@dict": ["Market 0", "Market 1", "Market 2"], "@codes": [i % 3 for i in range(12)]}
+    assert columns["avg_price"] == {"@scale": PRICE_SCALE, "@values": [4000 + 25 * i for i in range(12)]}
+    assert columns["median"]["@values"][:2] == [None, 4250]
+    assert columns["vendor_count"] == list(range(12))  # ints stay as they are
+    assert columns["spike_score"] == [1 / (i + 1) for i in range(12)]  # not a price field
+
+
+def test_undeclared_two_decimal_floats_are_not_scaled():
+    values = [{"approval_rate": 0.5, "coverage": 0.25} for _ in range(12)]
+    columns = to_columnar(values)["@columns"]
+    assert columns == {"approval_rate": [0.5] * 12, "coverage": [0.25] * 12}
+
+
+def test_short_or_ragged_lists_are_left_alone():
+    assert to_columnar(rows(3))["@columns"]["avg_price"] == [40.0, 40.25, 40.5]
+    ragged = [{"a": 1}, {"b": 2}]
+    assert to_columnar(ragged) == ragged
+
+
+def test_columnar_keeps_json_formats_of_dates_and_decimals():
+    content = [{"entry_date": date(2026, 3, 1), "price": Decimal("40.50")} for _ in range(10)]
+    decoded = json.loads(COLUMNAR_JSON.encode(content))
+    assert decoded["@columns"]["entry_date"] == {"@dict": ["2026-03-01"], "@codes": [0] * 10}
+    assert decoded["@columns"]["price"] == {"@dict": ["40.50"], "@codes": [0] * 10}
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    content = {"markets": rows(10)}
+    assert msgpack.unpackb(COLUMNAR_MSGPACK.encode(content)) == json.loads(dumps(to_columnar(content)))
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip;q=1, br;q=0.5", "gzip"),
+    ("br;q=0, *", "gzip"),
+])
+def test_choose_encoding(accept_encoding, expected):
+    pytest.importorskip("brotli")
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_app_import_does_not_load_optional_encoders():
+    code = (
+        "import sys, app.main\n"
+        "from app.core import serialization\n"
+        "assert 'msgpack' not in sys.modules and 'brotli' not in sys.modules\n"
+        "assert serialization._orjson.cache_info().currsize == 0\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
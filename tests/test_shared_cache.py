@@ -0,0 +1,79 @@
+import threading
+from datetime import date
+
+import pytest
+
+from app.core.shared_cache import SEQ, LocalDayStatsCache, SharedDayStatsCache
+
+DAY = date(2026, 3, 1)
+
+
+def stats(avg, count):
+    return {"avg": avg, "min": avg, "max": avg, "count": count, "p10": avg, "median": avg, "p90": avg}
+
+
+@pytest.fixture(params=["shared", "local"])
+def cache(request, tmp_path):
+    if request.param == "shared":
+        return SharedDayStatsCache(str(tmp_path / "day-stats"), 64)
+    return LocalDayStatsCache(64)
+
+
+def test_older_rollup_version_cannot_replace_a_newer_one(cache):
+    assert cache.put(1, 2, DAY, stats(40.0, 1), 3600, version=200.0)
+    # a reader that loaded the rollup before the approval committed
+    assert not cache.put(1, 2, DAY, stats(30.0, 0), 3600, version=100.0)
+    assert cache.get(1, 2, DAY, 3600) == stats(40.0, 1)
+    assert cache.put(1, 2, DAY, stats(45.0, 2), 3600, version=200.0)  # same version: same rollup
+    assert cache.put(1, 2, DAY, stats(50.0, 3), 3600, version=300.0)
+    assert cache.get(1, 2, DAY, 3600) == stats(50.0, 3)
+
+
+def test_records_expire_and_keys_stay_apart(cache):
+    cache.put(1, 2, DAY, stats(40.0, 1), 3600, version=1.0)
+    assert cache.get(1, 3, DAY, 3600) is None
+    assert cache.get(1, 2, date(2026, 3, 2), 3600) is None
+    cache.put(1, 2, date(2026, 3, 2), stats(41.0, 1), -1, version=1.0)
+    assert cache.get(1, 2, date(2026, 3, 2), -1) is None
+
+
+def test_shared_table_is_seen_by_another_mapping(tmp_path):
+    path = str(tmp_path / "day-stats")
+    writer, reader = SharedDayStatsCache(path, 64), SharedDayStatsCache(path, 64)
+    writer.put(7, 8, DAY, stats(42.5, 4), 3600, version=10.0)
+    assert reader.get(7, 8, DAY, 3600) == stats(42.5, 4)
+    assert not reader.put(7, 8, DAY, stats(1.0, 1), 3600, version=5.0)
+    assert writer.get(7, 8, DAY, 3600) == stats(42.5, 4)
+
+
+def test_threads_in_one_worker_do_not_write_at_the_same_time(tmp_path):
+    cache = SharedDayStatsCache(str(tmp_path / "day-stats"), 64)
+    writer = threading.Thread(target=cache.put, args=(1, 2, DAY, stats(40.0, 1), 3600), kwargs={"version": 1.0})
+    with cache._write_lock():  # another thread sharing the descriptor is mid-write
+        writer.start()
+        writer.join(timeout=0.2)
+        assert writer.is_alive()
+    writer.join(timeout=5)
+    assert cache.get(1, 2, DAY, 3600) == stats(40.0, 1)
+
+
+def test_concurrent_writers_keep_the_newest_version(cache):
+    versions = list(range(1, 201))
+    barrier = threading.Barrier(8)
+    accepted = []
+
+    def write(mine):
+        barrier.wait()
+        for v in mine:
+            if cache.put(1, 2, DAY, stats(float(v), v), 3600, version=float(v)):
+                accepted.append(v)
+
+    threads = [threading.Thread(target=write, args=(versions[i::8][::-1],)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.get(1, 2, DAY, 3600) == stats(200.0, 200)
+    if isinstance(cache, SharedDayStatsCache):
+        offset = next(cache._offsets(1, 2, DAY.toordinal()))
+        assert SEQ.unpack_from(cache._map, offset)[0] == 2 * len(accepted)  # odd then even once per write
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.core.security import create_access_token
+from app.db.database import engine
+from app.main import app
+from app.models import ApprovalStatus, PriceEntry
+from app.models.price_event import PriceEvent
+
+SUBMIT = "/api/v1/prices"
+
+
+@pytest.fixture
+def submit(db_world):
+    client = TestClient(app)
+    token = create_access_token({"sub": str(db_world["vendor_ids"][0]), "role": "vendor"})
+
+    def post(price):
+        payload = {"product_id": db_world["product_id"], "market_id": db_world["market_id"], "price_per_unit": price}
+        return client.post(SUBMIT, json=payload, headers={"Authorization": f"Bearer {token}"})
+    return post
+
+
+def _set_status(entry_id, status):
+    with engine.begin() as conn:
+        conn.execute(update(PriceEntry).where(PriceEntry.id == entry_id).values(status=status))
+
+
+def test_new_entry_is_201_and_update_in_place_is_200(submit):
+    created = submit("40.00")
+    assert created.status_code == 201
+    entry_id = created.json()["id"]
+
+    updated = submit("42.00")
+    assert updated.status_code == 200
+    assert (updated.json()["id"], updated.json()["price_per_unit"], updated.json()["status"]) == (entry_id, "42.00", "pending")
+
+    _set_status(entry_id, ApprovalStatus.rejected)
+    reopened = submit("41.00")
+    assert reopened.status_code == 200
+    assert (reopened.json()["id"], reopened.json()["status"]) == (entry_id, "pending")
+
+    with engine.connect() as conn:
+        events = conn.scalars(select(PriceEvent.event_type).where(PriceEvent.entry_id == entry_id).order_by(PriceEvent.id))
+        assert list(events) == ["submitted", "resubmitted", "resubmitted"]
+
+    _set_status(entry_id, ApprovalStatus.approved)
+    assert submit("43.00").status_code == 409